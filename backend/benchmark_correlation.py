@@ -0,0 +1,110 @@
+"""Benchmark: correlation matrix with p-values, per-pair loop vs array form"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from modules.correlation.models import CorrelationRequest, CorrelationRankedRequest
+from modules.correlation.service import correlation_matrix_logic, correlation_ranked_logic
+from modules.datasets.service import register_dataframe
+
+N_OBS = 260
+SHAPES = [100, 500, 1500]
+LEGACY_MAX_VARS = 500  # The per-pair loop takes minutes beyond this
+RANKED_SHAPES = [500, 2000, 5000]
+PAIRWISE_SHAPES = [100, 500, 1000]
+
+
+def legacy_matrix(df):
+    """Previous implementation: pandas corr plus one scipy call per ordered pair"""
+    pearson = df.corr(method='pearson')
+    spearman = df.corr(method='spearman')
+    n = len(df)
+    p_values = {}
+    for col1 in df.columns:
+        p_values[col1] = {}
+        for col2 in df.columns:
+            if col1 == col2:
+                p_values[col1][col2] = 0.0
+            else:
+                r = pearson.loc[col1, col2]
+                t_stat = r * np.sqrt(n - 2) / np.sqrt(1 - r**2)
+                p_values[col1][col2] = float(2 * (1 - stats.t.cdf(abs(t_stat), n - 2)))
+    return pearson.to_dict(), spearman.to_dict(), p_values
+
+
+def legacy_ranked(df, target_variable):
+    """Previous ranked implementation: Series.corr and a scipy call per column, then a list sort"""
+    target = df[target_variable]
+    n = len(df)
+    correlations = []
+    for col in df.columns:
+        if col != target_variable:
+            r = df[col].corr(target)
+            t_stat = r * np.sqrt(n - 2) / np.sqrt(1 - r**2)
+            p_val = 2 * (1 - stats.t.cdf(abs(t_stat), n - 2))
+            correlations.append({"variable": col, "correlation": float(r), "p_value": float(p_val),
+                                 "abs_correlation": abs(r)})
+    correlations.sort(key=lambda x: x['abs_correlation'], reverse=True)
+    return correlations
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'n_vars':>6} {'legacy (s)':>11} {'nested (s)':>11} {'matrix (s)':>11} {'upper (s)':>10}")
+    for n_vars in SHAPES:
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(rng.normal(size=(N_OBS, n_vars)), columns=[f"var_{i}" for i in range(n_vars)])
+        variables = df.to_dict(orient="list")
+
+        t_legacy = timed(lambda: legacy_matrix(df)) if n_vars <= LEGACY_MAX_VARS else float('nan')
+        t_nested = timed(lambda: correlation_matrix_logic(CorrelationRequest(variables=variables)))
+        t_matrix = timed(lambda: correlation_matrix_logic(CorrelationRequest(variables=variables, output="matrix")))
+        t_upper = timed(lambda: correlation_matrix_logic(
+            CorrelationRequest(variables=variables, output="matrix", upper_triangle=True)
+        ))
+        print(f"{n_vars:>6} {t_legacy:>11.2f} {t_nested:>11.2f} {t_matrix:>11.2f} {t_upper:>10.2f}")
+
+    print()
+    print(f"{'n_vars':>6} {'legacy ranked (ms)':>19} {'pearson (ms)':>13} {'+spearman (ms)':>15} {'+kendall (ms)':>14}")
+    for n_vars in RANKED_SHAPES:
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(rng.normal(size=(N_OBS, n_vars)), columns=[f"var_{i}" for i in range(n_vars)])
+        dataset_id = register_dataframe(df)["dataset_id"]
+        # Both sides start from the same in-memory frame (the registered-dataset path used by the UI)
+        t_legacy = timed(lambda: legacy_ranked(df, "var_0"))
+        t_pearson = timed(lambda: correlation_ranked_logic(
+            CorrelationRankedRequest(dataset_id=dataset_id, target_variable="var_0")
+        ))
+        t_spearman = timed(lambda: correlation_ranked_logic(
+            CorrelationRankedRequest(dataset_id=dataset_id, target_variable="var_0", methods=["pearson", "spearman"])
+        ))
+        t_kendall = timed(lambda: correlation_ranked_logic(
+            CorrelationRankedRequest(dataset_id=dataset_id, target_variable="var_0", methods=["pearson", "spearman", "kendall"])
+        ))
+        print(f"{n_vars:>6} {t_legacy * 1000:>19.1f} {t_pearson * 1000:>13.1f} {t_spearman * 1000:>15.1f} {t_kendall * 1000:>14.1f}")
+
+    print()
+    print(f"{'n_vars':>6} {'pandas pairwise (s)':>20} {'masked (s)':>11}")
+    for n_vars in PAIRWISE_SHAPES:
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(rng.normal(size=(N_OBS, n_vars)), columns=[f"var_{i}" for i in range(n_vars)])
+        # A tenth of the columns start late, as campaigns that only ran part of the period
+        for i, col in enumerate(df.columns[::10]):
+            df.loc[:rng.integers(26, 200), col] = np.nan
+        dataset_id = register_dataframe(df)["dataset_id"]
+
+        t_pandas = timed(lambda: (df.corr(), df.corr(method="spearman")))
+        t_masked = timed(lambda: correlation_matrix_logic(
+            CorrelationRequest(dataset_id=dataset_id, output="matrix", missing="pairwise")
+        ))
+        print(f"{n_vars:>6} {t_pandas:>20.2f} {t_masked:>11.2f}")
@@ -0,0 +1,45 @@
+"""Benchmark: dense correlation matrices vs blocked top-k / threshold modes (time and peak memory)"""
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+
+from modules.correlation.models import CorrelationRequest
+from modules.correlation.service import correlation_matrix_logic
+
+N_OBS = 260
+SHAPES = [1000, 2500, 5000]
+CONFIGS = [
+    ("dense (matrix)", dict(output="matrix")),
+    ("top_k float64", dict(mode="top_k", top_k=10)),
+    ("top_k float32", dict(mode="top_k", top_k=10, dtype="float32")),
+    ("threshold 0.35", dict(mode="threshold", threshold=0.35)),
+]
+
+
+def make_dataset(n_vars, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(N_OBS, 20))
+    X = factors @ rng.normal(scale=0.3, size=(20, n_vars)) + rng.normal(size=(N_OBS, n_vars))
+    return pd.DataFrame(X, columns=[f"var_{i}" for i in range(n_vars)]).to_dict(orient="list")
+
+
+if __name__ == "__main__":
+    print(f"{'n_vars':>6} {'mode':>16} {'time (s)':>9} {'peak (MB)':>10} {'pairs':>10}")
+    for n_vars in SHAPES:
+        variables = make_dataset(n_vars)
+        for name, options in CONFIGS:
+            request = CorrelationRequest(variables=variables, **options)
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = correlation_matrix_logic(request)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            pairs = len(result["pairs"]["source"]) if "pairs" in result else n_vars * n_vars
+            print(f"{n_vars:>6} {name:>16} {elapsed:>9.2f} {peak / 1024 ** 2:>10.0f} {pairs:>10}")
+            del result
@@ -0,0 +1,64 @@
+"""Benchmark: lag x adstock x dimret scan vs transforming and correlating one setting at a time"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+
+from modules.correlation.models import CorrelationScanRequest
+from modules.correlation.service import correlation_scan_logic
+from modules.datasets.service import register_dataframe
+from modules.modelling.transformations import apply_variable_transformation
+
+N_OBS = 156  # Three years of weekly data
+SHAPES = [10, 50, 200]
+LEGACY_MAX_VARS = 10  # One transform + correlate per cell takes minutes beyond this
+MAX_LAG = 12
+ADSTOCK_RATES = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+DIMRET_RATES = [0.0, 0.2, 0.4, 0.6, 0.8]
+
+
+def legacy_scan(df, kpi):
+    """What the charting sliders do today: transform each setting, then correlate it with the KPI"""
+    y = df[kpi].to_numpy()
+    best = {}
+    for name in df.columns.drop(kpi):
+        x = df[name].to_numpy()
+        cells = []
+        for lag in range(MAX_LAG + 1):
+            for rate in ADSTOCK_RATES:
+                for dimret in DIMRET_RATES:
+                    series = apply_variable_transformation(x, lag=lag, adstock=rate, dimret=dimret)
+                    cells.append(np.corrcoef(series, y)[0, 1])
+        best[name] = np.nanmax(np.abs(cells))
+    return best
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_cells = (MAX_LAG + 1) * len(ADSTOCK_RATES) * len(DIMRET_RATES)
+    print(f"{n_cells} cells per variable")
+    print(f"{'n_vars':>6} {'legacy (s)':>11} {'scan (s)':>9} {'scan, no grid (s)':>18}")
+    for n_vars in SHAPES:
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(np.abs(rng.normal(size=(N_OBS, n_vars))) * 100, columns=[f"media_{i}" for i in range(n_vars)])
+        df["kpi"] = df.to_numpy() @ rng.uniform(size=n_vars) + rng.normal(scale=50, size=N_OBS)
+        dataset_id = register_dataframe(df)["dataset_id"]
+
+        def scan(include_grid):
+            return correlation_scan_logic(CorrelationScanRequest(
+                dataset_id=dataset_id, kpi="kpi", max_lag=MAX_LAG, adstock_rates=ADSTOCK_RATES,
+                dimret_rates=DIMRET_RATES, include_grid=include_grid
+            ))
+
+        t_legacy = timed(lambda: legacy_scan(df, "kpi")) if n_vars <= LEGACY_MAX_VARS else float('nan')
+        t_scan = timed(lambda: scan(True))
+        t_best = timed(lambda: scan(False))
+        print(f"{n_vars:>6} {t_legacy:>11.2f} {t_scan:>9.3f} {t_best:>18.3f}")
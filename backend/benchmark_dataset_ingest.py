@@ -0,0 +1,81 @@
+"""Benchmark: dataset ingest time and peak memory, JSON body vs CSV/Arrow/Parquet uploads (~100 MB)"""
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+
+N_ROWS = 90_000
+N_COLS = 60
+METHODS = ["json", "csv", "arrow", "parquet"]
+
+
+def make_files(directory):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.gamma(2.0, 100.0, size=(N_ROWS, N_COLS)), columns=[f"var_{i}" for i in range(N_COLS)])
+    df.insert(0, "OBS", pd.date_range("2000-01-01", periods=N_ROWS, freq="D").strftime("%d/%m/%Y"))
+
+    paths = {method: os.path.join(directory, f"data.{method}") for method in METHODS}
+    df.to_csv(paths["csv"], index=False)
+    with open(paths["json"], "w") as f:
+        json.dump({"data": df.to_dict(orient="list")}, f)
+    try:
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.ipc.new_stream(paths["arrow"], table.schema) as sink:
+            sink.write_table(table)
+        df.to_parquet(paths["parquet"], index=False)
+    except ImportError:
+        del paths["arrow"], paths["parquet"]
+    return paths
+
+
+def _status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+
+
+def run_one(method, path):
+    """Ingest one file the way the endpoint does; runs in a fresh process so peak RSS is per method"""
+    from modules.datasets.models import DatasetUploadRequest
+    from modules.datasets.service import register_dataset, register_upload
+
+    with open(path, "rb") as f:
+        body = f.read()
+    # Reset the high-water mark so the peak covers decoding/registration only (Linux)
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    baseline = _status_kb("VmRSS:")
+
+    start = time.perf_counter()
+    if method == "json":
+        info = register_dataset(DatasetUploadRequest.model_validate(json.loads(body)).data)
+    else:
+        info = register_upload(body)
+    elapsed = time.perf_counter() - start
+
+    peak = _status_kb("VmHWM:") - baseline
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak / 1024, "rows": info["n_rows"]}))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run_one(sys.argv[1], sys.argv[2])
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_files(directory)
+        print(f"{'method':>8} {'file (MB)':>10} {'ingest (s)':>11} {'peak extra RSS (MB)':>20}")
+        for method, path in paths.items():
+            output = subprocess.run([sys.executable, __file__, method, path], capture_output=True, text=True, check=True)
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            size = os.path.getsize(path) / 1024 ** 2
+            print(f"{method:>8} {size:>10.1f} {result['seconds']:>11.2f} {result['peak_mb']:>20.1f}")
@@ -0,0 +1,54 @@
+"""Benchmark: feature extraction wall time by column count and thread budget (sequential single-threaded RF vs concurrent models)"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+
+from modules.feature_extraction.models import FeatureExtractionRequest
+from modules.feature_extraction.service import XGBOOST_AVAILABLE, extract_features, xgb
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+
+N_OBS = 300
+COLUMN_COUNTS = [100, 500, 1000]
+N_DRIVERS = 10
+
+
+def make_data(n_vars, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(N_OBS, n_vars))
+    y = X[:, :N_DRIVERS] @ rng.uniform(0.5, 2.0, N_DRIVERS) + rng.normal(size=N_OBS)
+    return {"kpi": y.tolist(), **{f"x{i}": X[:, i].tolist() for i in range(n_vars)}}, X, y
+
+
+def previous_path(X, y):
+    """Reference: XGBoost, then a single-threaded Random Forest, one after the other"""
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.1, random_state=42, shuffle=False)
+    if XGBOOST_AVAILABLE:
+        xgb.XGBRegressor(random_state=42, n_estimators=100, max_depth=6, learning_rate=0.1).fit(X_train, y_train)
+    RandomForestRegressor(random_state=42, n_estimators=100, max_depth=10).fit(X_train, y_train)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    budgets = sorted({1, 2, 4, cores})
+    boosters = ["xgboost", "hist_gradient_boosting"] if XGBOOST_AVAILABLE else ["hist_gradient_boosting"]
+    print(f"{N_OBS} rows, {cores} CPUs; seconds per extraction")
+    header = f"{'n_vars':>6} {'previous':>9}" + "".join(f" {f'{b[:4]}/{n}t':>10}" for b in boosters for n in budgets)
+    print(header)
+    for n_vars in COLUMN_COUNTS:
+        data, X, y = make_data(n_vars)
+        row = f"{n_vars:>6} {timed(lambda: previous_path(X, y)):>9.2f}"
+        for booster in boosters:
+            for n_jobs in budgets:
+                request = FeatureExtractionRequest(data=data, kpi_var="kpi", booster=booster, n_jobs=n_jobs)
+                row += f" {timed(lambda: extract_features(request)):>10.2f}"
+        print(row)
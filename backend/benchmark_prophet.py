@@ -0,0 +1,102 @@
+"""Benchmark: Prophet forecast latency on 3 years of daily data (predict paths, interval draws, warm-started refits, least-squares engine, tuning)"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+
+from modules.prophet.cache import prophet_cache
+from modules.prophet.models import FourierRequest, ProphetRequest, ProphetTuneRequest
+from modules.prophet.service import PROPHET_AVAILABLE, generate_forecast, generate_fourier_forecast, prophet, warm_start_params
+from modules.prophet.tuning import tune_prophet
+
+N_DAYS = 3 * 365
+PERIODS = 90
+REPEATS = 3
+APPENDED_DAYS = 7  # A weekly refresh
+
+
+def daily_series(n_days=N_DAYS):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2021-01-01", periods=n_days, freq="D")
+    t = np.arange(n_days)
+    values = 100 + 0.05 * t + 10 * np.sin(2 * np.pi * t / 365.25) + 3 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 2, n_days)
+    return dates, values
+
+
+def best_of(fn):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    dates, values = daily_series()
+    request = dict(dates=[d.strftime("%Y-%m-%d") for d in dates], values=values.tolist(), periods=PERIODS)
+    print(f"{N_DAYS} daily observations, {PERIODS}-day horizon (best of {REPEATS})")
+    print(f"{'path':<44} {'seconds':>8}")
+    t_fourier = best_of(lambda: generate_fourier_forecast(FourierRequest(**request)))
+    print(f"{'request, least-squares engine (/fourier)':<44} {t_fourier:>8.3f}")
+
+    if not PROPHET_AVAILABLE:
+        print("prophet is not installed; nothing else to benchmark")
+        sys.exit(0)
+
+    df = pd.DataFrame({"ds": dates, "y": values})
+    model = prophet.Prophet()
+    t_fit = best_of(lambda: prophet.Prophet().fit(df))
+    model.fit(df)
+
+    def legacy_predict():
+        """Previous path: forecast frame, then a second predict over the history for components"""
+        model.predict(model.make_future_dataframe(periods=PERIODS))
+        model.predict(df)
+
+    def single_predict(samples):
+        model.uncertainty_samples = samples
+        model.predict(model.make_future_dataframe(periods=PERIODS))
+
+    print(f"{'fit (MAP)':<44} {t_fit:>8.3f}")
+    print(f"{'predict twice, 1000 draws (previous)':<44} {best_of(legacy_predict):>8.3f}")
+    print(f"{'single predict, 1000 draws':<44} {best_of(lambda: single_predict(1000)):>8.3f}")
+    print(f"{'single predict, 100 draws':<44} {best_of(lambda: single_predict(100)):>8.3f}")
+    print(f"{'single predict, no intervals':<44} {best_of(lambda: single_predict(0)):>8.3f}")
+
+    prophet_cache.clear()
+    start = time.perf_counter()
+    generate_forecast(ProphetRequest(**request))
+    t_miss = time.perf_counter() - start
+    t_hit = best_of(lambda: generate_forecast(ProphetRequest(**request)))
+    t_hit_fast = best_of(lambda: generate_forecast(ProphetRequest(uncertainty_samples=0, **request)))
+    print(f"{'request, cache miss (fit + predict)':<44} {t_miss:>8.3f}")
+    print(f"{'request, cached fit, 1000 draws':<44} {t_hit:>8.3f}")
+    print(f"{'request, cached fit, no intervals':<44} {t_hit_fast:>8.3f}")
+
+    # Weekly refresh: the same series plus APPENDED_DAYS, refitted cold or from the previous fit
+    dates, values = daily_series(N_DAYS + APPENDED_DAYS)
+    extended = pd.DataFrame({"ds": dates, "y": values})
+    init = warm_start_params(model)
+    t_cold = best_of(lambda: prophet.Prophet().fit(extended))
+    t_warm = best_of(lambda: prophet.Prophet().fit(extended, init=init))
+    cold, warm = prophet.Prophet().fit(extended), prophet.Prophet().fit(extended, init=init)
+    future = cold.make_future_dataframe(periods=PERIODS)
+    difference = np.abs(warm.predict(future)["yhat"] - cold.predict(future)["yhat"]).max()
+    print(f"{f'refit +{APPENDED_DAYS} days, cold':<44} {t_cold:>8.3f}")
+    print(f"{f'refit +{APPENDED_DAYS} days, warm-started':<44} {t_warm:>8.3f}   (max |yhat diff| {difference:.4f})")
+
+    # Cross-validation over a 2 x 2 grid: the fits run in the Prophet process pool
+    tune_request = ProphetTuneRequest(
+        dates=request["dates"], values=request["values"], horizon=PERIODS, initial=730, period=90,
+        changepoint_prior_scale=[0.05, 0.5], seasonality_prior_scale=[10.0], seasonality_mode=["additive", "multiplicative"]
+    )
+    tune_prophet(tune_request)  # Starts the pool's workers
+    start = time.perf_counter()
+    result = tune_prophet(tune_request)
+    t_tune = time.perf_counter() - start
+    n_fits = result["n_fits"]
+    print(f"{f'tune, {n_fits} fits on {os.cpu_count()} CPUs':<44} {t_tune:>8.3f}   (one full fit x {n_fits}: {n_fits * t_fit:.3f})")
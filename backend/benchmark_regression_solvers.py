@@ -0,0 +1,80 @@
+"""
+Benchmark: closed-form QR OLS vs bounded least squares on unbounded modelling
+regressions, then BVLS vs the previous L-BFGS-B fit on regressions whose
+min_coef=0 bounds bind
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+from modules.modelling.service import run_regression_with_bounds
+
+SHAPES = [(156, 10), (260, 40), (730, 80), (1825, 120)]
+BOUNDED_SHAPES = [(260, 40), (730, 100), (1825, 150)]
+REPEATS = 5
+
+
+def make_problem(n_obs, n_vars, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.gamma(2.0, 50.0, size=(n_obs, n_vars)), columns=[f"var_{i}" for i in range(n_vars)])
+    beta = rng.normal(0, 1, n_vars)
+    y = 1000 + X.values @ beta + rng.normal(0, 25, n_obs)
+    return y, X
+
+
+def best_time(fn, repeats=REPEATS):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def lbfgsb_fit(y, X, bounds):
+    """The fit bounded regressions used before BVLS: L-BFGS-B on the RSS from a least-squares start"""
+    X_array = np.column_stack([np.ones(len(X)), X.to_numpy(dtype=np.float64)])
+    initial_guess = np.linalg.lstsq(X_array, y, rcond=None)[0]
+    result = minimize(lambda params: np.sum((y - X_array @ params) ** 2), x0=initial_guess,
+                      bounds=bounds, method='L-BFGS-B')
+    return result.x
+
+
+if __name__ == "__main__":
+    print(f"{'n_obs':>6} {'n_vars':>6} {'qr (ms)':>10} {'bvls (ms)':>14} {'speedup':>8} {'max |coef diff|':>16} {'rss qr':>14} {'rss bvls':>14}")
+    for n_obs, n_vars in SHAPES:
+        y, X = make_problem(n_obs, n_vars)
+        # Very wide finite bounds never bind but force the bounded (BVLS) path
+        forced_bounds = [(None, None)] + [(-1e12, 1e12)] * n_vars
+
+        t_qr, (qr_results, _) = best_time(lambda: run_regression_with_bounds(y, X))
+        t_opt, (opt_results, _) = best_time(lambda: run_regression_with_bounds(y, X, bounds=forced_bounds))
+
+        qr_coef = np.array(list(qr_results['coefficients'].values()))
+        opt_coef = np.array(list(opt_results['coefficients'].values()))
+        rss_qr = float(np.sum(qr_results['residuals'] ** 2))
+        rss_opt = float(np.sum(opt_results['residuals'] ** 2))
+
+        print(f"{n_obs:>6} {n_vars:>6} {t_qr * 1000:>10.2f} {t_opt * 1000:>14.2f} {t_opt / t_qr:>7.1f}x "
+              f"{np.max(np.abs(qr_coef - opt_coef)):>16.3e} {rss_qr:>14.6g} {rss_opt:>14.6g}")
+
+    # Half of the true effects are negative, so min_coef=0 binds on about half the regressors
+    print()
+    print(f"{'n_obs':>6} {'n_vars':>6} {'at bound':>8} {'bvls (ms)':>10} {'l-bfgs-b (ms)':>14} {'speedup':>8} {'rss bvls':>14} {'rss l-bfgs-b':>14}")
+    for n_obs, n_vars in BOUNDED_SHAPES:
+        y, X = make_problem(n_obs, n_vars)
+        bounds = [(None, None)] + [(0.0, None)] * n_vars
+
+        t_bvls, (bvls_results, _) = best_time(lambda: run_regression_with_bounds(y, X, bounds=bounds))
+        t_lbfgsb, lbfgsb_coef = best_time(lambda: lbfgsb_fit(y, X, bounds), repeats=1)
+
+        rss_bvls = float(np.sum(bvls_results['residuals'] ** 2))
+        rss_lbfgsb = float(np.sum((y - lbfgsb_coef[0] - X.to_numpy() @ lbfgsb_coef[1:]) ** 2))
+
+        print(f"{n_obs:>6} {n_vars:>6} {len(bvls_results['at_bound']):>8} {t_bvls * 1000:>10.2f} "
+              f"{t_lbfgsb * 1000:>14.2f} {t_lbfgsb / t_bvls:>7.1f}x {rss_bvls:>14.6g} {rss_lbfgsb:>14.6g}")
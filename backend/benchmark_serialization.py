@@ -0,0 +1,93 @@
+"""Benchmark: response sanitization + serialization, legacy per-value path vs vectorized encoder"""
+import json
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from modules.encoding import COLUMNAR_MEDIA_TYPE, encode_response
+
+SHAPES = [(156, 10), (730, 40), (1095, 80), (1825, 120)]
+REPEATS = 5
+
+
+def make_result(n_obs, n_vars, seed=0):
+    """Shaped like run_modelling_regression's output (arrays before any .tolist())"""
+    rng = np.random.default_rng(seed)
+    names = ['const'] + [f"var_{i}" for i in range(n_vars)]
+    dates = pd.date_range("2020-01-01", periods=n_obs, freq="D").to_numpy()
+    transformed = {name: rng.gamma(2.0, 50.0, n_obs) for name in names[1:]}
+    transformed['kpi'] = rng.gamma(2.0, 500.0, n_obs)
+    transformed['OBS'] = dates
+    transformed['var_0'][:2] = np.nan  # lags leave NaNs at the start
+    return {
+        'coefficients': {name: float(v) for name, v in zip(names, rng.normal(size=len(names)))},
+        'p_values': {name: float(v) for name, v in zip(names, rng.uniform(size=len(names)))},
+        'r_squared': 0.9,
+        'residuals': rng.normal(size=n_obs),
+        'fitted_values': rng.normal(size=n_obs),
+        'transformed_data': transformed,
+        'variable_contributions': {name: rng.normal(size=n_obs) for name in names},
+        'n_observations': n_obs,
+    }
+
+
+def legacy_sanitize_float(value, default=0.0):
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(np.nan_to_num(value, nan=default, posinf=default, neginf=default))
+    return default
+
+
+def legacy_sanitize_dict(d):
+    result = {}
+    for key, value in d.items():
+        if isinstance(value, dict):
+            result[key] = legacy_sanitize_dict(value)
+        elif isinstance(value, list):
+            result[key] = [legacy_sanitize_float(v) if isinstance(v, (int, float)) else v for v in value]
+        elif isinstance(value, (int, float)):
+            result[key] = legacy_sanitize_float(value)
+        else:
+            result[key] = value
+    return result
+
+
+def legacy_encode(result):
+    """Previous path: .tolist(), per-value sanitize_dict, then FastAPI's jsonable_encoder + JSONResponse"""
+    as_lists = dict(result)
+    as_lists['residuals'] = result['residuals'].tolist()
+    as_lists['fitted_values'] = result['fitted_values'].tolist()
+    as_lists['transformed_data'] = {k: pd.Series(v).tolist() for k, v in result['transformed_data'].items()}
+    as_lists['variable_contributions'] = {k: v.tolist() for k, v in result['variable_contributions'].items()}
+    content = jsonable_encoder(legacy_sanitize_dict(as_lists))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def best_time(fn):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        output = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), output
+
+
+if __name__ == "__main__":
+    print(f"{'n_obs':>6} {'n_vars':>6} {'legacy (ms)':>12} {'json (ms)':>10} {'columnar (ms)':>14} "
+          f"{'legacy (KB)':>12} {'json (KB)':>10} {'columnar (KB)':>14}")
+    for n_obs, n_vars in SHAPES:
+        result = make_result(n_obs, n_vars)
+        t_legacy, legacy = best_time(lambda: legacy_encode(result))
+        t_json, json_response = best_time(lambda: encode_response(result, nan_value=0.0))
+        t_columnar, columnar_response = best_time(
+            lambda: encode_response(result, accept=COLUMNAR_MEDIA_TYPE, nan_value=0.0)
+        )
+        print(f"{n_obs:>6} {n_vars:>6} {t_legacy * 1000:>12.1f} {t_json * 1000:>10.1f} {t_columnar * 1000:>14.1f} "
+              f"{len(legacy) / 1024:>12.0f} {len(json_response.body) / 1024:>10.0f} "
+              f"{len(columnar_response.body) / 1024:>14.0f}")
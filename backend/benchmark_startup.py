@@ -0,0 +1,64 @@
+"""Benchmark: backend cold-start import time (python -X importtime) against a budget"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+RUNS = 5
+# Cold `import main` must stay under this (override with STARTUP_BUDGET_MS)
+BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 1500))
+TOP_PACKAGES = 8
+
+
+def import_profile():
+    """One fresh interpreter importing main: {module: cumulative microseconds} from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SRC, capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def first_use_costs():
+    """Import time each API module's first request pays when warm-up has not run yet"""
+    code = (
+        "import json, main\n"
+        "from modules.lazy import MODULE_DEPENDENCIES, readiness, warm_up\n"
+        "costs = {}\n"
+        "for module in MODULE_DEPENDENCIES:\n"
+        "    before = dict(readiness()['import_ms'])\n"
+        "    warm_up([module])\n"
+        "    costs[module] = sum(ms for name, ms in readiness()['import_ms'].items() if name not in before)\n"
+        "print(json.dumps(costs))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    profiles = [import_profile() for _ in range(RUNS)]
+    total_ms = statistics.median(profile["main"] for profile in profiles) / 1000
+
+    last = profiles[-1]
+    top_level = {name: us for name, us in last.items() if "." not in name and name != "main"}
+    print(f"Heaviest packages imported by main (run {RUNS}):")
+    for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:TOP_PACKAGES]:
+        print(f"  {name:<20} {us / 1000:>8.1f} ms")
+
+    print("Import cost deferred to each module's first request (paid by warm-up instead):")
+    for module, ms in first_use_costs().items():
+        print(f"  {module:<20} {ms:>8.1f} ms")
+
+    print(f"import main: {total_ms:.0f} ms (median of {RUNS}), budget {BUDGET_MS:.0f} ms")
+    if total_ms > BUDGET_MS:
+        print("OVER BUDGET")
+        sys.exit(1)
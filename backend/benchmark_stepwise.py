@@ -0,0 +1,64 @@
+"""Benchmark: incremental QR stepwise vs refitting every candidate at every step"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+
+from modules.regression.service import forward_selection
+from modules.regression.stepwise import StepwiseQR
+
+SHAPES = [(200, 50), (200, 200), (200, 500)]
+N_DRIVERS = 12
+SIGNIFICANCE = 0.01
+
+
+def make_problem(n_obs, n_vars, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_obs, n_vars))
+    beta = np.zeros(n_vars)
+    beta[:N_DRIVERS] = rng.uniform(0.5, 2.0, N_DRIVERS)
+    y = 10 + X @ beta + rng.normal(size=n_obs)
+    return X, y
+
+
+def forward_refit(X, y, significance_level):
+    """Reference: full OLS refit (lstsq) for each candidate at each step, partial t-test p-values"""
+    from scipy import stats
+    n_obs, n_vars = X.shape
+    selected, remaining = [], list(range(n_vars))
+    while remaining:
+        best_p, best_idx = 1.0, None
+        for idx in remaining:
+            A = np.column_stack([np.ones(n_obs), X[:, selected + [idx]]])
+            coef, rss, _, _ = np.linalg.lstsq(A, y, rcond=None)
+            df = n_obs - A.shape[1]
+            cov = np.linalg.inv(A.T @ A) * (rss[0] / df)
+            t = coef[-1] / np.sqrt(cov[-1, -1])
+            p = 2 * stats.t.sf(abs(t), df)
+            if p < best_p:
+                best_p, best_idx = p, idx
+        if best_p >= significance_level:
+            break
+        selected.append(best_idx)
+        remaining.remove(best_idx)
+    return selected
+
+
+if __name__ == "__main__":
+    print(f"{'n_obs':>6} {'n_vars':>6} {'refit (ms)':>12} {'qr (ms)':>10} {'speedup':>8} {'same selection':>15}")
+    for n_obs, n_vars in SHAPES:
+        X, y = make_problem(n_obs, n_vars)
+        names = [f"x{i}" for i in range(n_vars)]
+
+        start = time.perf_counter()
+        reference = forward_refit(X, y, SIGNIFICANCE)
+        t_refit = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = forward_selection(StepwiseQR(X, y), names, SIGNIFICANCE)
+        t_qr = time.perf_counter() - start
+
+        same = result['selected_indices'] == reference
+        print(f"{n_obs:>6} {n_vars:>6} {t_refit * 1000:>12.1f} {t_qr * 1000:>10.1f} {t_refit / t_qr:>7.1f}x {str(same):>15}")
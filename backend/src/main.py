@@ -3,8 +3,11 @@ FastAPI Backend for Modelling Mate
 Main entry point - imports and registers all module routes
 """
 
+import os
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 # Import module routers
 from modules.prophet import routes as prophet_routes
@@ -13,13 +16,25 @@ from modules.regression import routes as regression_routes
 from modules.transformations import routes as transformation_routes
 from modules.feature_extraction import routes as feature_extraction_routes
 from modules.modelling import routes as modelling_routes
-
-# Try to import Prophet to check availability
-try:
-    from prophet import Prophet
-    PROPHET_AVAILABLE = True
-except ImportError:
-    PROPHET_AVAILABLE = False
+from modules.datasets import routes as dataset_routes
+from modules.jobs import routes as job_routes
+from modules.jobs.service import job_manager
+from modules.modelling.cache import transform_cache, model_store
+from modules.prophet.cache import prophet_cache
+from modules.prophet.batch import shutdown_pool as shutdown_prophet_pool
+from modules.log import configure_logging
+from modules.timing import TimingMiddleware, metrics
+from modules.lazy import is_available, readiness, start_warm_up
+
+configure_logging()
+
+# Checked without importing it; prophet is only imported by the first forecast
+PROPHET_AVAILABLE = is_available("prophet")
+
+# Preload the heavy scientific libraries in the background once the server is up
+# (WARMUP_ENABLED=0 leaves every import to the first request that needs it)
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "1") != "0"
+WARMUP_DELAY_SECONDS = float(os.environ.get("WARMUP_DELAY_SECONDS", "1.0"))
 
 app = FastAPI(title="Modelling Mate Backend", version="1.0.0")
 
@@ -30,8 +45,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Per-request stage timings (Server-Timing header, /metrics histograms)
+app.add_middleware(TimingMiddleware)
+
 # Register module routers
 app.include_router(prophet_routes.router, prefix="/api/prophet", tags=["Prophet"])
 app.include_router(correlation_routes.router, prefix="/api/correlation", tags=["Correlation"])
@@ -39,6 +58,22 @@ app.include_router(regression_routes.router, prefix="/api/regression", tags=["Re
 app.include_router(transformation_routes.router, prefix="/api/transform", tags=["Transformations"])
 app.include_router(feature_extraction_routes.router, prefix="/api/feature-extraction", tags=["Feature Extraction"])
 app.include_router(modelling_routes.router, prefix="/api/modelling", tags=["Modelling"])
+app.include_router(dataset_routes.router, prefix="/api/datasets", tags=["Datasets"])
+app.include_router(job_routes.router, prefix="/api/jobs", tags=["Jobs"])
+
+
+@app.on_event("startup")
+def warm_up_imports():
+    """Start the background import warm-up (delayed so the socket is listening first)"""
+    if WARMUP_ENABLED:
+        start_warm_up(WARMUP_DELAY_SECONDS)
+
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    """Stop background job and batch forecast workers"""
+    job_manager.shutdown()
+    shutdown_prophet_pool()
 
 
 # ============================================================================
@@ -58,24 +93,42 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    """Detailed health check"""
+    """Detailed health check, including which modules have their libraries imported"""
     return {
         "status": "healthy",
         "dependencies": {
             "prophet": PROPHET_AVAILABLE,
             "pandas": True,
             "numpy": True,
-            "scipy": True,
-            "sklearn": True
-        }
+            "scipy": is_available("scipy"),
+            "sklearn": is_available("sklearn"),
+            "xgboost": is_available("xgboost"),
+            "pyarrow": is_available("pyarrow")
+        },
+        "readiness": readiness(),
+        "caches": {
+            "modelling_transform": transform_cache.stats(),
+            "modelling_models": model_store.stats(),
+            "prophet_models": prophet_cache.stats()
+        },
+        "jobs": job_manager.stats()
     }
 
 
+@app.get("/metrics")
+def get_metrics(format: str = "prometheus"):
+    """Request and stage timing histograms (Prometheus text, or JSON with ?format=json)"""
+    if format == "json":
+        return JSONResponse(metrics.snapshot())
+    return PlainTextResponse(metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # ============================================================================
 # Run Server
 # ============================================================================
 
 if __name__ == "__main__":
+    import multiprocessing
     import uvicorn
     import socket
     import sys
@@ -91,11 +144,13 @@ if __name__ == "__main__":
                 continue
         raise RuntimeError(f"Could not find a free port between {start_port} and {start_port + max_attempts}")
 
+    # Needed for job worker processes in frozen (packaged) builds
+    multiprocessing.freeze_support()
+
     # Find a free port
     port = find_free_port()
 
     # Write port to a file so Electron can read it
-    import os
     port_file = os.path.join(os.path.dirname(__file__), 'backend_port.txt')
 
     # Ensure directory exists and is writable
@@ -76,6 +76,23 @@ a = Analysis(
         'starlette.routing',
         'starlette.middleware',
         'starlette.middleware.cors',
+        # Imported lazily through modules/lazy.py, so invisible to static analysis
+        # (keep in sync with MODULE_DEPENDENCIES there)
+        'scipy.stats',
+        'scipy.linalg',
+        'scipy.optimize',
+        'scipy.signal',
+        'scipy.fft',
+        'statsmodels.stats.diagnostic',
+        'statsmodels.stats.stattools',
+        'statsmodels.stats.outliers_influence',
+        'sklearn.model_selection',
+        'sklearn.ensemble',
+        'threadpoolctl',
+        'pyarrow',
+        'pyarrow.csv',
+        'pyarrow.ipc',
+        'pyarrow.parquet',
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,406 @@
+"""Array-form correlation statistics"""
+
+import numpy as np
+from ..lazy import lazy_import
+
+stats = lazy_import("scipy.stats")
+
+# Precision of the correlation matmuls (standardization is always done in float64)
+DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+
+def standardize(X: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """
+    Center each column and scale it to unit norm, so that Z.T @ Z is the correlation matrix
+
+    Zero-variance columns become NaN (their correlations are undefined).
+    """
+    X = np.asarray(X, dtype=float)
+    centered = X - X.mean(axis=0)
+    norms = np.linalg.norm(centered, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Z = centered / np.where(norms > 0, norms, np.nan)
+    return Z.astype(dtype, copy=False)
+
+
+def rank_columns(X: np.ndarray) -> np.ndarray:
+    """Rank each column (average ranks for ties, as pandas does for Spearman)"""
+    return stats.rankdata(X, axis=0)
+
+
+def pearson_matrix(X: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """Pearson correlation matrix of the columns of X"""
+    Z = standardize(X, dtype)
+    R = np.clip(Z.T @ Z, -1.0, 1.0).astype(float, copy=False)
+    diagonal = np.diag_indices_from(R)
+    R[diagonal] = np.where(np.isnan(R[diagonal]), np.nan, 1.0)
+    return R
+
+
+def spearman_matrix(X: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """Spearman rank correlation matrix: rank once, then the Pearson matmul"""
+    return pearson_matrix(rank_columns(X), dtype)
+
+
+def correlation_p_values(r: np.ndarray, n: int) -> np.ndarray:
+    """
+    Two-sided p-values for correlation coefficients from n observations (t-test, n - 2 df)
+
+    |r| = 1 gives p = 0; NaN correlations give NaN.
+    """
+    r = np.asarray(r, dtype=float)
+    if np.ndim(n) > 0:
+        # Per-pair sample sizes (pairwise-complete observations)
+        df = np.asarray(n, dtype=float) - 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_stat = np.abs(r) * np.sqrt(df / ((1.0 - r) * (1.0 + r)))
+        p_values = 2 * stats.t.sf(t_stat, np.maximum(df, 1))
+        p_values = np.where(np.abs(r) >= 1.0, 0.0, p_values)
+        return np.where(df < 1, np.where(np.isnan(r), np.nan, 1.0), p_values)
+
+    df = n - 2
+    if df < 1:
+        return np.where(np.isnan(r), np.nan, 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = np.abs(r) * np.sqrt(df / ((1.0 - r) * (1.0 + r)))
+    p_values = 2 * stats.t.sf(t_stat, df)
+    return np.where(np.abs(r) >= 1.0, 0.0, p_values)
+
+
+def correlate_with_target(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Correlation of every column of X with y as one standardized matrix-vector product"""
+    z = standardize(np.asarray(y, dtype=float)[:, None])[:, 0]
+    return np.clip(standardize(X).T @ z, -1.0, 1.0)
+
+
+def _tie_sums(X: np.ndarray):
+    """Per column: sums over tie groups of t(t-1), t(t-1)(t-2) and t(t-1)(2t+5)"""
+    n, m = X.shape
+    ordered = np.sort(X, axis=0)
+    new_group = np.ones((n, m), dtype=bool)
+    new_group[1:] = ordered[1:] != ordered[:-1]
+    group_ids = np.cumsum(new_group, axis=0) - 1 + np.arange(m) * n
+    t = np.bincount(group_ids.ravel(), minlength=n * m).reshape(m, n).astype(float)
+    return (
+        (t * (t - 1)).sum(axis=1),
+        (t * (t - 1) * (t - 2)).sum(axis=1),
+        (t * (t - 1) * (2 * t + 5)).sum(axis=1),
+    )
+
+
+def kendall_tau_with_target(X: np.ndarray, y: np.ndarray):
+    """
+    Kendall's tau-b of every column of X with y, with asymptotic (tie-corrected) p-values
+
+    Concordance is accumulated one observation at a time across all columns at
+    once, so the cost is O(n^2 * columns) with O(n * columns) memory. Matches
+    scipy.stats.kendalltau(method='asymptotic').
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n, m = X.shape
+
+    concordance = np.zeros(m)
+    for i in range(n - 1):
+        sign_y = np.sign(y[i + 1:] - y[i])
+        concordance += sign_y @ np.sign(X[i + 1:] - X[i])
+
+    n0 = n * (n - 1) / 2
+    x_tt, x_ttt, x_var = _tie_sums(X)
+    y_tt, y_ttt, y_var = (v[0] for v in _tie_sums(y[:, None]))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = concordance / np.sqrt((n0 - x_tt / 2) * (n0 - y_tt / 2))
+        variance = (
+            (n * (n - 1) * (2 * n + 5) - x_var - y_var) / 18
+            + x_ttt * y_ttt / (9 * n * (n - 1) * (n - 2))
+            + x_tt * y_tt / (2 * n * (n - 1))
+        )
+        z = concordance / np.sqrt(variance)
+    p_values = 2 * stats.norm.sf(np.abs(z))
+    p_values[np.isnan(tau)] = np.nan
+    return np.clip(tau, -1.0, 1.0), p_values
+
+
+def correlation_p_value_matrix(R: np.ndarray, n) -> np.ndarray:
+    """
+    p-value matrix for a symmetric correlation matrix, computed on the upper triangle only
+
+    `n` is the sample size, or a matrix of per-pair sample sizes.
+    """
+    k = R.shape[0]
+    rows, cols = np.triu_indices(k, 1)
+    P = np.zeros_like(R)
+    upper = correlation_p_values(R[rows, cols], n if np.ndim(n) == 0 else np.asarray(n)[rows, cols])
+    P[rows, cols] = upper
+    P[cols, rows] = upper
+    return P
+
+
+def upper_triangle(M: np.ndarray) -> np.ndarray:
+    """Condensed upper triangle (i < j, row-major) of a square matrix"""
+    return M[np.triu_indices(M.shape[0], 1)]
+
+
+# ----------------------------------------------------------------------------
+# Pairwise-complete observations (missing values)
+# ----------------------------------------------------------------------------
+
+def _masked_centered(X: np.ndarray):
+    """Observed-value mask (as floats) and X shifted by its column means, with missing values zeroed"""
+    observed = ~np.isnan(X)
+    counts = observed.sum(axis=0)
+    means = np.where(observed, X, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    return observed.astype(float), np.where(observed, X - means, 0.0)
+
+
+def pairwise_pearson(X: np.ndarray, Y: np.ndarray):
+    """
+    Pearson correlation of every column of X with every column of Y over pairwise-complete rows
+
+    Missing values (NaN) are zeroed and their masks enter the sums through matrix
+    products, so each pair's means and variances use exactly the rows where both
+    columns are observed. Returns (R, N): correlations and per-pair sample sizes.
+    Pairs with fewer than 2 common rows or zero variance on them give NaN.
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    # Centering on each column's own mean first limits cancellation in the raw moments
+    Mx, X0 = _masked_centered(X)
+    My, Y0 = _masked_centered(Y)
+
+    N = Mx.T @ My
+    sum_x = X0.T @ My
+    sum_y = Mx.T @ Y0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = sum_x / N
+        mean_y = sum_y / N
+        cov = X0.T @ Y0 - sum_x * mean_y
+        sq_x = (X0 * X0).T @ My
+        sq_y = Mx.T @ (Y0 * Y0)
+        var_x = sq_x - sum_x * mean_x
+        var_y = sq_y - sum_y * mean_y
+        eps = 8 * np.finfo(float).eps
+        defined = (N >= 2) & (var_x > eps * sq_x) & (var_y > eps * sq_y)
+        R = np.where(defined, cov / np.sqrt(var_x * var_y), np.nan)
+    return np.clip(R, -1.0, 1.0), N.astype(np.int64)
+
+
+def mask_groups(X: np.ndarray):
+    """Group the columns of X by missing-value pattern: [(observed row mask, column indices), ...]"""
+    observed = ~np.isnan(np.asarray(X, dtype=float))
+    patterns, inverse = np.unique(observed.T, axis=0, return_inverse=True)
+    inverse = np.ravel(inverse)
+    return [(patterns[g], np.flatnonzero(inverse == g)) for g in range(len(patterns))]
+
+
+def _rank_index(X: np.ndarray):
+    """Per-column sort order and tie-group bounds (in sorted positions), reused to rank any subset of rows"""
+    n = X.shape[0]
+    order = np.argsort(X, axis=0, kind='stable')
+    ordered = np.take_along_axis(X, order, axis=0)
+    positions = np.broadcast_to(np.arange(n)[:, None], X.shape)
+    new_group = np.ones(X.shape, dtype=bool)
+    new_group[1:] = ordered[1:] != ordered[:-1]
+    last_in_group = np.ones(X.shape, dtype=bool)
+    last_in_group[:-1] = new_group[1:]
+    group_start = np.maximum.accumulate(np.where(new_group, positions, 0), axis=0)
+    group_end = np.minimum.accumulate(np.where(last_in_group, positions, n - 1)[::-1], axis=0)[::-1]
+    return order, group_start, group_end
+
+
+def _subset_ranks(index, rows: np.ndarray) -> np.ndarray:
+    """
+    Average ranks of each column over the selected rows only, from a precomputed _rank_index
+
+    Counting the selected rows along each column's full sort order gives their
+    ordinal ranks in O(n); a tie group's average rank follows from the counts
+    at its first and last sorted positions.
+    """
+    order, group_start, group_end = index
+    kept = rows[order].astype(float)
+    counts = np.cumsum(kept, axis=0)
+    before = np.take_along_axis(counts - kept, group_start, axis=0)
+    through = np.take_along_axis(counts, group_end, axis=0)
+    ranks = np.empty(order.shape)
+    np.put_along_axis(ranks, order, (before + 1 + through) / 2, axis=0)
+    return ranks[rows]
+
+
+def pairwise_spearman(X: np.ndarray, Y: np.ndarray = None) -> np.ndarray:
+    """
+    Spearman correlation of the columns of X with the columns of Y over pairwise-complete rows
+
+    Ranks depend on which rows are kept, so columns are grouped by missing-value
+    pattern: for each pair of groups the shared rows are re-ranked (from each
+    column's sort order, computed once) and the whole block is correlated with
+    one matmul. Exact, like pandas' per-pair loop. With Y omitted, returns the
+    symmetric matrix of X with itself, computing each pair of groups once.
+    """
+    X = np.asarray(X, dtype=float)
+    symmetric = Y is None
+    Y = X if symmetric else np.asarray(Y, dtype=float)
+
+    def indexed(A):
+        return [(rows, cols, _rank_index(A[:, cols])) for rows, cols in mask_groups(A)]
+
+    groups_x = indexed(X)
+    groups_y = groups_x if symmetric else indexed(Y)
+    R = np.full((X.shape[1], Y.shape[1]), np.nan)
+    for gx, (rows_x, cols_x, index_x) in enumerate(groups_x):
+        for gy, (rows_y, cols_y, index_y) in enumerate(groups_y):
+            if symmetric and gy < gx:
+                continue
+            rows = rows_x & rows_y
+            if rows.sum() < 2:
+                continue
+            Zx = standardize(_subset_ranks(index_x, rows))
+            Zy = Zx if symmetric and gx == gy else standardize(_subset_ranks(index_y, rows))
+            block = np.clip(Zx.T @ Zy, -1.0, 1.0)
+            R[np.ix_(cols_x, cols_y)] = block
+            if symmetric:
+                R[np.ix_(cols_y, cols_x)] = block.T
+    return R
+
+
+def pairwise_kendall_with_target(X: np.ndarray, y: np.ndarray):
+    """kendall_tau_with_target over the rows where both the column and y are observed"""
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    tau = np.full(X.shape[1], np.nan)
+    p_values = np.full(X.shape[1], np.nan)
+    # Rows where y is missing never count, so group by the column masks restricted to observed y
+    observed_y = ~np.isnan(y)
+    X, y = X[observed_y], y[observed_y]
+    for rows, cols in mask_groups(X):
+        if rows.sum() < 2:
+            continue
+        tau[cols], p_values[cols] = kendall_tau_with_target(X[np.ix_(rows, cols)], y[rows])
+    return tau, p_values
+
+
+def _set_diagonal(R: np.ndarray) -> np.ndarray:
+    diagonal = np.diag_indices_from(R)
+    R[diagonal] = np.where(np.isnan(R[diagonal]), np.nan, 1.0)
+    return R
+
+
+def pairwise_pearson_matrix(X: np.ndarray):
+    """Pairwise-complete Pearson matrix of the columns of X, with the per-pair sample sizes"""
+    R, N = pairwise_pearson(X, X)
+    R = (R + R.T) / 2  # Exactly symmetric despite rounding
+    return _set_diagonal(R), N
+
+
+def pairwise_spearman_matrix(X: np.ndarray) -> np.ndarray:
+    """Pairwise-complete Spearman matrix of the columns of X"""
+    return _set_diagonal(pairwise_spearman(X))
+
+
+# ----------------------------------------------------------------------------
+# Blocked (memory-bounded) sparse outputs
+# ----------------------------------------------------------------------------
+
+def _tiles(k: int, block_size: int):
+    for start in range(0, k, block_size):
+        yield start, min(start + block_size, k)
+
+
+def top_k_correlations(Z: np.ndarray, top_k: int, block_size: int = 512):
+    """
+    Top-k absolute correlations per column of a standardized matrix Z, tile by tile
+
+    Only a block_size x block_size tile plus the running top-k of one row block is
+    ever held, so memory does not grow with k^2. Returns (source, target, r) with
+    pairs grouped by source and sorted by |r| descending; self-pairs and undefined
+    (NaN) correlations are skipped.
+    """
+    k = Z.shape[1]
+    top_k = min(top_k, max(k - 1, 0))
+    sources, targets, values = [], [], []
+    if top_k == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=float)
+
+    for row_start, row_stop in _tiles(k, block_size):
+        Z_rows = Z[:, row_start:row_stop]
+        n_rows = row_stop - row_start
+        best_abs = np.full((n_rows, top_k), -np.inf, dtype=Z.dtype)
+        best_r = np.zeros((n_rows, top_k), dtype=Z.dtype)
+        best_idx = np.full((n_rows, top_k), -1, dtype=np.int64)
+
+        for col_start, col_stop in _tiles(k, block_size):
+            tile = Z_rows.T @ Z[:, col_start:col_stop]
+            tile_abs = np.abs(tile)
+            tile_abs[np.isnan(tile_abs)] = -np.inf
+            # Exclude self-correlations where the row and column ranges overlap
+            overlap = np.arange(max(row_start, col_start), min(row_stop, col_stop))
+            tile_abs[overlap - row_start, overlap - col_start] = -np.inf
+
+            # Reduce the tile to its own top-k per row before merging with the running best
+            if tile.shape[1] > top_k:
+                tile_keep = np.argpartition(-tile_abs, top_k - 1, axis=1)[:, :top_k]
+                tile_abs = np.take_along_axis(tile_abs, tile_keep, axis=1)
+                tile = np.take_along_axis(tile, tile_keep, axis=1)
+                tile_idx = tile_keep + col_start
+            else:
+                tile_idx = np.broadcast_to(np.arange(col_start, col_stop), tile.shape)
+
+            cand_abs = np.concatenate([best_abs, tile_abs], axis=1)
+            cand_r = np.concatenate([best_r, tile], axis=1)
+            cand_idx = np.concatenate([best_idx, tile_idx], axis=1)
+            keep = np.argpartition(-cand_abs, top_k - 1, axis=1)[:, :top_k]
+            best_abs = np.take_along_axis(cand_abs, keep, axis=1)
+            best_r = np.take_along_axis(cand_r, keep, axis=1)
+            best_idx = np.take_along_axis(cand_idx, keep, axis=1)
+
+        order = np.argsort(-best_abs, axis=1, kind='stable')
+        best_abs = np.take_along_axis(best_abs, order, axis=1)
+        best_r = np.take_along_axis(best_r, order, axis=1)
+        best_idx = np.take_along_axis(best_idx, order, axis=1)
+
+        valid = np.isfinite(best_abs)
+        row_ids = np.broadcast_to(np.arange(row_start, row_stop)[:, None], best_idx.shape)
+        sources.append(row_ids[valid])
+        targets.append(best_idx[valid])
+        values.append(best_r[valid].astype(float))
+
+    return np.concatenate(sources), np.concatenate(targets), np.concatenate(values)
+
+
+def threshold_correlations(Z: np.ndarray, threshold: float, block_size: int = 512, max_pairs: int = 1_000_000):
+    """
+    Pairs i < j with |r| >= threshold, computed over upper-triangle tiles of a standardized Z
+
+    Raises ValueError if more than max_pairs pairs qualify.
+    """
+    k = Z.shape[1]
+    sources, targets, values = [], [], []
+    n_pairs = 0
+
+    for row_start, row_stop in _tiles(k, block_size):
+        Z_rows = Z[:, row_start:row_stop]
+        for col_start, col_stop in _tiles(k, block_size):
+            if col_stop <= row_start:
+                continue
+            tile = Z_rows.T @ Z[:, col_start:col_stop]
+            with np.errstate(invalid='ignore'):
+                hits = np.abs(tile) >= threshold
+            if col_start < row_stop:
+                # Tile straddles the diagonal: keep global column > global row only
+                rows = np.arange(row_start, row_stop)[:, None]
+                cols = np.arange(col_start, col_stop)[None, :]
+                hits &= cols > rows
+
+            i, j = np.nonzero(hits)
+            n_pairs += len(i)
+            if n_pairs > max_pairs:
+                raise ValueError(
+                    f"More than {max_pairs} pairs have |r| >= {threshold}; raise the threshold or use top_k"
+                )
+            sources.append(i + row_start)
+            targets.append(j + col_start)
+            values.append(tile[i, j].astype(float))
+
+    if not sources:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=float)
+    return np.concatenate(sources), np.concatenate(targets), np.concatenate(values)
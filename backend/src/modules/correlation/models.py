@@ -1,15 +1,47 @@
 """Data models for Correlation module"""
 
 from pydantic import BaseModel
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 class CorrelationRequest(BaseModel):
     """Request model for correlation analysis"""
-    variables: Dict[str, List[float]]  # {name: values}
+    variables: Optional[Dict[str, List[Optional[float]]]] = None  # {name: values}; null marks a missing value
+    dataset_id: Optional[str] = None  # Registered dataset instead of raw variables
+    columns: Optional[List[str]] = None  # Columns of the dataset to use (default: all numeric)
+    output: str = "nested"  # nested ({var: {var: value}}) or matrix (variables + 2-D arrays)
+    upper_triangle: bool = False  # Only pairs i < j (nested: later variables; matrix: condensed 1-D arrays)
+    mode: str = "dense"  # dense (full matrices), top_k (per variable) or threshold (pairs with |r| >= threshold)
+    method: str = "pearson"  # Correlation used by the top_k/threshold modes: pearson or spearman
+    top_k: int = 10  # Strongest absolute correlations kept per variable in top_k mode
+    threshold: float = 0.7  # Minimum |r| in threshold mode
+    max_pairs: int = 1000000  # Threshold mode fails rather than return more pairs than this
+    block_size: int = 512  # Column tile size; bounds peak memory in top_k/threshold modes
+    dtype: str = "float64"  # float64 or float32 correlation matmuls
+    missing: str = "listwise"  # listwise (drop rows with any NaN) or pairwise (per-pair complete rows; dense mode)
 
 
 class CorrelationRankedRequest(BaseModel):
     """Request model for ranked correlation analysis with a target variable"""
     target_variable: str
-    variables: Dict[str, List[float]]  # {name: values} - includes target
+    variables: Optional[Dict[str, List[Optional[float]]]] = None  # {name: values} - includes target; null = missing
+    dataset_id: Optional[str] = None  # Registered dataset instead of raw variables
+    columns: Optional[List[str]] = None  # Columns of the dataset to use (default: all numeric)
+    methods: List[str] = ["pearson"]  # Any of pearson, spearman, kendall
+    rank_by: str = "pearson"  # Method whose |r| orders the results (must be in methods)
+    missing: str = "listwise"  # listwise (drop rows with any NaN) or pairwise (rows where target and variable are both observed)
+
+
+class CorrelationScanRequest(BaseModel):
+    """Request model for scanning lag x adstock x diminishing-returns settings against a KPI"""
+    kpi: str
+    variables: Optional[Dict[str, List[float]]] = None  # {name: values} - includes the KPI
+    dataset_id: Optional[str] = None  # Registered dataset instead of raw variables
+    candidates: Optional[List[str]] = None  # Variables to scan (default: every numeric column but the KPI)
+    max_lag: int = 8  # Lags 0..max_lag (zero-filled, as the lag transformation)
+    adstock_rates: List[float] = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+    dimret_rates: List[float] = [0.0]  # Diminishing-returns percentages; 0 = none
+    dimret_adstock: bool = False  # Combined adstock + diminishing returns (as VariableTransformation)
+    best_by: str = "abs"  # abs (largest |r|) or positive (largest r) picks each variable's best cell
+    include_grid: bool = True  # Return every variable's full (lag, adstock, dimret) grid
+
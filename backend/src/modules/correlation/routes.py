@@ -1,14 +1,16 @@
 """Correlation API routes"""
 
-from fastapi import APIRouter
-from .models import CorrelationRequest, CorrelationRankedRequest
-from .service import correlation_matrix_logic, correlation_ranked_logic
+from fastapi import APIRouter, Header
+from typing import Optional
+from .models import CorrelationRequest, CorrelationRankedRequest, CorrelationScanRequest
+from .service import correlation_matrix_logic, correlation_ranked_logic, correlation_scan_logic
+from ..encoding import encode_response
 
 router = APIRouter()
 
 
 @router.post("/matrix")
-async def correlation_matrix(request: CorrelationRequest):
+def correlation_matrix(request: CorrelationRequest, accept: Optional[str] = Header(None)):
     """
     Calculate correlation matrix with additional statistics
 
@@ -17,11 +19,11 @@ async def correlation_matrix(request: CorrelationRequest):
         - spearman: Spearman rank correlation
         - p_values: Statistical significance
     """
-    return correlation_matrix_logic(request)
+    return encode_response(correlation_matrix_logic(request), accept)
 
 
 @router.post("/ranked")
-async def correlation_ranked(request: CorrelationRankedRequest):
+def correlation_ranked(request: CorrelationRankedRequest, accept: Optional[str] = Header(None)):
     """
     Calculate correlations between a target variable and all other variables,
     returning results ranked by correlation strength.
@@ -30,4 +32,16 @@ async def correlation_ranked(request: CorrelationRankedRequest):
         - correlations: List of correlations ranked by absolute value
         - Each item contains: variable, correlation, p_value, strength
     """
-    return correlation_ranked_logic(request)
+    return encode_response(correlation_ranked_logic(request), accept)
+
+
+@router.post("/scan")
+def correlation_scan(request: CorrelationScanRequest, accept: Optional[str] = Header(None)):
+    """
+    Correlate a KPI with every candidate under a lag x adstock x diminishing-returns grid
+
+    Returns:
+        - results: Per variable, the best (lag, adstock, dimret) cell and its
+          correlation, plus the full grid unless include_grid is false
+    """
+    return encode_response(correlation_scan_logic(request), accept)
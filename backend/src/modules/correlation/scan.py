@@ -0,0 +1,147 @@
+"""Correlation of a KPI with lagged / adstocked / diminishing-returns versions of candidate variables"""
+
+import numpy as np
+from ..lazy import lazy_import
+
+fft = lazy_import("scipy.fft")
+signal = lazy_import("scipy.signal")
+
+# Upper bound on lags x rows x variables held at once when evaluating dimret planes
+MAX_BLOCK_ELEMENTS = 2_000_000
+
+
+def adstock_bank(X: np.ndarray, rates) -> np.ndarray:
+    """
+    Adstock every column of X at every rate: y[t] = x[t] + rate * y[t - 1]
+
+    One linear-filter call per rate covers all columns. Returns (rates, rows, columns).
+    """
+    return np.stack([signal.lfilter([1.0], [1.0, -rate], X, axis=0) if rate else X for rate in rates])
+
+
+def lagged_moments(A: np.ndarray, max_lag: int):
+    """
+    Sum and sum of squares of every column of A after each zero-filled lag 0..max_lag
+
+    A lag of L keeps A[:n - L], so both come from prefix sums. Returns two
+    (max_lag + 1, columns) arrays.
+    """
+    n = A.shape[0]
+    prefix = np.cumsum(A, axis=0)
+    prefix_sq = np.cumsum(A * A, axis=0)
+    ends = n - 1 - np.arange(max_lag + 1)
+    return prefix[ends], prefix_sq[ends]
+
+
+def lagged_cross_products(A: np.ndarray, y: np.ndarray, max_lag: int) -> np.ndarray:
+    """
+    sum_t y[t] * A[t - L] for every lag 0..max_lag and column, by FFT cross-correlation
+
+    Returns (max_lag + 1, columns).
+    """
+    n = A.shape[0]
+    size = fft.next_fast_len(2 * n - 1, real=True)
+    spectrum = np.conj(fft.rfft(A, size, axis=0)) * fft.rfft(y, size)[:, None]
+    return fft.irfft(spectrum, size, axis=0)[:max_lag + 1]
+
+
+def _correlation(sum_xy, sum_x, sum_xx, y_sum, y_ss_centered, n):
+    """Pearson r from raw moments of x against a y whose sum and centered sum of squares are known"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * y_sum / n
+        var_x = sum_xx - sum_x * sum_x / n
+        defined = var_x > 8 * np.finfo(float).eps * np.abs(sum_xx)
+        r = np.where(defined, cov / np.sqrt(var_x * y_ss_centered), np.nan)
+    return np.clip(r, -1.0, 1.0)
+
+
+def _lag_gather(A: np.ndarray, max_lag: int) -> np.ndarray:
+    """Zero-filled lagged copies of every column of A: (max_lag + 1, rows, columns)"""
+    n = A.shape[0]
+    source = np.arange(n)[None, :] - np.arange(max_lag + 1)[:, None]
+    return np.where((source >= 0)[:, :, None], A[np.clip(source, 0, None)], 0.0)
+
+
+def _positive_means(A: np.ndarray, max_lag: int) -> np.ndarray:
+    """Mean of the positive values of each column after each lag (NaN if there are none)"""
+    positive = A > 0
+    sums, _ = lagged_moments(np.where(positive, A, 0.0), max_lag)
+    counts, _ = lagged_moments(positive.astype(float), max_lag)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def lag_adstock_dimret_grid(
+    X: np.ndarray,
+    y: np.ndarray,
+    max_lag: int,
+    adstock_rates,
+    dimret_rates,
+    dimret_adstock: bool = False
+) -> np.ndarray:
+    """
+    Correlation of y with every column of X under each lag x adstock x dimret setting
+
+    Cell values equal the Pearson correlation of y with
+    apply_variable_transformation(x, lag=L, adstock=rate, dimret=d,
+    dimret_adstock=dimret_adstock). Lags zero-fill, so for the linear (d = 0)
+    plane one FFT cross-correlation per adstock rate gives every lag at once.
+    With d > 0 the diminishing-returns alpha depends on the lagged series, so
+    those planes are evaluated directly on the lagged copies, in blocks of
+    columns. Returns (columns, lags, adstock rates, dimret rates); undefined
+    (constant) cells are NaN.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n, n_vars = X.shape
+    n_lags = max_lag + 1
+    grid = np.full((n_vars, n_lags, len(adstock_rates), len(dimret_rates)), np.nan)
+
+    y_sum = y.sum()
+    y_centered = y - y.mean()
+    y_ss = float(y_centered @ y_centered)
+    if y_ss <= 0:
+        return grid
+
+    adstocked = adstock_bank(X, adstock_rates)
+    linear = [k for k, d in enumerate(dimret_rates) if d == 0]
+    nonlinear = [k for k, d in enumerate(dimret_rates) if d != 0]
+
+    # Linear plane for every rate: (rates, lags, columns)
+    linear_r = np.empty((len(adstock_rates), n_lags, n_vars))
+    for a, A in enumerate(adstocked):
+        sum_x, sum_xx = lagged_moments(A, max_lag)
+        linear_r[a] = _correlation(lagged_cross_products(A, y, max_lag), sum_x, sum_xx, y_sum, y_ss, n)
+    grid[..., linear] = linear_r.transpose(2, 1, 0)[..., None]
+
+    # The combined transform derives alpha from the lagged series before adstock,
+    # the separate one from the lagged, adstocked series
+    block = max(1, MAX_BLOCK_ELEMENTS // (n_lags * n))
+    for start in range(0, n_vars if nonlinear else 0, block):
+        cols = slice(start, min(start + block, n_vars))
+        if dimret_adstock:
+            base_means = _positive_means(X[:, cols], max_lag)
+            base_sums, _ = lagged_moments(X[:, cols], max_lag)
+
+        for a, A in enumerate(adstocked):
+            lagged = _lag_gather(A[:, cols], max_lag)
+            if dimret_adstock:
+                means, sums = base_means, base_sums
+            else:
+                means = _positive_means(A[:, cols], max_lag)
+                sums, _ = lagged_moments(A[:, cols], max_lag)
+            usable = (sums != 0) & (means > 0)
+            # Without a usable alpha the combined transform leaves the adstocked series
+            # as it is; the separate one returns zeros (undefined correlation)
+            fallback = linear_r[a][:, cols] if dimret_adstock else np.nan
+
+            for k in nonlinear:
+                with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                    alpha = np.where(usable, -np.log(1 - dimret_rates[k]) / means, 0.0)
+                    S = 1 - np.exp(-lagged * alpha[:, None, :])
+                r = _correlation(
+                    np.einsum('lnv,n->lv', S, y), S.sum(axis=1), np.einsum('lnv,lnv->lv', S, S), y_sum, y_ss, n
+                )
+                grid[cols, :, a, k] = np.where(usable, r, fallback).T
+
+    return grid
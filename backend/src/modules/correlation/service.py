@@ -1,11 +1,95 @@
 """Correlation analysis service logic"""
 
-import pandas as pd
+import logging
 import numpy as np
-import sys
-import traceback
 from fastapi import HTTPException
-from scipy import stats
+from ..datasets.service import resolve_dataframe
+from .engine import (
+    DTYPES, pearson_matrix, spearman_matrix, correlation_p_value_matrix, correlation_p_values, upper_triangle,
+    standardize, rank_columns, top_k_correlations, threshold_correlations, correlate_with_target,
+    kendall_tau_with_target, pairwise_pearson, pairwise_spearman, pairwise_kendall_with_target,
+    pairwise_pearson_matrix, pairwise_spearman_matrix
+)
+from .scan import lag_adstock_dimret_grid
+from ..timing import stage
+
+OUTPUT_FORMATS = ['nested', 'matrix']
+RANKED_METHODS = ['pearson', 'spearman', 'kendall']
+MODES = ['dense', 'top_k', 'threshold']
+SPARSE_METHODS = ['pearson', 'spearman']
+MISSING_MODES = ['listwise', 'pairwise']
+SCAN_BEST_BY = ['abs', 'positive']
+
+logger = logging.getLogger(__name__)
+
+
+def _nested(matrix, variables, upper=False):
+    """{variable: {variable: value}} (pandas to_dict layout); upper keeps only later variables"""
+    rows = matrix.tolist()
+    if upper:
+        return {name: dict(zip(variables[i + 1:], row[i + 1:])) for i, (name, row) in enumerate(zip(variables, rows))}
+    return {name: dict(zip(variables, row)) for name, row in zip(variables, rows)}
+
+
+def _strength_labels(abs_r):
+    """Strong / Moderate / Weak / Very Weak for each absolute correlation"""
+    return np.select(
+        [abs_r >= 0.7, abs_r >= 0.4, abs_r >= 0.2],
+        ["Strong", "Moderate", "Weak"],
+        default="Very Weak"
+    ).tolist()
+
+
+def _validate_matrix_request(request):
+    if request.output not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown output '{request.output}'. Available: {OUTPUT_FORMATS}")
+    if request.mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown mode '{request.mode}'. Available: {MODES}")
+    if request.method not in SPARSE_METHODS:
+        raise HTTPException(status_code=400, detail=f"Unknown method '{request.method}'. Available: {SPARSE_METHODS}")
+    if request.dtype not in DTYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown dtype '{request.dtype}'. Available: {list(DTYPES)}")
+    if request.top_k < 1 or request.block_size < 1:
+        raise HTTPException(status_code=400, detail="'top_k' and 'block_size' must be at least 1")
+    _validate_missing(request.missing)
+    if request.missing == "pairwise" and request.mode != "dense":
+        raise HTTPException(status_code=400, detail="missing='pairwise' is only available in dense mode")
+
+
+def _validate_missing(missing):
+    if missing not in MISSING_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown missing '{missing}'. Available: {MISSING_MODES}")
+
+
+def sparse_correlations(values, variables, request):
+    """
+    top_k / threshold modes: only the selected pairs are ever materialized
+
+    Returns pairs as parallel arrays (indices into `variables`).
+    """
+    n = len(values)
+    if request.method == "spearman":
+        values = rank_columns(values)
+    Z = standardize(values, DTYPES[request.dtype])
+
+    if request.mode == "top_k":
+        source, target, r = top_k_correlations(Z, request.top_k, request.block_size)
+    else:
+        source, target, r = threshold_correlations(Z, request.threshold, request.block_size, request.max_pairs)
+    r = np.clip(r, -1.0, 1.0)
+
+    return {
+        "mode": request.mode,
+        "method": request.method,
+        "variables": variables,
+        "n_samples": int(n),
+        "pairs": {
+            "source": source,
+            "target": target,
+            "correlation": r,
+            "p_value": correlation_p_values(r, n)
+        }
+    }
 
 
 def correlation_matrix_logic(request):
@@ -16,47 +100,82 @@ def correlation_matrix_logic(request):
         - pearson: Pearson correlation coefficients
         - spearman: Spearman rank correlation
         - p_values: Statistical significance
+
+    `output="matrix"` returns the variables list plus 2-D arrays; with
+    `upper_triangle` only pairs i < j are returned.
+
+    `mode="top_k"` / `mode="threshold"` instead return a sparse list of pairs
+    (strongest per variable, or |r| >= threshold), computed over column tiles
+    so memory is bounded by block_size rather than the number of variables squared.
+
+    `missing="pairwise"` keeps every row and computes each pair over the rows
+    where both variables are observed (through mask matrix products rather than
+    a per-pair loop); p-values then use each pair's own n, returned as `sample_sizes`.
     """
     try:
-        # Convert to DataFrame
-        df = pd.DataFrame(request.variables)
+        _validate_matrix_request(request)
+
+        # Convert to DataFrame (raw variables or registered dataset)
+        with stage("correlation.load"):
+            df = resolve_dataframe(request.variables, request.dataset_id, request.columns, numeric_only=True)
 
-        # Remove NaN values
-        df = df.dropna()
+        # Remove NaN values: whole rows (listwise) or, pairwise, only rows with nothing observed
+        df = df.dropna(how="all" if request.missing == "pairwise" else "any")
 
         if len(df) < 2:
             raise HTTPException(status_code=400, detail="Insufficient valid data points")
 
-        # Calculate correlations
-        pearson = df.corr(method='pearson')
-        spearman = df.corr(method='spearman')
-
-        # Calculate p-values
         n = len(df)
-        p_values = {}
-        for col1 in df.columns:
-            p_values[col1] = {}
-            for col2 in df.columns:
-                if col1 == col2:
-                    p_values[col1][col2] = 0.0
-                else:
-                    r = pearson.loc[col1, col2]
-                    # T-statistic for correlation
-                    t_stat = r * np.sqrt(n - 2) / np.sqrt(1 - r**2)
-                    p_val = 2 * (1 - stats.t.cdf(abs(t_stat), n - 2))
-                    p_values[col1][col2] = float(p_val)
+        variables = [str(col) for col in df.columns]
+        values = df.to_numpy(dtype=float)
 
-        return {
-            "pearson": pearson.to_dict(),
-            "spearman": spearman.to_dict(),
-            "p_values": p_values,
+        if request.mode != "dense":
+            with stage("correlation.compute"):
+                return sparse_correlations(values, variables, request)
+
+        # Correlations and p-values as array operations
+        with stage("correlation.compute"):
+            sample_sizes = None
+            if request.missing == "pairwise":
+                pearson, sample_sizes = pairwise_pearson_matrix(values)
+                spearman = pairwise_spearman_matrix(values)
+                p_values = correlation_p_value_matrix(pearson, sample_sizes)
+            else:
+                dtype = DTYPES[request.dtype]
+                pearson = pearson_matrix(values, dtype)
+                spearman = spearman_matrix(values, dtype)
+                p_values = correlation_p_value_matrix(pearson, n)
+
+        if request.output == "matrix":
+            matrices = {"pearson": pearson, "spearman": spearman, "p_values": p_values}
+            if sample_sizes is not None:
+                matrices["sample_sizes"] = sample_sizes
+            if request.upper_triangle:
+                matrices = {key: upper_triangle(M) for key, M in matrices.items()}
+            return {
+                **matrices,
+                "n_samples": int(n),
+                "variables": variables,
+                "upper_triangle": request.upper_triangle
+            }
+
+        result = {
+            "pearson": _nested(pearson, variables, request.upper_triangle),
+            "spearman": _nested(spearman, variables, request.upper_triangle),
+            "p_values": _nested(p_values, variables, request.upper_triangle),
             "n_samples": int(n),
-            "variables": list(df.columns)
+            "variables": variables
         }
+        if sample_sizes is not None:
+            result["sample_sizes"] = _nested(sample_sizes, variables, request.upper_triangle)
+        return result
 
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Correlation matrix error: {str(e)}", file=sys.stderr)
-        traceback.print_exc()
+        logger.exception("Correlation matrix error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -68,75 +187,87 @@ def correlation_ranked_logic(request):
     Returns:
         - correlations: List of correlations ranked by absolute value
         - Each item contains: variable, correlation, p_value, strength
+          (for `rank_by`, Pearson by default), plus `<method>` and
+          `<method>_p_value` for any other requested methods
+        - With `missing="pairwise"`, each item also has its own `n_samples`
+          (rows where both the target and the variable are observed)
     """
     try:
-        # Convert to DataFrame
-        df = pd.DataFrame(request.variables)
-
-        # Remove rows with NaN values
-        df = df.dropna()
-
-        if len(df) < 2:
-            raise HTTPException(status_code=400, detail="Insufficient valid data points")
+        # Convert to DataFrame (raw variables or registered dataset)
+        with stage("correlation.load"):
+            df = resolve_dataframe(request.variables, request.dataset_id, request.columns, numeric_only=True)
 
         # Check if target variable exists
         if request.target_variable not in df.columns:
             raise HTTPException(status_code=400, detail=f"Target variable '{request.target_variable}' not found")
 
-        # Get target variable
-        target = df[request.target_variable]
+        # Remove rows with NaN values: any column (listwise) or, pairwise, just the target
+        _validate_missing(request.missing)
+        pairwise = request.missing == "pairwise"
+        df = df[df[request.target_variable].notna()] if pairwise else df.dropna()
 
-        # Calculate correlations with all other variables
-        correlations = []
+        if len(df) < 2:
+            raise HTTPException(status_code=400, detail="Insufficient valid data points")
+
+        methods = list(dict.fromkeys(request.methods))
+        unknown = [method for method in methods if method not in RANKED_METHODS]
+        if unknown or request.rank_by not in methods:
+            raise HTTPException(
+                status_code=400,
+                detail=f"methods must be drawn from {RANKED_METHODS} and include rank_by ('{request.rank_by}')"
+            )
+
+        # Target vs every other column in array form
         n = len(df)
+        others = [col for col in df.columns.tolist() if col != request.target_variable]
+        variables = [str(col) for col in others]
+        X = df[others].to_numpy(dtype=float)
+        y = df[request.target_variable].to_numpy(dtype=float)
 
-        for col in df.columns:
-            if col != request.target_variable:
-                # Calculate Pearson correlation
-                r = df[col].corr(target)
-
-                # Skip if correlation is NaN (happens with zero variance)
-                if pd.isna(r) or np.isnan(r):
-                    continue
-
-                # Calculate p-value
-                if abs(r) < 1.0:  # Avoid division by zero
-                    try:
-                        t_stat = r * np.sqrt(n - 2) / np.sqrt(1 - r**2)
-                        if np.isnan(t_stat) or np.isinf(t_stat):
-                            p_val = 1.0
-                        else:
-                            p_val = 2 * (1 - stats.t.cdf(abs(t_stat), n - 2))
-                    except:
-                        p_val = 1.0
-                else:
-                    p_val = 0.0
-
-                # Determine strength
-                abs_r = abs(r)
-                if abs_r >= 0.7:
-                    strength = "Strong"
-                elif abs_r >= 0.4:
-                    strength = "Moderate"
-                elif abs_r >= 0.2:
-                    strength = "Weak"
-                else:
-                    strength = "Very Weak"
-
-                correlations.append({
-                    "variable": col,
-                    "correlation": float(r) if not np.isnan(r) else 0.0,
-                    "p_value": float(p_val) if not np.isnan(p_val) else 1.0,
-                    "strength": strength,
-                    "abs_correlation": abs_r
-                })
-
-        # Sort by absolute correlation (highest to lowest)
-        correlations.sort(key=lambda x: x['abs_correlation'], reverse=True)
-
-        # Remove abs_correlation from output (it was just for sorting)
-        for item in correlations:
-            del item['abs_correlation']
+        with stage("correlation.compute"):
+            results = {}
+            if pairwise:
+                sample_sizes = (~np.isnan(X)).sum(axis=0)
+                if "pearson" in methods:
+                    r = pairwise_pearson(X, y[:, None])[0][:, 0]
+                    results["pearson"] = (r, correlation_p_values(r, sample_sizes))
+                if "spearman" in methods:
+                    r = pairwise_spearman(X, y[:, None])[:, 0]
+                    results["spearman"] = (r, correlation_p_values(r, sample_sizes))
+                if "kendall" in methods:
+                    results["kendall"] = pairwise_kendall_with_target(X, y)
+            else:
+                if "pearson" in methods:
+                    r = correlate_with_target(X, y)
+                    results["pearson"] = (r, correlation_p_values(r, n))
+                if "spearman" in methods:
+                    r = correlate_with_target(rank_columns(X), rank_columns(y[:, None])[:, 0])
+                    results["spearman"] = (r, correlation_p_values(r, n))
+                if "kendall" in methods:
+                    results["kendall"] = kendall_tau_with_target(X, y)
+
+        # Rank by absolute correlation (highest to lowest), skipping undefined (zero-variance) ones
+        r_rank, p_rank = results[request.rank_by]
+        valid = np.flatnonzero(~np.isnan(r_rank))
+        order = valid[np.argsort(-np.abs(r_rank[valid]), kind='stable')]
+        strengths = _strength_labels(np.abs(r_rank))
+
+        correlations = []
+        for idx in order.tolist():
+            item = {
+                "variable": variables[idx],
+                "correlation": float(r_rank[idx]),
+                "p_value": float(p_rank[idx]) if not np.isnan(p_rank[idx]) else 1.0,
+                "strength": strengths[idx]
+            }
+            if pairwise:
+                item["n_samples"] = int(sample_sizes[idx])
+            for method in methods:
+                if method != request.rank_by:
+                    r, p = results[method]
+                    item[method] = float(r[idx]) if not np.isnan(r[idx]) else None
+                    item[f"{method}_p_value"] = float(p[idx]) if not np.isnan(p[idx]) else None
+            correlations.append(item)
 
         return {
             "target_variable": request.target_variable,
@@ -144,7 +275,109 @@ def correlation_ranked_logic(request):
             "n_samples": int(n)
         }
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Ranked correlation error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _validate_scan_request(request, n_obs):
+    if request.best_by not in SCAN_BEST_BY:
+        raise HTTPException(status_code=400, detail=f"Unknown best_by '{request.best_by}'. Available: {SCAN_BEST_BY}")
+    if not 0 <= request.max_lag < n_obs:
+        raise HTTPException(status_code=400, detail=f"'max_lag' must be between 0 and {n_obs - 1}")
+    if not request.adstock_rates or not request.dimret_rates:
+        raise HTTPException(status_code=400, detail="'adstock_rates' and 'dimret_rates' must not be empty")
+    rates = list(request.adstock_rates) + list(request.dimret_rates)
+    if any(not 0 <= rate < 1 for rate in rates):
+        raise HTTPException(status_code=400, detail="Adstock and dimret rates must be in [0, 1)")
+
+
+def correlation_scan_logic(request):
+    """
+    Correlate a KPI with every candidate variable under a grid of transformations
+
+    Each cell is the Pearson correlation of the KPI with the candidate after
+    lag L, adstock rate a and diminishing returns d, applied as the modelling
+    transformations do (lag zero-fills, then adstock and dimret). The whole
+    lag x adstock x dimret grid for all candidates comes from one call instead
+    of one transform-and-correlate round trip per setting.
+
+    Returns:
+        - lags, adstock_rates, dimret_rates: The grid axes
+        - results: Per variable, the best cell (lag, adstock, dimret,
+          correlation, p_value) and, with include_grid, the full grid
+          indexed [lag][adstock][dimret]; ordered by best correlation
+    """
+    try:
+        columns = None
+        if request.candidates is not None:
+            columns = [request.kpi] + [col for col in request.candidates if col != request.kpi]
+        with stage("correlation.load"):
+            df = resolve_dataframe(request.variables, request.dataset_id, columns, numeric_only=True)
+
+        if request.kpi not in df.columns:
+            raise HTTPException(status_code=400, detail=f"KPI '{request.kpi}' not found")
+        candidates = [col for col in df.columns.tolist() if col != request.kpi]
+        if not candidates:
+            raise HTTPException(status_code=400, detail="No candidate variables to scan")
+
+        values = df.to_numpy(dtype=float)
+        if not np.isfinite(values).all():
+            raise HTTPException(status_code=400, detail="The KPI and candidates must not contain missing or infinite values")
+        n = len(df)
+        if n < 3:
+            raise HTTPException(status_code=400, detail="Insufficient valid data points")
+        _validate_scan_request(request, n)
+
+        kpi_index = df.columns.get_loc(request.kpi)
+        y = values[:, kpi_index]
+        X = np.delete(values, kpi_index, axis=1)
+        with stage("correlation.compute"):
+            grid = lag_adstock_dimret_grid(
+                X, y, request.max_lag, request.adstock_rates, request.dimret_rates, request.dimret_adstock
+            )
+
+        # Best cell per variable; variables whose every cell is undefined go last
+        flat = grid.reshape(len(candidates), -1)
+        score = np.abs(flat) if request.best_by == "abs" else flat.copy()
+        score[np.isnan(score)] = -np.inf
+        best = score.argmax(axis=1)
+        best_r = flat[np.arange(len(candidates)), best]
+        best_p = correlation_p_values(best_r, n)
+        lag_idx, adstock_idx, dimret_idx = np.unravel_index(best, grid.shape[1:])
+        order = np.argsort(-score[np.arange(len(candidates)), best], kind='stable')
+
+        results = []
+        for i in order.tolist():
+            defined = not np.isnan(best_r[i])
+            item = {
+                "variable": str(candidates[i]),
+                "lag": int(lag_idx[i]) if defined else None,
+                "adstock": float(request.adstock_rates[adstock_idx[i]]) if defined else None,
+                "dimret": float(request.dimret_rates[dimret_idx[i]]) if defined else None,
+                "correlation": float(best_r[i]) if defined else None,
+                "p_value": float(best_p[i]) if defined else None
+            }
+            if request.include_grid:
+                item["grid"] = grid[i]
+            results.append(item)
+
+        return {
+            "kpi": request.kpi,
+            "n_samples": int(n),
+            "lags": list(range(request.max_lag + 1)),
+            "adstock_rates": list(request.adstock_rates),
+            "dimret_rates": list(request.dimret_rates),
+            "dimret_adstock": request.dimret_adstock,
+            "results": results
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Ranked correlation error: {str(e)}", file=sys.stderr)
-        traceback.print_exc()
+        logger.exception("Correlation scan error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1 @@
+"""Server-side dataset registry module"""
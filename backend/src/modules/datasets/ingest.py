@@ -0,0 +1,112 @@
+"""Decode binary/columnar uploads (Arrow IPC, Parquet, NPY, CSV) into DataFrames"""
+
+import io
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+from ..lazy import is_available, lazy_import
+
+# pyarrow is optional (Arrow IPC and Parquet support, faster CSV parsing); imported on first use
+PYARROW_AVAILABLE = is_available("pyarrow")
+pa = lazy_import("pyarrow")
+pa_csv = lazy_import("pyarrow.csv")
+pa_ipc = lazy_import("pyarrow.ipc")
+pq = lazy_import("pyarrow.parquet")
+
+FORMATS = ['arrow', 'arrow_file', 'parquet', 'npy', 'csv']
+
+CONTENT_TYPES = {
+    'application/vnd.apache.arrow.stream': 'arrow',
+    'application/vnd.apache.arrow.file': 'arrow_file',
+    'application/vnd.apache.parquet': 'parquet',
+    'application/x-parquet': 'parquet',
+    'application/x-npy': 'npy',
+    'text/csv': 'csv',
+}
+
+
+def detect_format(body: bytes, content_type: Optional[str] = None) -> str:
+    """Infer the upload format from its magic bytes, then its Content-Type, defaulting to CSV"""
+    if body[:4] == b'PAR1':
+        return 'parquet'
+    if body[:6] == b'ARROW1':
+        return 'arrow_file'
+    if body[:6] == b'\x93NUMPY':
+        return 'npy'
+    if body[:4] == b'\xff\xff\xff\xff':  # Arrow IPC stream continuation marker
+        return 'arrow'
+    if content_type:
+        return CONTENT_TYPES.get(content_type.split(';')[0].strip().lower(), 'csv')
+    return 'csv'
+
+
+def _require_pyarrow(fmt: str) -> None:
+    if not PYARROW_AVAILABLE:
+        raise ValueError(f"'{fmt}' uploads require pyarrow. Please install: pip install pyarrow")
+
+
+def _table_to_dataframe(table) -> pd.DataFrame:
+    """Arrow table -> DataFrame with numeric columns as contiguous float64 arrays"""
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        kind = column.type
+        if pa.types.is_integer(kind) or pa.types.is_floating(kind) or pa.types.is_boolean(kind) or pa.types.is_decimal(kind):
+            columns[str(name)] = np.ascontiguousarray(column.to_numpy(), dtype=np.float64)
+        else:
+            columns[str(name)] = column.to_pandas()
+    return pd.DataFrame(columns, copy=False)
+
+
+def _numeric_to_float64(df: pd.DataFrame) -> pd.DataFrame:
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]) and df[col].dtype != np.float64:
+            df[col] = df[col].astype(np.float64)
+    return df
+
+
+def _decode_npy(body: bytes, columns: Optional[List[str]]) -> pd.DataFrame:
+    array = np.load(io.BytesIO(body), allow_pickle=False)
+    if array.dtype.names:
+        return pd.DataFrame({name: np.ascontiguousarray(array[name]) for name in array.dtype.names}, copy=False)
+
+    if array.ndim == 1:
+        array = array[:, None]
+    if array.ndim != 2:
+        raise ValueError(f"NPY uploads must be 1-D, 2-D or structured arrays, got {array.ndim}-D")
+    if columns is None:
+        columns = [f"col_{i}" for i in range(array.shape[1])]
+    if len(columns) != array.shape[1]:
+        raise ValueError(f"Got {len(columns)} column names for an array with {array.shape[1]} columns")
+    # Column-major so every column is a contiguous block
+    array = np.asfortranarray(array, dtype=np.float64)
+    return pd.DataFrame({name: array[:, i] for i, name in enumerate(columns)}, copy=False)
+
+
+def decode_dataset(body: bytes, fmt: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Decode an uploaded file into a DataFrame
+
+    Numeric columns come back as float64; other columns (dates, labels) keep
+    their decoded type. `columns` names the columns of a plain 2-D NPY array.
+    """
+    if not body:
+        raise ValueError("Upload is empty")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Available: {FORMATS}")
+
+    if fmt == 'npy':
+        return _decode_npy(body, columns)
+
+    if fmt == 'csv':
+        if PYARROW_AVAILABLE:
+            return _table_to_dataframe(pa_csv.read_csv(pa.BufferReader(body)))
+        return _numeric_to_float64(pd.read_csv(io.BytesIO(body)))
+
+    _require_pyarrow(fmt)
+    if fmt == 'parquet':
+        table = pq.read_table(pa.BufferReader(body))
+    elif fmt == 'arrow_file':
+        table = pa_ipc.open_file(pa.BufferReader(body)).read_all()
+    else:
+        table = pa_ipc.open_stream(pa.BufferReader(body)).read_all()
+    return _table_to_dataframe(table)
@@ -0,0 +1,16 @@
+"""Data models for Datasets module"""
+
+from pydantic import BaseModel
+from typing import Dict, List, Any
+
+
+class DatasetUploadRequest(BaseModel):
+    """Request model for registering a dataset once for later requests"""
+    data: Dict[str, List[Any]]  # Column name -> values
+
+
+class DatasetInfo(BaseModel):
+    """Summary of a registered dataset"""
+    dataset_id: str
+    n_rows: int
+    columns: List[str]
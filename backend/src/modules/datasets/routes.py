@@ -0,0 +1,71 @@
+"""Datasets API routes"""
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from .models import DatasetUploadRequest
+from .service import register_dataset, register_upload, get_dataset_info, delete_dataset, list_datasets
+
+router = APIRouter()
+
+
+@router.post("")
+def upload_dataset(request: DatasetUploadRequest):
+    """
+    Register a dataset once and get back its content-hashed id
+
+    Uploading identical content twice returns the same dataset_id.
+    Other endpoints accept `dataset_id` plus a column list instead of raw arrays.
+
+    Returns:
+        - dataset_id: content hash identifying the dataset
+        - n_rows: number of rows
+        - columns: column names
+    """
+    try:
+        return register_dataset(request.data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/upload")
+async def upload_dataset_file(request: Request, format: Optional[str] = None, columns: Optional[str] = None):
+    """
+    Register a dataset from a raw file body instead of JSON
+
+    Send the file as the request body. Supported formats: Arrow IPC stream or
+    file, Parquet, NPY and CSV. The format is detected from the file's magic
+    bytes or Content-Type, or can be forced with ?format=arrow|arrow_file|parquet|npy|csv.
+    Numeric columns are decoded straight into float64 arrays, with no
+    per-value Python objects. For a plain 2-D NPY array, pass ?columns=a,b,c.
+
+    Returns:
+        - dataset_id, n_rows, columns (as for POST /api/datasets) and the decoded format
+    """
+    body = await request.body()
+    column_names = columns.split(",") if columns else None
+    try:
+        return await run_in_threadpool(
+            register_upload, body, format, request.headers.get("content-type"), column_names
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("")
+async def get_datasets():
+    """List registered datasets"""
+    return {"datasets": list_datasets()}
+
+
+@router.get("/{dataset_id}")
+async def get_dataset(dataset_id: str):
+    """Get the summary of a registered dataset"""
+    return get_dataset_info(dataset_id)
+
+
+@router.delete("/{dataset_id}")
+async def remove_dataset(dataset_id: str):
+    """Remove a registered dataset from the server"""
+    delete_dataset(dataset_id)
+    return {"dataset_id": dataset_id, "deleted": True}
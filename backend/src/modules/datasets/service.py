@@ -0,0 +1,177 @@
+"""Dataset registry service logic"""
+
+import hashlib
+import threading
+import pandas as pd
+from collections import OrderedDict
+from fastapi import HTTPException
+from typing import Dict, List, Any, Optional
+from ..dates import parse_dates
+from ..timing import stage
+from .ingest import decode_dataset, detect_format
+
+# Maximum number of datasets kept in memory; least recently used are evicted first
+MAX_DATASETS = 8
+
+# Columns treated as dates and parsed once at upload time
+DATE_COLUMNS = ['obs', 'OBS', 'date', 'Date']
+
+_datasets: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def hash_dataframe(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (column names, order and values)"""
+    hasher = hashlib.sha256()
+    for col in df.columns:
+        hasher.update(str(col).encode('utf-8'))
+        hasher.update(b'\0')
+        hasher.update(pd.util.hash_pandas_object(df[col], index=False).values.tobytes())
+    return hasher.hexdigest()[:16]
+
+
+def _parse_date_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse known date columns once so requests do not re-parse them"""
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            try:
+                df[col] = parse_dates(df[col])
+            except (ValueError, TypeError):
+                pass
+    return df
+
+
+def _dataset_info(dataset_id: str, df: pd.DataFrame) -> Dict[str, Any]:
+    return {
+        "dataset_id": dataset_id,
+        "n_rows": int(len(df)),
+        "columns": [str(col) for col in df.columns]
+    }
+
+
+def register_dataframe(df: pd.DataFrame, copy: bool = True) -> Dict[str, Any]:
+    """
+    Store a DataFrame in the registry, returning its content-hashed id
+
+    Pass copy=False when the caller owns the frame (e.g. it was just decoded)
+    to avoid doubling peak memory on large uploads.
+    """
+    dataset_id = hash_dataframe(df)
+
+    with _lock:
+        if dataset_id in _datasets:
+            _datasets.move_to_end(dataset_id)
+            return _dataset_info(dataset_id, _datasets[dataset_id])
+
+    df = _parse_date_columns(df.copy() if copy else df)
+
+    with _lock:
+        _datasets[dataset_id] = df
+        _datasets.move_to_end(dataset_id)
+        while len(_datasets) > MAX_DATASETS:
+            _datasets.popitem(last=False)
+
+    return _dataset_info(dataset_id, df)
+
+
+def store_dataset(dataset_id: str, df: pd.DataFrame) -> None:
+    """Store an already-registered dataset under its id (e.g. inside a job worker process)"""
+    with _lock:
+        _datasets[dataset_id] = df
+        _datasets.move_to_end(dataset_id)
+        while len(_datasets) > MAX_DATASETS:
+            _datasets.popitem(last=False)
+
+
+def register_dataset(data: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """Register a column dictionary as a dataset"""
+    if not data:
+        raise ValueError("Dataset must contain at least one column")
+    lengths = {len(values) for values in data.values()}
+    if len(lengths) > 1:
+        raise ValueError("All dataset columns must have the same length")
+    return register_dataframe(pd.DataFrame(data))
+
+
+def register_upload(
+    body: bytes,
+    fmt: Optional[str] = None,
+    content_type: Optional[str] = None,
+    columns: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Decode a binary/CSV upload (format detected when not given) and register it"""
+    fmt = fmt or detect_format(body, content_type)
+    with stage("datasets.decode"):
+        df = decode_dataset(body, fmt, columns)
+    if len(df.columns) == 0:
+        raise ValueError("Dataset must contain at least one column")
+    info = register_dataframe(df, copy=False)
+    info["format"] = fmt
+    return info
+
+
+def get_dataset(dataset_id: str) -> pd.DataFrame:
+    """Get a registered dataset, raising 404 if it is unknown or was evicted"""
+    with _lock:
+        df = _datasets.get(dataset_id)
+        if df is not None:
+            _datasets.move_to_end(dataset_id)
+    if df is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Dataset '{dataset_id}' not found. Please upload the dataset again."
+        )
+    return df
+
+
+def get_dataset_info(dataset_id: str) -> Dict[str, Any]:
+    """Summary of a registered dataset"""
+    return _dataset_info(dataset_id, get_dataset(dataset_id))
+
+
+def list_datasets() -> List[Dict[str, Any]]:
+    """Summaries of all registered datasets"""
+    with _lock:
+        items = list(_datasets.items())
+    return [_dataset_info(dataset_id, df) for dataset_id, df in items]
+
+
+def delete_dataset(dataset_id: str) -> None:
+    """Remove a dataset from the registry"""
+    with _lock:
+        if _datasets.pop(dataset_id, None) is None:
+            raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' not found")
+
+
+def resolve_dataframe(
+    data: Optional[Dict[str, List[Any]]] = None,
+    dataset_id: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    numeric_only: bool = False
+) -> pd.DataFrame:
+    """
+    Build the working DataFrame for a request from either raw data or a registered dataset
+
+    Without a column list, numeric_only restricts a registered dataset to its numeric columns.
+    Assigning columns on the returned frame never modifies the registered dataset.
+    """
+    if dataset_id:
+        df = get_dataset(dataset_id)
+    elif data is not None:
+        df = pd.DataFrame(data)
+    else:
+        raise HTTPException(status_code=400, detail="Either raw data or a dataset_id is required")
+
+    if columns is None:
+        if numeric_only:
+            # Check dtypes from the frame's dtype Series (indexing every column is slow on wide frames)
+            numeric = [col for col, dtype in df.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
+            return df.loc[:, numeric].copy(deep=False)
+        return df.copy(deep=False)
+
+    columns = list(dict.fromkeys(columns))
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Columns not found in dataset: {missing}")
+    return df.loc[:, columns].copy(deep=False)
+
@@ -0,0 +1,20 @@
+"""Date parsing shared by the dataset registry and the services"""
+
+import pandas as pd
+
+
+def parse_dates(values):
+    """
+    ISO dates (YYYY-MM-DD) as they are, otherwise day first (DD/MM/YYYY,
+    British/European); dayfirst alone would swap day and month in ISO dates
+
+    Accepts what pd.to_datetime accepts (scalar, list, Series) and returns
+    the matching type; values that are already datetimes pass through.
+    Raises ValueError/TypeError when neither reading works.
+    """
+    if isinstance(values, pd.Series) and pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    try:
+        return pd.to_datetime(values, format='ISO8601')
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, format='mixed', dayfirst=True)
@@ -0,0 +1,206 @@
+"""
+Response encoding shared by all routers
+
+Services may return numpy arrays and pandas objects directly; `encode_response`
+sanitizes non-finite floats a whole array at a time and serializes the result
+with orjson (falling back to the standard library), or as a binary columnar
+payload when the client asks for one.
+"""
+
+import datetime
+import json
+import struct
+import numpy as np
+import pandas as pd
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Iterable, List, Optional, Tuple
+from .timing import stage
+
+# Try to import orjson (fast JSON, serializes numpy arrays natively)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Binary columnar layout:
+#   b"MHC1" | uint32 header length (little-endian) | header JSON (UTF-8) | padding to 8 bytes | array buffers
+# The header is {"data": <result with numeric arrays replaced by {"$array": i}>,
+#                "arrays": [{"offset", "length", "shape", "dtype"}, ...]}; offsets are from the
+# start of the buffer section and every buffer is 8-byte aligned, so clients can view them
+# without copying (e.g. new Float64Array(buffer, offset, length) for "<f8").
+COLUMNAR_MEDIA_TYPE = "application/vnd.modelhub.columnar"
+COLUMNAR_MAGIC = b"MHC1"
+
+# Buffer dtype by numpy kind: float64, int64 (BigInt64Array) and one byte per bool (Uint8Array)
+COLUMNAR_DTYPES = {'f': '<f8', 'i': '<i8', 'u': '<i8', 'b': '|b1'}
+
+# Lists shorter than this are sanitized element by element (cheaper than building an array)
+MIN_ARRAY_LENGTH = 8
+
+
+def _sanitize_array(array: np.ndarray, default: Optional[float]) -> Any:
+    kind = array.dtype.kind
+    if kind == 'f':
+        finite = np.isfinite(array)
+        if not finite.all():
+            if default is not None:
+                array = np.where(finite, array, default)
+            elif not ORJSON_AVAILABLE:
+                # orjson writes non-finite floats as null; the standard library needs None
+                values = array.astype(object)
+                values[~finite] = None
+                return values.tolist()
+        return np.ascontiguousarray(array, dtype=np.float64)
+    if kind in 'iu':
+        return np.ascontiguousarray(array, dtype=np.int64)
+    if kind == 'b':
+        return np.ascontiguousarray(array)
+    if kind == 'M':
+        strings = np.datetime_as_string(array, unit='s').astype(object)
+        strings[np.isnat(array)] = None
+        return strings.tolist()
+    return [sanitize(v, default) for v in array.tolist()]
+
+
+def sanitize(value: Any, default: Optional[float] = None) -> Any:
+    """
+    Make a service result JSON-ready
+
+    NaN/Inf become `default` (None serializes as null). Numeric numpy arrays,
+    pandas Series and numeric lists are sanitized in one vectorized pass and
+    kept as arrays; dates become ISO strings.
+    """
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): sanitize(v, default) for key, v in value.items()}
+    if isinstance(value, float):
+        return float(value) if np.isfinite(value) else default
+    if isinstance(value, int):
+        return value
+    if isinstance(value, np.ndarray):
+        return _sanitize_array(value, default)
+    if isinstance(value, pd.Series):
+        return _sanitize_array(value.to_numpy(), default)
+    if isinstance(value, (list, tuple)):
+        if len(value) >= MIN_ARRAY_LENGTH and isinstance(value[0], (int, float)) and not isinstance(value[0], bool):
+            try:
+                array = np.asarray(value)
+            except (ValueError, TypeError):
+                array = None
+            if array is not None and array.dtype.kind in 'iuf':
+                return _sanitize_array(array, default)
+        return [sanitize(v, default) for v in value]
+    if isinstance(value, np.generic):
+        return sanitize(value.item(), default)
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return None if pd.isna(value) else value.isoformat()
+    return value
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize sanitized content to JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+def _extract_arrays(value: Any, arrays: List[np.ndarray]) -> Any:
+    """Replace numeric arrays in sanitized content with {"$array": index} references"""
+    if isinstance(value, dict):
+        return {key: _extract_arrays(v, arrays) for key, v in value.items()}
+    if isinstance(value, list):
+        return [_extract_arrays(v, arrays) for v in value]
+    if isinstance(value, np.ndarray) and value.dtype.kind in 'iufb':
+        arrays.append(value)
+        return {"$array": len(arrays) - 1}
+    return value
+
+
+def encode_columnar(content: Any) -> bytes:
+    """Serialize sanitized content to the binary columnar layout (see COLUMNAR_MEDIA_TYPE)"""
+    arrays: List[np.ndarray] = []
+    skeleton = _extract_arrays(content, arrays)
+
+    buffers: List[bytes] = []
+    descriptors: List[dict] = []
+    offset = 0
+    for array in arrays:
+        dtype = COLUMNAR_DTYPES[array.dtype.kind]
+        data = np.ascontiguousarray(array, dtype=dtype)
+        descriptors.append({"offset": offset, "length": int(data.size), "shape": list(data.shape), "dtype": dtype})
+        buffer = data.tobytes()
+        buffer += b"\0" * (-len(buffer) % 8)  # Keep the next buffer 8-byte aligned
+        buffers.append(buffer)
+        offset += len(buffer)
+
+    header = dumps({"data": skeleton, "arrays": descriptors})
+    prefix_length = len(COLUMNAR_MAGIC) + 4 + len(header)
+    padding = b" " * (-prefix_length % 8)
+    return b"".join([COLUMNAR_MAGIC, struct.pack('<I', len(header) + len(padding)), header, padding] + buffers)
+
+
+def decode_columnar(payload: bytes) -> Tuple[Any, List[np.ndarray]]:
+    """Inverse of encode_columnar (for tests and Python clients); returns (data, arrays)"""
+    if payload[:4] != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar payload")
+    (header_length,) = struct.unpack('<I', payload[4:8])
+    header = json.loads(payload[8:8 + header_length])
+    base = 8 + header_length
+    arrays = [
+        np.frombuffer(payload, dtype=d["dtype"], count=d["length"], offset=base + d["offset"]).reshape(d["shape"])
+        for d in header["arrays"]
+    ]
+
+    def restore(value):
+        if isinstance(value, dict):
+            if set(value) == {"$array"}:
+                return arrays[value["$array"]]
+            return {key: restore(v) for key, v in value.items()}
+        if isinstance(value, list):
+            return [restore(v) for v in value]
+        return value
+
+    return restore(header["data"]), arrays
+
+
+def wants_columnar(accept: Optional[str]) -> bool:
+    return bool(accept) and COLUMNAR_MEDIA_TYPE in accept
+
+
+def encode_response(content: Any, accept: Optional[str] = None, nan_value: Optional[float] = None) -> Response:
+    """
+    Build the HTTP response for a service result
+
+    JSON by default; the binary columnar layout when the Accept header asks for
+    COLUMNAR_MEDIA_TYPE. Non-finite floats become `nan_value` (null by default).
+    """
+    with stage("serialize"):
+        content = sanitize(content, nan_value)
+        if wants_columnar(accept):
+            return Response(content=encode_columnar(content), media_type=COLUMNAR_MEDIA_TYPE)
+        return Response(content=dumps(content), media_type=JSON_MEDIA_TYPE)
+
+
+def encode_stream(items: Iterable[Any], nan_value: Optional[float] = None) -> StreamingResponse:
+    """
+    Stream results as newline-delimited JSON, one line per item as soon as it is produced
+
+    `items` may be a blocking generator; it runs in the threadpool.
+    """
+    def lines():
+        for item in items:
+            yield dumps(sanitize(item, nan_value)) + b"\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
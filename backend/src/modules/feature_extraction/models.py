@@ -1,15 +1,24 @@
 """Data models for feature extraction module"""
 
 from pydantic import BaseModel
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 class FeatureExtractionRequest(BaseModel):
     """Request model for feature extraction"""
-    data: Dict[str, List[float]]  # {column_name: values}
+    data: Optional[Dict[str, List[float]]] = None  # {column_name: values}
+    dataset_id: Optional[str] = None  # Registered dataset instead of raw data
+    columns: Optional[List[str]] = None  # Dataset columns to use (default: all)
     kpi_var: str  # Target variable name
     date_column: str = "OBS"  # Date/index column name
     n_features: int = 10  # Number of top features to extract
     test_size: float = 0.1  # Test split size
     random_state: int = 42
     shuffle: bool = False
+    booster: str = "xgboost"  # "xgboost" or "hist_gradient_boosting" (scikit-learn; no xgboost needed)
+    n_estimators: int = 100  # Boosting rounds
+    max_depth: int = 6  # Boosted tree depth
+    learning_rate: float = 0.1
+    rf_n_estimators: int = 100  # Random Forest trees
+    rf_max_depth: Optional[int] = 10  # None grows trees until leaves are pure
+    n_jobs: Optional[int] = None  # Threads shared by both models (default: FEATURE_EXTRACTION_THREADS, or cores per job worker)
@@ -1,16 +1,20 @@
 """Feature extraction API routes"""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
+from typing import Optional
 from .models import FeatureExtractionRequest
 from .service import extract_features
+from ..encoding import encode_response
 
 router = APIRouter()
 
 
 @router.post("/extract")
-async def feature_extraction(request: FeatureExtractionRequest):
+def feature_extraction(request: FeatureExtractionRequest, accept: Optional[str] = Header(None)):
     """
-    Extract top features using XGBoost and Random Forest
+    Extract top features using XGBoost (or HistGradientBoosting) and Random Forest
+
+    The two models train in separate threads, splitting the thread budget (n_jobs).
 
     Returns:
         - combined_features: merged unique feature list
@@ -18,4 +22,4 @@ async def feature_extraction(request: FeatureExtractionRequest):
         - top_features_rf: list of top features from Random Forest
         - feature_importances: importance scores from both models
     """
-    return extract_features(request)
+    return encode_response(extract_features(request), accept)
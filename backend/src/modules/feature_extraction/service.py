@@ -1,19 +1,115 @@
 """Feature extraction service using XGBoost and Random Forest"""
 
+import contextvars
+import os
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException
-import sys
-import traceback
+import logging
+from ..datasets.service import resolve_dataframe
+from ..jobs.progress import report_progress
+from ..jobs.service import job_manager
+from ..timing import stage
+from ..lazy import is_available, lazy_import, load
 
-# Try to import xgboost
-try:
-    import xgboost as xgb
-    XGBOOST_AVAILABLE = True
-except ImportError:
-    XGBOOST_AVAILABLE = False
+model_selection = lazy_import("sklearn.model_selection")
+ensemble = lazy_import("sklearn.ensemble")
+threadpoolctl = lazy_import("threadpoolctl")
+
+# xgboost is optional; it is imported on the first extraction
+XGBOOST_AVAILABLE = is_available("xgboost")
+xgb = lazy_import("xgboost")
+
+# Boosting model trained next to the Random Forest
+BOOSTERS = {"xgboost": "XGBoost", "hist_gradient_boosting": "HistGradientBoosting"}
+
+# Node fields of HistGradientBoosting's fitted trees that split gains are read from
+SPLIT_GAIN_FIELDS = ("is_leaf", "feature_idx", "gain")
+
+logger = logging.getLogger(__name__)
+
+
+def thread_budget(n_jobs=None) -> int:
+    """
+    Threads for one extraction: the request's n_jobs, FEATURE_EXTRACTION_THREADS,
+    or the cores divided among the job pool's workers, which run at the same time
+    """
+    if n_jobs is None:
+        default = (os.cpu_count() or 1) // job_manager.max_workers
+        n_jobs = int(os.environ.get("FEATURE_EXTRACTION_THREADS", default))
+    return max(1, int(n_jobs))
+
+
+def split_gain_importances(model, n_features: int) -> np.ndarray:
+    """
+    Total split gain per feature of a fitted HistGradientBoostingRegressor,
+    normalized to sum to 1 (it exposes no feature_importances_)
+
+    scikit-learn has no public accessor for the gains, so they are read from
+    the fitted trees of the version pinned in requirements.txt; a layout change
+    raises HTTPException(500) rather than returning wrong importances.
+    """
+    try:
+        trees = [tree for iteration in model._predictors for tree in iteration]
+        missing = [field for field in SPLIT_GAIN_FIELDS if any(field not in tree.nodes.dtype.names for tree in trees)]
+    except (AttributeError, TypeError):
+        missing = list(SPLIT_GAIN_FIELDS)
+    if missing:
+        raise HTTPException(
+            status_code=500,
+            detail=f"HistGradientBoosting split gains cannot be read with scikit-learn {load('sklearn').__version__} "
+                   f"(see requirements.txt for the supported version). Use booster 'xgboost'"
+        )
+
+    gains = np.zeros(n_features)
+    for tree in trees:
+        splits = tree.nodes[~tree.nodes["is_leaf"].astype(bool)]
+        np.add.at(gains, splits["feature_idx"], splits["gain"])
+    total = gains.sum()
+    return gains / total if total > 0 else gains
+
+
+def _fit_booster(request, X_train, y_train, n_threads: int) -> np.ndarray:
+    """Train the boosting model on `n_threads` threads and return its feature importances"""
+    if request.booster == "hist_gradient_boosting":
+        model = ensemble.HistGradientBoostingRegressor(
+            max_iter=request.n_estimators,
+            max_depth=request.max_depth,
+            learning_rate=request.learning_rate,
+            early_stopping=False,
+            random_state=request.random_state
+        )
+        # OpenMP limits are per calling thread, so the concurrent Random Forest is unaffected
+        with stage("feature_extraction.hist_gradient_boosting"), \
+                threadpoolctl.threadpool_limits(limits=n_threads, user_api="openmp"):
+            model.fit(X_train, y_train)
+        return split_gain_importances(model, X_train.shape[1])
+
+    model = xgb.XGBRegressor(
+        random_state=request.random_state,
+        n_estimators=request.n_estimators,
+        max_depth=request.max_depth,
+        learning_rate=request.learning_rate,
+        tree_method="hist",
+        n_jobs=n_threads
+    )
+    with stage("feature_extraction.xgboost"):
+        model.fit(X_train, y_train)
+    return model.feature_importances_
+
+
+def _fit_random_forest(request, X_train, y_train, n_threads: int) -> np.ndarray:
+    """Train the Random Forest on `n_threads` threads and return its feature importances"""
+    model = ensemble.RandomForestRegressor(
+        random_state=request.random_state,
+        n_estimators=request.rf_n_estimators,
+        max_depth=request.rf_max_depth,
+        n_jobs=n_threads
+    )
+    with stage("feature_extraction.random_forest"):
+        model.fit(X_train, y_train)
+    return model.feature_importances_
 
 
 def extract_features(request):
@@ -23,7 +119,8 @@ def extract_features(request):
     Steps:
     1) Convert data dict to DataFrame
     2) Split into train/test
-    3) Train XGBoost and Random Forest on all features
+    3) Train XGBoost (or HistGradientBoosting) and Random Forest on all
+       features in two threads, each on its share of the thread budget
     4) Extract top n_features from each model
     5) Merge their unique top features
     6) Return the combined feature list with importance scores
@@ -44,14 +141,30 @@ def extract_features(request):
         - "rf_importances": feature importance scores from Random Forest
     """
     try:
-        if not XGBOOST_AVAILABLE:
+        if request.booster not in BOOSTERS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown booster '{request.booster}'. Available: {list(BOOSTERS)}"
+            )
+        if min(request.n_estimators, request.max_depth, request.rf_n_estimators) < 1 \
+                or (request.rf_max_depth is not None and request.rf_max_depth < 1) \
+                or (request.n_jobs is not None and request.n_jobs < 1):
+            raise HTTPException(
+                status_code=400,
+                detail="'n_estimators', 'max_depth', 'rf_n_estimators', 'rf_max_depth' and 'n_jobs' must be at least 1"
+            )
+        if request.booster == "xgboost" and not XGBOOST_AVAILABLE:
             raise HTTPException(
                 status_code=500,
-                detail="XGBoost library not installed. Please install: pip install xgboost"
+                detail="XGBoost library not installed. Please install: pip install xgboost, or use booster 'hist_gradient_boosting'"
             )
 
-        # Convert data dict to DataFrame
-        df = pd.DataFrame(request.data)
+        # Convert data dict (or registered dataset) to DataFrame
+        columns = request.columns
+        if request.dataset_id and columns is not None:
+            columns = [request.kpi_var] + [col for col in columns if col != request.kpi_var]
+        with stage("feature_extraction.load"):
+            df = resolve_dataframe(request.data, request.dataset_id, columns)
 
         # Check if KPI variable exists
         if request.kpi_var not in df.columns:
@@ -93,7 +206,7 @@ def extract_features(request):
             )
 
         # Split into train/test
-        X_train, X_test, y_train, y_test = train_test_split(
+        X_train, X_test, y_train, y_test = model_selection.train_test_split(
             X,
             y,
             test_size=request.test_size,
@@ -102,18 +215,26 @@ def extract_features(request):
         )
 
         # ---------------------------------------------------------------------
-        # XGBoost Approach
+        # Boosting and Random Forest, in two threads
         # ---------------------------------------------------------------------
-        xgb_model = xgb.XGBRegressor(
-            random_state=request.random_state,
-            n_estimators=100,
-            max_depth=6,
-            learning_rate=0.1
-        )
-        xgb_model.fit(X_train, y_train)
+        # Both release the GIL while building trees; each gets half the threads
+        threads = thread_budget(request.n_jobs)
+        booster_threads = max(1, threads // 2)
+        rf_threads = max(1, threads - booster_threads)
+        report_progress(0.1, f"Training {BOOSTERS[request.booster]} and Random Forest")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Copied contexts keep the stages in this request's Server-Timing
+            booster_future = executor.submit(
+                contextvars.copy_context().run, _fit_booster, request, X_train, y_train, booster_threads
+            )
+            rf_future = executor.submit(
+                contextvars.copy_context().run, _fit_random_forest, request, X_train, y_train, rf_threads
+            )
+            xgb_importances = booster_future.result()
+            rf_importances = rf_future.result()
+        report_progress(0.9, "Ranking features")
 
-        # Get feature importances
-        xgb_importances = xgb_model.feature_importances_
+        # Rank boosting importances
         xgb_feat_importance_df = (
             pd.DataFrame({
                 "feature": X.columns,
@@ -130,18 +251,7 @@ def extract_features(request):
             xgb_feat_importance_df["importance"].tolist()
         ))
 
-        # ---------------------------------------------------------------------
-        # Random Forest Approach
-        # ---------------------------------------------------------------------
-        rf_model = RandomForestRegressor(
-            random_state=request.random_state,
-            n_estimators=100,
-            max_depth=10
-        )
-        rf_model.fit(X_train, y_train)
-
-        # Get feature importances
-        rf_importances = rf_model.feature_importances_
+        # Rank Random Forest importances
         rf_feat_importance_df = (
             pd.DataFrame({
                 "feature": X.columns,
@@ -188,12 +298,13 @@ def extract_features(request):
             "n_samples_train": int(len(X_train)),
             "n_samples_test": int(len(X_test)),
             "n_features_total": int(X.shape[1]),
-            "n_features_selected": len(combined_features)
+            "n_features_selected": len(combined_features),
+            "booster": request.booster,
+            "threads": {"booster": booster_threads, "random_forest": rf_threads}
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Feature extraction error: {str(e)}", file=sys.stderr)
-        traceback.print_exc()
+        logger.exception("Feature extraction error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
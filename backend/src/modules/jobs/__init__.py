@@ -0,0 +1 @@
+"""Background job engine for long-running analyses"""
@@ -0,0 +1,17 @@
+"""Data models for Jobs module"""
+
+from pydantic import BaseModel
+from typing import Optional
+
+
+class JobInfo(BaseModel):
+    """Status of a background job"""
+    job_id: str
+    kind: str
+    status: str  # queued, running, completed, failed, cancelled
+    progress: float  # Percent complete (0-100)
+    message: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
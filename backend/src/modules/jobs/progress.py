@@ -0,0 +1,47 @@
+"""Progress reporting and cooperative cancellation for background jobs"""
+
+import threading
+from typing import Optional, MutableMapping
+
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a job when its cancellation has been requested
+
+    Derives from BaseException so the services' generic `except Exception`
+    handlers let it propagate to the job runner.
+    """
+
+
+_context = threading.local()
+
+
+def set_job_context(job_id: str, state: MutableMapping) -> None:
+    """Bind the current thread (or worker process) to a job's shared state"""
+    _context.job_id = job_id
+    _context.state = state
+
+
+def clear_job_context() -> None:
+    _context.job_id = None
+    _context.state = None
+
+
+def cancel_key(job_id: str) -> str:
+    return f"{job_id}:cancel"
+
+
+def report_progress(fraction: float, message: Optional[str] = None) -> None:
+    """
+    Report progress (0-1) of the running job
+
+    A no-op outside a job, so service functions can call it unconditionally.
+    Raises JobCancelled if the job has been cancelled.
+    """
+    job_id = getattr(_context, 'job_id', None)
+    if job_id is None:
+        return
+    state = _context.state
+    if state.get(cancel_key(job_id)):
+        raise JobCancelled(job_id)
+    state[job_id] = {"progress": max(0.0, min(1.0, float(fraction))), "message": message}
@@ -0,0 +1,89 @@
+"""Jobs API routes"""
+
+from fastapi import APIRouter, HTTPException, Body, Header
+from pydantic import ValidationError
+from typing import Dict, Any, Optional
+from .models import JobInfo
+from .service import job_manager, load_object, JOB_KINDS
+from ..datasets.service import get_dataset
+from ..encoding import encode_response
+
+router = APIRouter()
+
+
+@router.get("")
+def list_jobs():
+    """List known jobs with their status"""
+    return {"jobs": job_manager.list_jobs(), "pool": job_manager.stats()}
+
+
+@router.post("/{kind}", response_model=JobInfo)
+def submit_job(kind: str, payload: Dict[str, Any] = Body(...)):
+    """
+    Submit a long-running analysis as a background job
+
+    Kinds:
+        - prophet: same body as /api/prophet/forecast
+        - prophet_tune: same body as /api/prophet/tune
+        - stepwise: same body as /api/regression/stepwise
+        - feature_extraction: same body as /api/feature-extraction/extract
+        - regression: same body as /api/modelling/regression
+
+    Returns:
+        - job_id and initial status; poll /api/jobs/{job_id} for progress
+    """
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown job kind '{kind}'. Available: {list(JOB_KINDS)}")
+
+    # Validate up front so bad requests fail immediately rather than inside the worker
+    try:
+        request = load_object(JOB_KINDS[kind]["request"]).model_validate(payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    # Worker processes do not share the dataset registry, so send the dataset along
+    datasets = {}
+    dataset_id = getattr(request, "dataset_id", None)
+    if dataset_id and JOB_KINDS[kind]["executor"] == "process":
+        datasets[dataset_id] = get_dataset(dataset_id)
+
+    return job_manager.submit(kind, request.model_dump(), datasets)
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+def get_job(job_id: str):
+    """
+    Get job status
+
+    Returns:
+        - status: queued, running, completed, failed or cancelled
+        - progress: percent complete
+    """
+    try:
+        return job_manager.status(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str, accept: Optional[str] = Header(None)):
+    """Get the result of a completed job (409 while it is still queued or running)"""
+    try:
+        outcome = job_manager.result(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    if outcome is None:
+        raise HTTPException(status_code=409, detail="Job has not finished yet")
+    if not outcome["ok"]:
+        raise HTTPException(status_code=outcome["status_code"], detail=outcome["detail"])
+    return encode_response(outcome["result"], accept)
+
+
+@router.delete("/{job_id}", response_model=JobInfo)
+def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    try:
+        return job_manager.cancel(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
@@ -0,0 +1,337 @@
+"""Background job engine: bounded worker pools with progress, cancellation and per-kind limits"""
+
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+from typing import Dict, Any, Optional
+from .progress import JobCancelled, set_job_context, clear_job_context, cancel_key
+
+# Job kinds: request model, handler, executor and the maximum number running at once.
+# Handlers that rely on in-process caches (modelling) run in threads; Python-heavy
+# fits run in the process pool so they never hold the server's GIL.
+JOB_KINDS: Dict[str, Dict[str, Any]] = {
+    "prophet": {
+        "request": "modules.prophet.models:ProphetRequest",
+        "handler": "modules.prophet.service:generate_forecast",
+        "executor": "process",
+        "max_concurrent": 2,
+    },
+    "prophet_tune": {
+        "request": "modules.prophet.models:ProphetTuneRequest",
+        "handler": "modules.prophet.tuning:tune_prophet",
+        "executor": "thread",  # Its fits already run in the Prophet process pool
+        "max_concurrent": 1,
+    },
+    "stepwise": {
+        "request": "modules.regression.models:StepwiseRequest",
+        "handler": "modules.regression.service:stepwise_regression_logic",
+        "executor": "process",
+        "max_concurrent": 2,
+    },
+    "feature_extraction": {
+        "request": "modules.feature_extraction.models:FeatureExtractionRequest",
+        "handler": "modules.feature_extraction.service:extract_features",
+        "executor": "process",
+        "max_concurrent": 1,
+    },
+    "regression": {
+        "request": "modules.modelling.models:RegressionRequest",
+        "handler": "modules.modelling.service:run_modelling_regression",
+        "executor": "thread",
+        "max_concurrent": 2,
+    },
+}
+
+# Worker processes in the pool (override with JOBS_MAX_WORKERS)
+DEFAULT_MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Finished jobs kept for status/result queries
+MAX_FINISHED_JOBS = 100
+
+logger = logging.getLogger(__name__)
+
+
+def load_object(path: str) -> Any:
+    """Import 'package.module:attribute'"""
+    module_name, attribute = path.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _call_handler(kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a job's handler, turning errors into a picklable outcome"""
+    spec = JOB_KINDS[kind]
+    try:
+        request = load_object(spec["request"]).model_validate(payload)
+        return {"ok": True, "result": load_object(spec["handler"])(request)}
+    except JobCancelled:
+        return {"ok": False, "cancelled": True}
+    except HTTPException as e:
+        return {"ok": False, "status_code": e.status_code, "detail": e.detail}
+    except ValueError as e:
+        return {"ok": False, "status_code": 400, "detail": str(e)}
+    except Exception as e:
+        logger.exception("Job %s failed: %s", kind, e)
+        return {"ok": False, "status_code": 500, "detail": str(e)}
+
+
+def _run_job_process(kind: str, payload: Dict[str, Any], job_id: str, state, datasets: Dict[str, Any]) -> Dict[str, Any]:
+    """Entry point inside a worker process"""
+    from modules.datasets.service import store_dataset
+
+    for dataset_id, df in datasets.items():
+        store_dataset(dataset_id, df)
+
+    set_job_context(job_id, state)
+    try:
+        return _call_handler(kind, payload)
+    finally:
+        clear_job_context()
+
+
+def _run_job_thread(kind: str, payload: Dict[str, Any], job_id: str, state) -> Dict[str, Any]:
+    """Entry point inside a worker thread"""
+    set_job_context(job_id, state)
+    try:
+        return _call_handler(kind, payload)
+    finally:
+        clear_job_context()
+
+
+class JobManager:
+    """Schedules jobs onto bounded thread/process pools, respecting per-kind concurrency limits"""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending: Dict[str, deque] = {kind: deque() for kind in JOB_KINDS}
+        self._running: Dict[str, int] = {kind: 0 for kind in JOB_KINDS}
+        self._lock = threading.RLock()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._manager = None
+        self._shared_state = None  # Progress/cancel flags visible to worker processes
+        self._local_state: Dict[str, Any] = {}  # Progress/cancel flags for worker threads
+
+    # ------------------------------------------------------------------
+    # Pools
+    # ------------------------------------------------------------------
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            context = multiprocessing.get_context("spawn")
+            if self._manager is None:
+                self._manager = context.Manager()
+                self._shared_state = self._manager.dict()
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._process_pool
+
+    def _discard_broken_pool(self, pool: Optional[ProcessPoolExecutor]) -> None:
+        """Shut down a process pool whose worker died; the next process job starts a fresh one (lock held)"""
+        if pool is None:
+            return
+        pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is pool:
+            self._process_pool = None
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            max_threads = sum(spec["max_concurrent"] for spec in JOB_KINDS.values() if spec["executor"] == "thread")
+            self._thread_pool = ThreadPoolExecutor(max_workers=max(1, max_threads), thread_name_prefix="job")
+        return self._thread_pool
+
+    def _state_for(self, job: Dict[str, Any]):
+        return self._shared_state if JOB_KINDS[job["kind"]]["executor"] == "process" else self._local_state
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def submit(self, kind: str, payload: Dict[str, Any], datasets: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Queue a job; it starts as soon as its kind has a free slot"""
+        if kind not in JOB_KINDS:
+            raise KeyError(kind)
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "payload": payload,
+            "datasets": datasets or {},
+            "future": None,
+            "pool": None,
+            "outcome": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._pending[kind].append(job_id)
+            self._dispatch(kind)
+        return self.status(job_id)
+
+    def _dispatch(self, kind: str) -> None:
+        """Start queued jobs of a kind while it is below its concurrency limit (lock held)"""
+        spec = JOB_KINDS[kind]
+        while self._pending[kind] and self._running[kind] < spec["max_concurrent"]:
+            job = self._jobs[self._pending[kind].popleft()]
+            job_id = job["job_id"]
+
+            if spec["executor"] == "process":
+                pool = self._get_process_pool()
+                future = pool.submit(_run_job_process, kind, job["payload"], job_id, self._shared_state, job["datasets"])
+                job["pool"] = pool
+            else:
+                future = self._get_thread_pool().submit(_run_job_thread, kind, job["payload"], job_id, self._local_state)
+
+            job["datasets"] = {}
+            job["future"] = future
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            self._running[kind] += 1
+            future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+
+    def _on_done(self, job_id: str, future) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            state = self._state_for(job)
+            cancelled = future.cancelled() or bool(state is not None and state.get(cancel_key(job_id)))
+
+            if cancelled:
+                job["status"] = "cancelled"
+            else:
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool as e:
+                    self._discard_broken_pool(job["pool"])
+                    outcome = {"ok": False, "status_code": 500, "detail": f"Worker process crashed: {e}"}
+                except Exception as e:
+                    outcome = {"ok": False, "status_code": 500, "detail": str(e)}
+
+                if outcome.get("cancelled"):
+                    job["status"] = "cancelled"
+                elif outcome["ok"]:
+                    job["status"] = "completed"
+                    job["outcome"] = outcome
+                else:
+                    job["status"] = "failed"
+                    job["outcome"] = outcome
+                    job["error"] = outcome.get("detail")
+
+            job["finished_at"] = time.time()
+            job["future"] = None
+            job["pool"] = None
+            job["payload"] = None
+            if state is not None:
+                state.pop(job_id, None)
+                state.pop(cancel_key(job_id), None)
+
+            self._running[job["kind"]] -= 1
+            self._dispatch(job["kind"])
+            self._prune()
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond MAX_FINISHED_JOBS (lock held)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job["finished_at"] is not None]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _get(self, job_id: str) -> Dict[str, Any]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            job = self._get(job_id)
+            progress, message = 0.0, None
+            if job["status"] == "completed":
+                progress = 1.0
+            elif job["status"] == "running":
+                state = self._state_for(job)
+                entry = state.get(job_id) if state is not None else None
+                if entry:
+                    progress, message = entry["progress"], entry["message"]
+                if state is not None and state.get(cancel_key(job_id)):
+                    message = "Cancelling"
+
+            return {
+                "job_id": job_id,
+                "kind": job["kind"],
+                "status": job["status"],
+                "progress": round(progress * 100, 1),
+                "message": message,
+                "error": job["error"],
+                "created_at": job["created_at"],
+                "started_at": job["started_at"],
+                "finished_at": job["finished_at"],
+            }
+
+    def list_jobs(self) -> list:
+        with self._lock:
+            return [self.status(job_id) for job_id in self._jobs]
+
+    def result(self, job_id: str) -> Dict[str, Any]:
+        """Outcome of a finished job ({'ok', 'result'} or {'ok', 'status_code', 'detail'}), None if unfinished"""
+        with self._lock:
+            job = self._get(job_id)
+            if job["status"] == "cancelled":
+                return {"ok": False, "status_code": 409, "detail": "Job was cancelled"}
+            return job["outcome"]
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """Cancel a queued job immediately, or ask a running job to stop at its next progress report"""
+        with self._lock:
+            job = self._get(job_id)
+            if job["status"] == "queued":
+                self._pending[job["kind"]].remove(job_id)
+                job["status"] = "cancelled"
+                job["finished_at"] = time.time()
+                job["payload"] = None
+                job["datasets"] = {}
+            elif job["status"] == "running":
+                if not job["future"].cancel():
+                    self._state_for(job)[cancel_key(job_id)] = True
+        return self.status(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": dict(self._running),
+                "queued": {kind: len(pending) for kind, pending in self._pending.items()},
+                "limits": {kind: spec["max_concurrent"] for kind, spec in JOB_KINDS.items()},
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for job_id in list(self._jobs):
+                job = self._jobs[job_id]
+                if job["status"] in ("queued", "running"):
+                    self.cancel(job_id)
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            if self._manager is not None:
+                self._manager.shutdown()
+
+
+job_manager = JobManager(int(os.environ.get("JOBS_MAX_WORKERS", DEFAULT_MAX_WORKERS)))
@@ -0,0 +1,160 @@
+"""
+Deferred imports of the heavy scientific libraries
+
+Services bind `stats = lazy_import("scipy.stats")` at module level and use it
+as the module itself; the import runs on first attribute access, so starting
+the server only pays for FastAPI, numpy and pandas. `warm_up` preloads every
+module's dependencies (main starts it in a background thread once the server
+is up) and `readiness` reports per API module whether its first request will
+still pay an import.
+"""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Heavy imports behind each API module; optional ones only add features
+MODULE_DEPENDENCIES: Dict[str, Dict[str, List[str]]] = {
+    "datasets": {"required": [], "optional": ["pyarrow", "pyarrow.csv", "pyarrow.ipc", "pyarrow.parquet"]},
+    "correlation": {"required": ["scipy.stats", "scipy.fft", "scipy.signal"], "optional": []},
+    "regression": {"required": ["scipy.stats", "scipy.linalg"], "optional": []},
+    "modelling": {
+        "required": [
+            "scipy.stats", "scipy.linalg", "scipy.optimize", "scipy.signal",
+            "statsmodels.stats.diagnostic", "statsmodels.stats.stattools", "statsmodels.stats.outliers_influence",
+        ],
+        "optional": [],
+    },
+    "feature_extraction": {
+        "required": ["sklearn.model_selection", "sklearn.ensemble", "threadpoolctl"],
+        "optional": ["xgboost"],  # booster "hist_gradient_boosting" works without it
+    },
+    "prophet": {"required": ["prophet", "prophet.serialize"], "optional": []},
+}
+
+_lock = threading.Lock()
+_loading: set = set()
+_load_ms: Dict[str, float] = {}
+_failed: Dict[str, str] = {}
+_warm_up = {"state": "idle", "started": None, "finished": None}
+
+
+@lru_cache(maxsize=None)
+def is_available(name: str) -> bool:
+    """Whether a package is installed, without importing it"""
+    try:
+        return importlib.util.find_spec(name.split(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def load(name: str):
+    """Import a module (once), recording how long the import took or why it failed"""
+    if name in sys.modules:
+        return importlib.import_module(name)  # Waits if another thread is still initializing it
+    with _lock:
+        _loading.add(name)
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(name)
+    except ImportError as e:
+        with _lock:
+            _failed[name] = str(e)
+        raise
+    finally:
+        with _lock:
+            _loading.discard(name)
+    with _lock:
+        _load_ms.setdefault(name, (time.perf_counter() - start) * 1000)
+    return module
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute: str) -> Any:
+        if self._module is None:
+            self._module = load(self._name)
+        return getattr(self._module, attribute)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def _dependency_state(name: str) -> str:
+    if name in _loading:
+        return "loading"
+    if name in sys.modules:
+        return "loaded"
+    if name in _failed or not is_available(name):
+        return "unavailable"
+    return "not_loaded"
+
+
+def readiness() -> Dict[str, Any]:
+    """
+    Per API module: "ready" (all imports done), "loading", "cold" (first
+    request imports them) or "unavailable" (a required package is missing)
+    """
+    modules = {}
+    with _lock:
+        for module, dependencies in MODULE_DEPENDENCIES.items():
+            states = {name: _dependency_state(name) for name in dependencies["required"] + dependencies["optional"]}
+            required = [states[name] for name in dependencies["required"]]
+            optional = [states[name] for name in dependencies["optional"]]
+            if "unavailable" in required:
+                status = "unavailable"
+            elif "loading" in required + optional:
+                status = "loading"
+            elif all(state == "loaded" for state in required) and "not_loaded" not in optional:
+                status = "ready"
+            else:
+                status = "cold"
+            modules[module] = {"status": status, "dependencies": states}
+        return {"modules": modules, "warm_up": dict(_warm_up), "import_ms": {k: round(v, 1) for k, v in _load_ms.items()}}
+
+
+def warm_up(modules: Optional[List[str]] = None) -> None:
+    """Import the dependencies of the given API modules (all by default), skipping missing packages"""
+    with _lock:
+        _warm_up.update(state="running", started=time.time())
+    start = time.perf_counter()
+    for module in modules or list(MODULE_DEPENDENCIES):
+        dependencies = MODULE_DEPENDENCIES[module]
+        for name in dependencies["required"] + dependencies["optional"]:
+            if name in sys.modules or not is_available(name):
+                continue
+            try:
+                load(name)
+            except Exception:
+                logger.warning("Warm-up import of %s failed", name, exc_info=True)
+    with _lock:
+        _warm_up.update(state="done", finished=time.time())
+    logger.info("Warm-up finished", extra={"duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+
+def start_warm_up(delay: float = 0.0) -> threading.Thread:
+    """Run `warm_up` in a daemon thread after `delay` seconds (lets the server start listening first)"""
+    def run():
+        time.sleep(delay)
+        warm_up()
+
+    thread = threading.Thread(target=run, name="import-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,66 @@
+"""
+Leveled, structured logging for the backend
+
+Modules log through `logging.getLogger(__name__)`; `configure_logging` sends
+records to stderr as one JSON object per line (or plain text), with any
+`extra={...}` fields included. Level and format come from LOG_LEVEL and
+LOG_FORMAT.
+"""
+
+import json
+import logging
+import os
+import sys
+
+# Try to import python-json-logger (richer JSON formatting); a minimal formatter is used otherwise
+try:
+    from pythonjsonlogger.json import JsonFormatter
+    JSON_LOGGER_AVAILABLE = True
+except ImportError:
+    try:
+        from pythonjsonlogger.jsonlogger import JsonFormatter
+        JSON_LOGGER_AVAILABLE = True
+    except ImportError:
+        JSON_LOGGER_AVAILABLE = False
+
+DEFAULT_LEVEL = "INFO"
+DEFAULT_FORMAT = "json"  # json or text
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class _StructuredFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, extra fields and any traceback"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: str = None, fmt: str = None) -> None:
+    """Route the backend's log records to stderr at the configured level (idempotent)"""
+    level = (level or os.environ.get("LOG_LEVEL", DEFAULT_LEVEL)).upper()
+    fmt = (fmt or os.environ.get("LOG_FORMAT", DEFAULT_FORMAT)).lower()
+
+    handler = logging.StreamHandler(sys.stderr)
+    if fmt == "json":
+        if JSON_LOGGER_AVAILABLE:
+            handler.setFormatter(JsonFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        else:
+            handler.setFormatter(_StructuredFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    logger = logging.getLogger("modules")
+    logger.handlers = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
@@ -0,0 +1,142 @@
+"""LRU caches for the modelling pipeline: transformed columns and fitted models"""
+
+import hashlib
+import os
+import threading
+import uuid
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Tuple
+from .models import VariableTransformation
+
+# Default memory budget for cached columns (override with MODELLING_TRANSFORM_CACHE_BYTES)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Number of fitted models kept for on-demand diagnostics (override with MODELLING_MAX_STORED_MODELS)
+DEFAULT_MAX_MODELS = 16
+
+
+def transformation_params(vt: VariableTransformation) -> Tuple:
+    """Parameters that determine a transformed column (everything except the variable name)"""
+    return (
+        vt.pre_transform,
+        int(vt.lag),
+        int(vt.lead),
+        float(vt.adstock),
+        float(vt.dimret),
+        bool(vt.dimret_adstock),
+        vt.post_transform,
+    )
+
+
+def column_hash(values: np.ndarray) -> str:
+    """Content hash of a float column"""
+    return hashlib.blake2b(np.ascontiguousarray(values, dtype=float).tobytes(), digest_size=16).hexdigest()
+
+
+class TransformCache:
+    """
+    Byte-bounded LRU cache of transformed columns
+
+    Keys combine the source column content hash, the model date window and the
+    transformation parameters; values are read-only float arrays.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(values: np.ndarray, start_date: str, end_date: str, vt: VariableTransformation) -> Tuple:
+        return (column_hash(values), start_date, end_date, transformation_params(vt))
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: np.ndarray) -> None:
+        value = np.array(value, dtype=float)
+        value.flags.writeable = False
+        if value.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes
+            self._entries[key] = value
+            self.current_bytes += value.nbytes
+            self._evict()
+
+    def resize(self, max_bytes: int) -> None:
+        """Change the memory budget, evicting entries if needed"""
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _evict(self) -> None:
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": int(self.current_bytes),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": float(self.hits / total) if total else 0.0
+            }
+
+
+class ModelStore:
+    """LRU store of fitted models (residuals, fitted values, design matrix) addressed by model_id"""
+
+    def __init__(self, max_models: int = DEFAULT_MAX_MODELS):
+        self.max_models = int(max_models)
+        self._models: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, model: Dict[str, Any]) -> str:
+        model_id = uuid.uuid4().hex[:16]
+        with self._lock:
+            self._models[model_id] = model
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return model_id
+
+    def get(self, model_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            model = self._models.get(model_id)
+            if model is not None:
+                self._models.move_to_end(model_id)
+            return model
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._models), "max_models": self.max_models}
+
+
+transform_cache = TransformCache(int(os.environ.get("MODELLING_TRANSFORM_CACHE_BYTES", DEFAULT_MAX_BYTES)))
+model_store = ModelStore(int(os.environ.get("MODELLING_MAX_STORED_MODELS", DEFAULT_MAX_MODELS)))
@@ -1,7 +1,7 @@
 """Pydantic models for modelling API"""
 
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 
 
 class VariableTransformation(BaseModel):
@@ -15,6 +15,8 @@ class VariableTransformation(BaseModel):
     dimret: float = 0.0  # 0-1 range for percentage conversion
     dimret_adstock: bool = False  # Combined dimret + adstock
     post_transform: Optional[str] = None  # 'log', 'sqrt', 'exp', None
+    min_coef: Optional[float] = None  # Lower coefficient bound (e.g. 0 for positive media effects)
+    max_coef: Optional[float] = None  # Upper coefficient bound
 
 
 class ModelConfiguration(BaseModel):
@@ -31,7 +33,18 @@ class RegressionRequest(BaseModel):
     """Request to run regression with transformations"""
     model_configuration: ModelConfiguration
     variable_transformations: List[VariableTransformation]
-    data: Dict[str, List[Any]]  # Column name -> values
+    data: Optional[Dict[str, List[Any]]] = None  # Column name -> values
+    dataset_id: Optional[str] = None  # Registered dataset instead of raw data
+    columns: Optional[List[str]] = None  # Dataset columns to load (default: KPI, variables and date)
+    diagnostics: Union[str, List[str]] = "full"  # 'none', 'basic', 'full' or a list of test names
+    white_test_max_regressors: int = 30  # Above this, the White test uses its reduced form
+
+
+class DiagnosticsRequest(BaseModel):
+    """Request to compute diagnostics for a previously fitted model"""
+    model_id: str
+    diagnostics: Union[str, List[str]] = "full"  # 'none', 'basic', 'full' or a list of test names
+    white_test_max_regressors: int = 30
 
 
 class TransformDataRequest(BaseModel):
@@ -60,14 +73,16 @@ class RegressionResult(BaseModel):
 
 
 class ModelDiagnostics(BaseModel):
-    """Model diagnostic statistics"""
-    jarque_bera_stat: float
-    jarque_bera_pvalue: float
-    ljung_box_stat: float
-    ljung_box_pvalue: float
-    breusch_pagan_stat: float
-    breusch_pagan_pvalue: float
-    white_test_stat: float
-    white_test_pvalue: float
-    condition_number: float
-    vif_values: Dict[str, float]
+    """Model diagnostic statistics (only the requested tests are present)"""
+    jarque_bera_stat: Optional[float] = None
+    jarque_bera_pvalue: Optional[float] = None
+    ljung_box_stat: Optional[float] = None
+    ljung_box_pvalue: Optional[float] = None
+    breusch_pagan_stat: Optional[float] = None
+    breusch_pagan_pvalue: Optional[float] = None
+    white_test_stat: Optional[float] = None
+    white_test_pvalue: Optional[float] = None
+    white_test_variant: Optional[str] = None  # 'full' or 'reduced'
+    condition_number: Optional[float] = None  # Raw design matrix, constant included
+    scaled_condition_number: Optional[float] = None  # Standardized regressors, independent of units
+    vif_values: Optional[Dict[str, float]] = None
@@ -1,14 +1,16 @@
 """Modelling API routes"""
 
-from fastapi import APIRouter, HTTPException
-from .models import RegressionRequest, TransformDataRequest, VariableTransformation
-from .service import run_modelling_regression, transform_single_variable
+from fastapi import APIRouter, HTTPException, Header
+from typing import Optional
+from .models import RegressionRequest, TransformDataRequest, VariableTransformation, DiagnosticsRequest
+from .service import run_modelling_regression, transform_single_variable, calculate_stored_model_diagnostics
+from ..encoding import encode_response
 
 router = APIRouter()
 
 
 @router.post("/regression")
-async def run_regression(request: RegressionRequest):
+def run_regression(request: RegressionRequest, accept: Optional[str] = Header(None)):
     """
     Run econometric regression with variable transformations
 
@@ -26,19 +28,53 @@ async def run_regression(request: RegressionRequest):
     - Residuals and fitted values
     - Transformed data
     - Variable contributions
-    - Diagnostic tests (Jarque-Bera, Ljung-Box, Breusch-Pagan, White, VIF)
+    - Diagnostic tests (Jarque-Bera, Ljung-Box, Breusch-Pagan, White, VIF),
+      selected with `diagnostics`: 'none', 'basic', 'full' (default) or a list of tests
+    - model_id for computing further diagnostics later via /diagnostics
     """
     try:
         result = run_modelling_regression(request)
-        return result
+        return encode_response(result, accept, nan_value=0.0)
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Regression failed: {str(e)}")
 
 
+@router.post("/diagnostics")
+def model_diagnostics(request: DiagnosticsRequest, accept: Optional[str] = Header(None)):
+    """
+    Compute diagnostics for a model previously fitted by /regression
+
+    Lets interactive re-fits skip diagnostics (`diagnostics: "none"`) and
+    fetch them only when the model statistics are viewed.
+
+    Returns:
+    - model_id
+    - diagnostics: the requested test statistics
+    """
+    try:
+        result = calculate_stored_model_diagnostics(
+            request.model_id,
+            request.diagnostics,
+            request.white_test_max_regressors
+        )
+        return encode_response(result, accept, nan_value=0.0)
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Model '{request.model_id}' not found. Please re-run the regression."
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Diagnostics failed: {str(e)}")
+
+
 @router.post("/transform-preview")
-async def transform_preview(request: TransformDataRequest):
+def transform_preview(request: TransformDataRequest, accept: Optional[str] = Header(None)):
     """
     Preview transformation on a single variable without running regression
 
@@ -56,11 +92,11 @@ async def transform_preview(request: TransformDataRequest):
             request.data,
             request.transformation
         )
-        return {
+        return encode_response({
             "variable": request.variable_name,
             "original": request.data,
             "transformed": transformed
-        }
+        }, accept, nan_value=0.0)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transformation failed: {str(e)}")
 
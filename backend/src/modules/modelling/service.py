@@ -1,16 +1,42 @@
 """Modelling service layer - regression and diagnostics"""
 
+import logging
+import warnings
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
-from statsmodels.stats.diagnostic import het_breuschpagan, het_white, acorr_ljungbox
-from statsmodels.stats.stattools import durbin_watson, jarque_bera
-from statsmodels.stats.outliers_influence import variance_inflation_factor
-from scipy.optimize import minimize
-from scipy import stats
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Union
 from .models import RegressionRequest, RegressionResult, ModelDiagnostics, VariableTransformation
-from .transformations import apply_variable_transformation
+from .transformations import apply_variable_transformation, apply_variable_transformations_batch
+from .cache import transform_cache, model_store
+from ..datasets.service import DATE_COLUMNS, get_dataset, resolve_dataframe
+from ..jobs.progress import report_progress
+from ..dates import parse_dates
+from ..encoding import sanitize
+from ..timing import stage
+from ..lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+stats = lazy_import("scipy.stats")
+linalg = lazy_import("scipy.linalg")
+optimize = lazy_import("scipy.optimize")
+diagnostic = lazy_import("statsmodels.stats.diagnostic")
+stattools = lazy_import("statsmodels.stats.stattools")
+outliers_influence = lazy_import("statsmodels.stats.outliers_influence")
+
+# Relative singular value below which VIFs fall back to auxiliary regressions
+VIF_SINGULAR_TOL = 1e-8
+
+# Diagnostic tests and the presets accepted by the `diagnostics` request option
+DIAGNOSTIC_TESTS = ['jarque_bera', 'ljung_box', 'breusch_pagan', 'white', 'condition_number', 'vif']
+DIAGNOSTIC_LEVELS = {
+    'none': [],
+    'basic': ['jarque_bera', 'ljung_box', 'breusch_pagan'],
+    'full': DIAGNOSTIC_TESTS,
+}
+
+# Above this many regressors the White test switches to its reduced form
+WHITE_TEST_MAX_REGRESSORS = 30
 
 
 def sanitize_float(value: float, default: float = 0.0) -> float:
@@ -23,22 +49,12 @@ def sanitize_float(value: float, default: float = 0.0) -> float:
 
 
 def sanitize_dict(d: Dict[str, Any]) -> Dict[str, Any]:
-    """Recursively sanitize all float values in a dictionary"""
-    result = {}
-    for key, value in d.items():
-        if isinstance(value, dict):
-            result[key] = sanitize_dict(value)
-        elif isinstance(value, list):
-            result[key] = [sanitize_float(v) if isinstance(v, (int, float)) else v for v in value]
-        elif isinstance(value, (int, float)):
-            result[key] = sanitize_float(value)
-        else:
-            result[key] = value
-    return result
+    """Recursively replace NaN/Inf with 0.0 (arrays are sanitized in one vectorized pass)"""
+    return sanitize(d, 0.0)
 
 
 def transform_data(
-    data: Dict[str, List[Any]],
+    data: Union[Dict[str, List[Any]], pd.DataFrame],
     variable_transformations: List[VariableTransformation],
     start_date: str,
     end_date: str,
@@ -52,7 +68,7 @@ def transform_data(
         - transformed_df: Transformed data ready for regression
     """
     # Convert to DataFrame
-    df = pd.DataFrame(data)
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
 
     # Filter by date range (assuming 'obs' or 'date' column exists)
     date_col = None
@@ -62,75 +78,70 @@ def transform_data(
             break
 
     if date_col:
-        # Handle multiple date formats - try common formats
-        df[date_col] = pd.to_datetime(df[date_col], format='mixed', dayfirst=True)
-        start = pd.to_datetime(start_date, format='mixed', dayfirst=True)
-        end = pd.to_datetime(end_date, format='mixed', dayfirst=True)
-        df = df[(df[date_col] >= start) & (df[date_col] <= end)]
+        with stage("modelling.filter_dates"):
+            # ISO dates first, then day-first formats (DD/MM/YYYY)
+            df[date_col] = parse_dates(df[date_col])
+            start = parse_dates(start_date)
+            end = parse_dates(end_date)
+            df = df[(df[date_col] >= start) & (df[date_col] <= end)]
 
     original_df = df.copy()
 
-    # Create transformed DataFrame
-    transformed_data = {}
-
-    # Always include KPI in transformed data (without transformations unless specified)
-    if kpi in df.columns:
-        kpi_transformed = False
-        # Check if KPI has transformations specified
-        for var_config in variable_transformations:
-            if var_config.variable == kpi and var_config.include:
-                series = df[kpi].values
-                transformed_series = apply_variable_transformation(
-                    series,
-                    pre_transform=var_config.pre_transform,
-                    lag=var_config.lag,
-                    lead=var_config.lead,
-                    adstock=var_config.adstock,
-                    dimret=var_config.dimret,
-                    dimret_adstock=var_config.dimret_adstock,
-                    post_transform=var_config.post_transform
-                )
-                transformed_data[kpi] = transformed_series
-                kpi_transformed = True
-                break
-
-        # If KPI not in transformations, include it as-is
-        if not kpi_transformed:
-            transformed_data[kpi] = df[kpi].values
-
-    # Transform other variables
+    # Collect the columns to transform; the KPI uses its first included configuration,
+    # other variables the last one (matching repeated assignment by name)
+    configs = {}
+    kpi_config = next(
+        (vc for vc in variable_transformations if vc.variable == kpi and vc.include),
+        None
+    )
+    if kpi in df.columns and kpi_config is not None:
+        configs[kpi] = kpi_config
     for var_config in variable_transformations:
-        if not var_config.include:
-            continue
-
-        var_name = var_config.variable
-
-        # Skip KPI if already processed
-        if var_name == kpi:
-            continue
-
-        if var_name not in df.columns:
+        if not var_config.include or var_config.variable == kpi:
             continue
+        if var_config.variable in df.columns:
+            configs[var_config.variable] = var_config
 
-        # Get the data
-        series = df[var_name].values
-
+    # Build one column-major matrix of the source columns
+    names = list(configs.keys())
+    matrix = np.empty((len(df), len(names)), dtype=float, order='F')
+    for i, var_name in enumerate(names):
         try:
-            # Apply transformations
-            transformed_series = apply_variable_transformation(
-                series,
-                pre_transform=var_config.pre_transform,
-                lag=var_config.lag,
-                lead=var_config.lead,
-                adstock=var_config.adstock,
-                dimret=var_config.dimret,
-                dimret_adstock=var_config.dimret_adstock,
-                post_transform=var_config.post_transform
-            )
-            transformed_data[var_name] = transformed_series
+            matrix[:, i] = np.asarray(df[var_name].values, dtype=float)
         except Exception as e:
             raise ValueError(f"Error transforming variable '{var_name}': {str(e)}")
 
+    # Reuse cached columns and transform only the misses in a single batch
+    keys = [
+        transform_cache.make_key(matrix[:, i], start_date, end_date, configs[var_name])
+        for i, var_name in enumerate(names)
+    ]
+    columns = [transform_cache.get(key) for key in keys]
+    missing = [i for i, column in enumerate(columns) if column is None]
+    if missing:
+        missing_configs = [configs[names[i]] for i in missing]
+        with stage("modelling.transform"):
+            transformed_matrix = apply_variable_transformations_batch(
+                matrix[:, missing],
+                pre_transform=[vc.pre_transform for vc in missing_configs],
+                lag=[vc.lag for vc in missing_configs],
+                lead=[vc.lead for vc in missing_configs],
+                adstock=[vc.adstock for vc in missing_configs],
+                dimret=[vc.dimret for vc in missing_configs],
+                dimret_adstock=[vc.dimret_adstock for vc in missing_configs],
+                post_transform=[vc.post_transform for vc in missing_configs]
+            )
+        for j, i in enumerate(missing):
+            columns[i] = transformed_matrix[:, j]
+            transform_cache.put(keys[i], columns[i])
+
+    # Always include KPI in transformed data (as-is unless a transformation is specified)
+    transformed_data = {}
+    if kpi in df.columns and kpi not in configs:
+        transformed_data[kpi] = df[kpi].values
+    for var_name, column in zip(names, columns):
+        transformed_data[var_name] = column
+
     transformed_df = pd.DataFrame(transformed_data)
 
     # Add date column if it exists
@@ -140,6 +151,100 @@ def transform_data(
     return original_df, transformed_df
 
 
+def with_constant(X: pd.DataFrame) -> np.ndarray:
+    """Design matrix with a leading column of ones"""
+    return np.column_stack([np.ones(len(X)), X.to_numpy(dtype=np.float64)])
+
+
+def has_active_bounds(bounds: Optional[List[Tuple[Optional[float], Optional[float]]]]) -> bool:
+    """True if any coefficient has a finite lower or upper bound"""
+    if not bounds:
+        return False
+    for lower, upper in bounds:
+        if lower is not None and np.isfinite(lower):
+            return True
+        if upper is not None and np.isfinite(upper):
+            return True
+    return False
+
+
+def solve_ols_qr(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray, int]:
+    """
+    Closed-form OLS from a single QR factorization
+
+    Returns:
+        - coefficients
+        - diagonal of (X'X)^-1 (pseudo-inverse if X is rank deficient; None if it cannot be computed)
+        - fitted values
+        - rank of X (the number of estimated parameters)
+    """
+    n, p = X.shape
+    if n >= p and p > 0:
+        Q, R = np.linalg.qr(X, mode='reduced')
+        diag_r = np.abs(np.diag(R))
+        if diag_r.min() > diag_r.max() * max(n, p) * np.finfo(float).eps:
+            qty = Q.T @ y
+            coefficients = linalg.solve_triangular(R, qty, lower=False)
+            # (X'X)^-1 = R^-1 R^-T, so its diagonal is the row norms of R^-1
+            r_inv = linalg.solve_triangular(R, np.eye(p), lower=False)
+            unscaled_var = np.sum(r_inv ** 2, axis=1)
+            return coefficients, unscaled_var, Q @ qty, p
+
+    # Rank deficient: minimum-norm solution with pseudo-inverse variances
+    coefficients, _, rank, _ = np.linalg.lstsq(X, y, rcond=None)
+    try:
+        unscaled_var = np.diag(np.linalg.pinv(X.T @ X))
+    except np.linalg.LinAlgError:
+        unscaled_var = None
+    return coefficients, unscaled_var, X @ coefficients, int(rank)
+
+
+def solve_bounded_bvls(
+    X: np.ndarray,
+    y: np.ndarray,
+    bounds: List[Tuple[Optional[float], Optional[float]]]
+) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray, bool]:
+    """
+    Bounded least squares with the BVLS active-set algorithm (scipy.optimize.lsq_linear)
+
+    Coefficients that finish on a bound are fixed there rather than estimated,
+    so their variance is undefined (NaN) and the variances of the free
+    coefficients come from the free-variable subproblem. Coefficients pinned
+    by min_coef == max_coef are taken out of the solve (their contribution
+    is subtracted from y) and reported as at bound.
+
+    Returns:
+        - coefficients
+        - diagonal of (X_free'X_free)^-1, NaN at bound (None if it cannot be inverted)
+        - mask of coefficients sitting on a bound
+        - whether the solver converged
+    """
+    lower = np.array([-np.inf if lo is None else lo for lo, _ in bounds], dtype=float)
+    upper = np.array([np.inf if hi is None else hi for _, hi in bounds], dtype=float)
+
+    pinned = lower == upper
+    coefficients = np.where(pinned, lower, 0.0)
+    at_bound = pinned.copy()
+    success = True
+    solved = ~pinned
+    if np.any(solved):
+        y_solved = y - X[:, pinned] @ lower[pinned]
+        result = optimize.lsq_linear(X[:, solved], y_solved, bounds=(lower[solved], upper[solved]), method='bvls')
+        coefficients[solved] = np.clip(result.x, lower[solved], upper[solved])
+        at_bound[solved] = result.active_mask != 0
+        success = bool(result.success)
+
+    free = ~at_bound
+    unscaled_var = np.full(len(coefficients), np.nan)
+    if np.any(free):
+        try:
+            unscaled_var[free] = np.diag(np.linalg.inv(X[:, free].T @ X[:, free]))
+        except np.linalg.LinAlgError:
+            unscaled_var = None
+
+    return coefficients, unscaled_var, at_bound, success
+
+
 def run_regression_with_bounds(
     y: np.ndarray,
     X: pd.DataFrame,
@@ -147,10 +252,11 @@ def run_regression_with_bounds(
     add_constant: bool = True
 ) -> Tuple[Dict[str, Any], Dict[str, List[float]]]:
     """
-    Run OLS regression with optional coefficient bounds using scipy.optimize.minimize
+    Run OLS regression with optional coefficient bounds
 
-    This matches the PySide6 implementation which uses constrained optimization
-    to ensure coefficients stay within specified min/max bounds.
+    Without active bounds the fit is exact, from a single QR factorization.
+    With bounds, coefficients are kept within their min/max limits (as in the
+    PySide6 implementation) by bounded-variable least squares.
 
     Returns:
         - model_results: Dictionary with coefficients, statistics, and fit metrics
@@ -158,56 +264,36 @@ def run_regression_with_bounds(
     """
     # Prepare data
     if add_constant:
-        X_array = sm.add_constant(X).values
+        X_array = with_constant(X)
         var_names = ['const'] + list(X.columns)
     else:
-        X_array = X.values
+        X_array = X.to_numpy(dtype=np.float64)
         var_names = list(X.columns)
 
     y_array = np.asarray(y, dtype=np.float64)
 
     # Filter out invalid rows (only NaN/inf, keep zeros)
-    valid_rows = np.isfinite(y_array) & ~np.isnan(y_array)
-    for i in range(X_array.shape[1]):
-        valid_rows &= np.isfinite(X_array[:, i]) & ~np.isnan(X_array[:, i])
+    valid_rows = np.isfinite(y_array) & np.isfinite(X_array).all(axis=1)
 
     y_valid = y_array[valid_rows]
     X_valid = X_array[valid_rows]
 
-    # Define RSS (Residual Sum of Squares) function to minimize
-    def rss(params, X, y):
-        predictions = X @ params
-        residuals = y - predictions
-        return np.sum(residuals**2)
-
-    # Initial guess using least squares
-    try:
-        initial_guess = np.linalg.lstsq(X_valid, y_valid, rcond=None)[0]
-    except:
-        initial_guess = np.zeros(X_valid.shape[1])
-
-    # Run optimization with bounds
-    if bounds:
-        result = minimize(
-            rss,
-            x0=initial_guess,
-            args=(X_valid, y_valid),
-            bounds=bounds,
-            method='L-BFGS-B'
-        )
+    # Unbounded fits are solved exactly from one QR factorization;
+    # only real coefficient bounds go through bounded least squares
+    if has_active_bounds(bounds):
+        coefficients, unscaled_var, at_bound, optimization_success = solve_bounded_bvls(X_valid, y_valid, bounds)
+        # Coefficients fixed on a bound are not estimated, so they do not use degrees of freedom
+        p = int(np.sum(~at_bound))
+        solver = 'bvls'
     else:
-        result = minimize(
-            rss,
-            x0=initial_guess,
-            args=(X_valid, y_valid),
-            method='L-BFGS-B'
-        )
-
-    # Extract coefficients
-    coefficients = result.x
+        coefficients, unscaled_var, predictions, p = solve_ols_qr(X_valid, y_valid)
+        at_bound = np.zeros(len(coefficients), dtype=bool)
+        optimization_success = True
+        solver = 'qr'
 
     # Calculate predicted values and residuals
-    predictions = X_valid @ coefficients
+    if solver != 'qr':
+        predictions = X_valid @ coefficients
     residuals = y_valid - predictions
 
     # Calculate R-squared
@@ -216,16 +302,16 @@ def run_regression_with_bounds(
     r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
 
     # Calculate adjusted R-squared
+    # p counts estimated parameters (including the constant), as statsmodels' df_model + k_constant
     n = len(y_valid)
-    p = len(coefficients)
-    adj_r_squared = 1 - (1 - r_squared) * (n - 1) / (n - p - 1) if (n - p - 1) > 0 else 0
+    k_constant = 1 if add_constant else 0
+    adj_r_squared = 1 - (1 - r_squared) * (n - k_constant) / (n - p) if (n - p) > 0 else 0
 
     # Calculate standard errors
     mse = ss_res / (n - p) if (n - p) > 0 else 0
-    try:
-        var_coef = mse * np.linalg.inv(X_valid.T @ X_valid)
-        std_errors = np.sqrt(np.diag(var_coef))
-    except:
+    if unscaled_var is not None:
+        std_errors = np.sqrt(np.maximum(mse * unscaled_var, 0))
+    else:
         std_errors = np.zeros(len(coefficients))
 
     # Calculate t-statistics and p-values (handle zeros in std_errors)
@@ -281,7 +367,9 @@ def run_regression_with_bounds(
         'df_resid': int(n - p),
         'residuals': residuals,
         'fitted_values': predictions,
-        'optimization_success': result.success
+        'optimization_success': bool(optimization_success),
+        'solver': solver,
+        'at_bound': [name for name, bound in zip(var_names, at_bound) if bound]
     }
 
     # Calculate contributions (full array including invalid rows)
@@ -289,74 +377,173 @@ def run_regression_with_bounds(
     full_predictions = X_array @ coefficients
     for i, col in enumerate(var_names):
         if col == 'const':
-            contributions[col] = [float(coefficients[i])] * len(y_array)
+            contributions[col] = np.full(len(y_array), float(coefficients[i]))
         else:
             col_idx = i - 1 if add_constant else i
-            contributions[col] = (X.iloc[:, col_idx].values * coefficients[i]).tolist()
+            contributions[col] = X.iloc[:, col_idx].to_numpy(dtype=float) * coefficients[i]
 
     return model_results, contributions
 
 
-def calculate_diagnostics(residuals: np.ndarray, X_array: np.ndarray, X_names: List[str]) -> Dict[str, Any]:
-    """Calculate regression diagnostic statistics from residuals and design matrix"""
+def collinearity_diagnostics(X_array: np.ndarray, X_names: List[str]) -> Tuple[Dict[str, float], float, float]:
+    """
+    VIFs and condition numbers of the design matrix
+
+    The standardized regressors Z = U S V' satisfy Z'Z = R, the regressor
+    correlation matrix, so VIF_j = [R^-1]_jj = sum_k (V_jk / s_k)^2 and the
+    scaled condition number (R's square root, independent of variable units)
+    is s_max / s_min. Near-singular matrices fall back to statsmodels'
+    per-column auxiliary OLS.
+
+    Returns:
+        - VIF per regressor
+        - condition number of the raw design matrix (as np.linalg.cond)
+        - condition number of the standardized regressors
+    """
+    raw_singular_values = np.linalg.svd(np.asarray(X_array, dtype=float), compute_uv=False)
+    condition_number = (raw_singular_values[0] / raw_singular_values[-1]
+                        if raw_singular_values[-1] > 0 else np.inf)
+
+    # Skip constant column (first column if present)
+    start_idx = 1 if 'const' in X_names else 0
+    names = X_names[start_idx:]
+    X = np.asarray(X_array[:, start_idx:], dtype=float)
+    X = X - X.mean(axis=0)
+
+    vif = np.full(len(names), np.inf)
+    norms = np.sqrt(np.sum(X ** 2, axis=0))
+    usable = norms > 0  # zero-variance regressors are perfectly collinear with the constant
+    if not np.any(usable):
+        return dict(zip(names, vif)), condition_number, 1.0
+
+    _, singular_values, vt = np.linalg.svd(X[:, usable] / norms[usable], full_matrices=False)
+    s_max, s_min = singular_values[0], singular_values[-1]
+    scaled_condition_number = s_max / s_min if s_min > 0 else np.inf
+
+    if s_min > s_max * VIF_SINGULAR_TOL:
+        vif[usable] = np.sum((vt.T / singular_values) ** 2, axis=1)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for i in np.flatnonzero(usable):
+                vif[i] = outliers_influence.variance_inflation_factor(X_array, i + start_idx)
+
+    return dict(zip(names, vif)), condition_number, scaled_condition_number
+
+
+def resolve_diagnostic_tests(selection: Union[str, List[str], None]) -> List[str]:
+    """Expand a diagnostics option ('none', 'basic', 'full' or a list of test names) into test names"""
+    if selection is None:
+        return list(DIAGNOSTIC_TESTS)
+    if isinstance(selection, str):
+        if selection not in DIAGNOSTIC_LEVELS:
+            raise ValueError(
+                f"Unknown diagnostics level '{selection}'. Use one of {list(DIAGNOSTIC_LEVELS)} or a list of {DIAGNOSTIC_TESTS}"
+            )
+        return list(DIAGNOSTIC_LEVELS[selection])
+    unknown = [test for test in selection if test not in DIAGNOSTIC_TESTS]
+    if unknown:
+        raise ValueError(f"Unknown diagnostic tests {unknown}. Available tests: {DIAGNOSTIC_TESTS}")
+    return [test for test in DIAGNOSTIC_TESTS if test in selection]
+
+
+def white_test_reduced(residuals: np.ndarray, fitted_values: np.ndarray) -> Tuple[float, float]:
+    """
+    Reduced-form (special) White test
+
+    Regresses squared residuals on the fitted values and their squares instead of
+    every regressor square and cross-product: LM = n * R^2 ~ chi2(2).
+    """
+    e2 = np.asarray(residuals, dtype=float) ** 2
+    fitted = np.asarray(fitted_values, dtype=float)
+    Z = np.column_stack([np.ones_like(fitted), fitted, fitted ** 2])
+    coef = np.linalg.lstsq(Z, e2, rcond=None)[0]
+    ss_res = np.sum((e2 - Z @ coef) ** 2)
+    ss_tot = np.sum((e2 - e2.mean()) ** 2)
+    r_squared = 1 - ss_res / ss_tot if ss_tot > 0 else 0.0
+    lm_stat = len(e2) * r_squared
+    return float(lm_stat), float(stats.chi2.sf(lm_stat, 2))
+
+
+def calculate_diagnostics(
+    residuals: np.ndarray,
+    X_array: np.ndarray,
+    X_names: List[str],
+    tests: Optional[List[str]] = None,
+    fitted_values: Optional[np.ndarray] = None,
+    white_max_regressors: int = WHITE_TEST_MAX_REGRESSORS
+) -> Dict[str, Any]:
+    """
+    Calculate regression diagnostic statistics from residuals and design matrix
 
+    Only the requested tests are computed (all when tests is None). Above
+    white_max_regressors regressors the White test uses the reduced form on the
+    fitted values, since the full form grows with the square of the regressor count.
+    """
+    tests = DIAGNOSTIC_TESTS if tests is None else tests
     diagnostics = {}
 
     # Jarque-Bera test for normality
-    try:
-        jb_stat, jb_pvalue, _, _ = jarque_bera(residuals)
-        diagnostics['jarque_bera_stat'] = float(jb_stat)
-        diagnostics['jarque_bera_pvalue'] = float(jb_pvalue)
-    except:
-        diagnostics['jarque_bera_stat'] = 0.0
-        diagnostics['jarque_bera_pvalue'] = 1.0
+    if 'jarque_bera' in tests:
+        try:
+            jb_stat, jb_pvalue, _, _ = stattools.jarque_bera(residuals)
+            diagnostics['jarque_bera_stat'] = float(jb_stat)
+            diagnostics['jarque_bera_pvalue'] = float(jb_pvalue)
+        except:
+            diagnostics['jarque_bera_stat'] = 0.0
+            diagnostics['jarque_bera_pvalue'] = 1.0
 
     # Ljung-Box test for autocorrelation
-    try:
-        lb_test = acorr_ljungbox(residuals, lags=[min(10, len(residuals)//2)], return_df=False)
-        diagnostics['ljung_box_stat'] = float(lb_test[0][0]) if len(lb_test[0]) > 0 else 0.0
-        diagnostics['ljung_box_pvalue'] = float(lb_test[1][0]) if len(lb_test[1]) > 0 else 1.0
-    except:
-        diagnostics['ljung_box_stat'] = 0.0
-        diagnostics['ljung_box_pvalue'] = 1.0
+    if 'ljung_box' in tests:
+        try:
+            lb_test = diagnostic.acorr_ljungbox(residuals, lags=[min(10, len(residuals)//2)])
+            diagnostics['ljung_box_stat'] = float(lb_test['lb_stat'].iloc[0]) if len(lb_test) > 0 else 0.0
+            diagnostics['ljung_box_pvalue'] = float(lb_test['lb_pvalue'].iloc[0]) if len(lb_test) > 0 else 1.0
+        except:
+            diagnostics['ljung_box_stat'] = 0.0
+            diagnostics['ljung_box_pvalue'] = 1.0
 
     # Breusch-Pagan test for heteroskedasticity
-    try:
-        bp_test = het_breuschpagan(residuals, X_array)
-        diagnostics['breusch_pagan_stat'] = float(bp_test[0])
-        diagnostics['breusch_pagan_pvalue'] = float(bp_test[1])
-    except:
-        diagnostics['breusch_pagan_stat'] = 0.0
-        diagnostics['breusch_pagan_pvalue'] = 1.0
-
-    # White test for heteroskedasticity
-    try:
-        white_test = het_white(residuals, X_array)
-        diagnostics['white_test_stat'] = float(white_test[0])
-        diagnostics['white_test_pvalue'] = float(white_test[1])
-    except:
-        diagnostics['white_test_stat'] = 0.0
-        diagnostics['white_test_pvalue'] = 1.0
-
-    # Condition number
-    try:
-        diagnostics['condition_number'] = float(np.linalg.cond(X_array))
-    except:
-        diagnostics['condition_number'] = 0.0
-
-    # VIF (Variance Inflation Factor)
-    vif_values = {}
-    try:
-        # Skip constant column (first column if present)
-        start_idx = 1 if 'const' in X_names else 0
-        for i, col in enumerate(X_names[start_idx:], start=start_idx):
-            vif = variance_inflation_factor(X_array, i)
-            vif_values[col] = sanitize_float(vif)
-    except Exception as e:
-        print(f"VIF calculation error: {e}")
-        pass
+    if 'breusch_pagan' in tests:
+        try:
+            bp_test = diagnostic.het_breuschpagan(residuals, X_array)
+            diagnostics['breusch_pagan_stat'] = float(bp_test[0])
+            diagnostics['breusch_pagan_pvalue'] = float(bp_test[1])
+        except:
+            diagnostics['breusch_pagan_stat'] = 0.0
+            diagnostics['breusch_pagan_pvalue'] = 1.0
+
+    # White test for heteroskedasticity (reduced form for wide models)
+    if 'white' in tests:
+        n_regressors = len([name for name in X_names if name != 'const'])
+        use_reduced = n_regressors > white_max_regressors and fitted_values is not None
+        try:
+            if use_reduced:
+                white_stat, white_pvalue = white_test_reduced(residuals, fitted_values)
+            else:
+                white_stat, white_pvalue = diagnostic.het_white(residuals, X_array)[:2]
+            diagnostics['white_test_stat'] = float(white_stat)
+            diagnostics['white_test_pvalue'] = float(white_pvalue)
+        except:
+            diagnostics['white_test_stat'] = 0.0
+            diagnostics['white_test_pvalue'] = 1.0
+        diagnostics['white_test_variant'] = 'reduced' if use_reduced else 'full'
+
+    # VIF (Variance Inflation Factor) and condition number from one decomposition
+    if 'condition_number' in tests or 'vif' in tests:
+        vif_values = {}
+        try:
+            vifs, condition_number, scaled_condition_number = collinearity_diagnostics(X_array, X_names)
+            vif_values = {col: sanitize_float(vif) for col, vif in vifs.items()}
+        except Exception as e:
+            logger.warning("VIF calculation error: %s", e)
+            condition_number = scaled_condition_number = 0.0
 
-    diagnostics['vif_values'] = vif_values
+        if 'condition_number' in tests:
+            diagnostics['condition_number'] = float(condition_number)
+            diagnostics['scaled_condition_number'] = float(scaled_condition_number)
+        if 'vif' in tests:
+            diagnostics['vif_values'] = vif_values
 
     # Sanitize all diagnostic values
     return sanitize_dict(diagnostics)
@@ -367,7 +554,8 @@ def run_modelling_regression(request: RegressionRequest) -> Dict[str, Any]:
     Main function to run regression with transformations
 
     This implementation matches the successful PySide6 approach:
-    - Uses scipy.optimize.minimize with L-BFGS-B for constrained optimization
+    - Solves unconstrained fits exactly with a QR factorization
+    - Uses bounded-variable least squares (BVLS) for constrained optimization
     - Supports coefficient bounds (min/max constraints)
     - Handles variable transformations in the correct order
 
@@ -378,12 +566,23 @@ def run_modelling_regression(request: RegressionRequest) -> Dict[str, Any]:
     - Diagnostic tests
     """
 
-    # Get target variable (KPI)
+    # Get target variable (KPI) and the diagnostics to compute
     kpi = request.model_configuration.kpi
+    diagnostic_tests = resolve_diagnostic_tests(request.diagnostics)
+
+    # Load only the columns the model needs when working from a registered dataset
+    with stage("modelling.load"):
+        columns = request.columns
+        if request.dataset_id and columns is None:
+            available = get_dataset(request.dataset_id).columns
+            wanted = [kpi] + [vt.variable for vt in request.variable_transformations if vt.include] + DATE_COLUMNS
+            columns = [col for col in dict.fromkeys(wanted) if col in available]
+        data = resolve_dataframe(request.data, request.dataset_id, columns)
 
     # Transform the data
+    report_progress(0.1, "Transforming variables")
     original_df, transformed_df = transform_data(
-        request.data,
+        data,
         request.variable_transformations,
         request.model_configuration.start_date,
         request.model_configuration.end_date,
@@ -419,28 +618,47 @@ def run_modelling_regression(request: RegressionRequest) -> Dict[str, Any]:
     for col in X.columns:
         if col in var_transform_dict:
             vt = var_transform_dict[col]
-            # Note: Coefficient bounds are not in the current VariableTransformation model
-            # For now, use unconstrained
-            bounds.append((None, None))
+            if vt.min_coef is not None and vt.max_coef is not None and vt.min_coef > vt.max_coef:
+                raise ValueError(
+                    f"Invalid coefficient bounds for '{col}': min_coef ({vt.min_coef}) > max_coef ({vt.max_coef})"
+                )
+            bounds.append((vt.min_coef, vt.max_coef))
         else:
             bounds.append((None, None))
 
     # Run regression with bounds
-    model_results, contributions = run_regression_with_bounds(y, X, bounds=bounds, add_constant=True)
+    report_progress(0.4, "Fitting regression")
+    with stage("modelling.fit"):
+        model_results, contributions = run_regression_with_bounds(y, X, bounds=bounds, add_constant=True)
 
     # Prepare X array for diagnostics
-    X_array = sm.add_constant(X).values
+    X_array = with_constant(X)
     var_names = ['const'] + list(X.columns)
 
-    # Calculate diagnostics
-    diagnostics = calculate_diagnostics(
-        model_results['residuals'],
-        X_array,
-        var_names
-    )
+    # Keep what later diagnostics need, so they can be computed on demand
+    model_id = model_store.put({
+        'residuals': model_results['residuals'],
+        'fitted_values': model_results['fitted_values'],
+        'X_array': X_array,
+        'X_names': var_names
+    })
+
+    # Calculate the requested diagnostics
+    diagnostics = {}
+    if diagnostic_tests:
+        report_progress(0.6, "Running diagnostics")
+        with stage("modelling.diagnostics"):
+            diagnostics = calculate_diagnostics(
+                model_results['residuals'],
+                X_array,
+                var_names,
+                tests=diagnostic_tests,
+                fitted_values=model_results['fitted_values'],
+                white_max_regressors=request.white_test_max_regressors
+            )
 
     # Calculate Durbin-Watson
-    dw_stat = sanitize_float(durbin_watson(model_results['residuals']))
+    dw_stat = sanitize_float(stattools.durbin_watson(model_results['residuals']))
 
     # Prepare final results
     result = {
@@ -454,41 +672,62 @@ def run_modelling_regression(request: RegressionRequest) -> Dict[str, Any]:
         'aic': model_results['aic'],
         'bic': model_results['bic'],
         'durbin_watson': dw_stat,
-        'residuals': model_results['residuals'].tolist(),
-        'fitted_values': model_results['fitted_values'].tolist(),
-        'transformed_data': {col: transformed_df[col].tolist() for col in transformed_df.columns},
+        'residuals': model_results['residuals'],
+        'fitted_values': model_results['fitted_values'],
+        'transformed_data': {col: transformed_df[col].to_numpy() for col in transformed_df.columns},
         'variable_contributions': contributions,
         'diagnostics': diagnostics,
+        'model_id': model_id,
         'n_observations': model_results['n_obs'],
         'degrees_of_freedom': model_results['df_resid'],
-        'optimization_success': model_results['optimization_success']
+        'optimization_success': model_results['optimization_success'],
+        'solver': model_results['solver'],
+        'coefficients_at_bound': model_results['at_bound']
     }
 
-    # Debug logging
-    print(f"[DEBUG] Residuals length: {len(model_results['residuals'])}")
-    print(f"[DEBUG] Fitted values length: {len(model_results['fitted_values'])}")
-    print(f"[DEBUG] Transformed data shape: {transformed_df.shape}")
-    print(f"[DEBUG] Transformed data columns: {transformed_df.columns.tolist()}")
-    print(f"[DEBUG] First few residuals: {model_results['residuals'][:5].tolist()}")
-    print(f"[DEBUG] First few fitted values: {model_results['fitted_values'][:5].tolist()}")
+    logger.debug(
+        "Regression fitted",
+        extra={
+            "n_observations": model_results['n_obs'],
+            "n_regressors": len(var_names),
+            "transformed_shape": list(transformed_df.shape),
+            "solver": model_results['solver'],
+        }
+    )
 
     # Sanitize all values to ensure JSON compatibility
-    sanitized = sanitize_dict(result)
-
-    print(f"[DEBUG] After sanitization - residuals length: {len(sanitized['residuals'])}")
-    print(f"[DEBUG] After sanitization - fitted_values length: {len(sanitized['fitted_values'])}")
-    print(f"[DEBUG] After sanitization - transformed_data keys: {list(sanitized['transformed_data'].keys())}")
-    for key in sanitized['transformed_data']:
-        print(f"[DEBUG]   {key}: length={len(sanitized['transformed_data'][key])}")
+    with stage("modelling.sanitize"):
+        sanitized = sanitize_dict(result)
 
     return sanitized
 
 
+def calculate_stored_model_diagnostics(
+    model_id: str,
+    selection: Union[str, List[str], None] = 'full',
+    white_max_regressors: int = WHITE_TEST_MAX_REGRESSORS
+) -> Dict[str, Any]:
+    """Compute diagnostics later for a model fitted by run_modelling_regression"""
+    model = model_store.get(model_id)
+    if model is None:
+        raise KeyError(model_id)
+
+    diagnostics = calculate_diagnostics(
+        model['residuals'],
+        model['X_array'],
+        model['X_names'],
+        tests=resolve_diagnostic_tests(selection),
+        fitted_values=model['fitted_values'],
+        white_max_regressors=white_max_regressors
+    )
+    return {'model_id': model_id, 'diagnostics': diagnostics}
+
+
 def transform_single_variable(
     variable_name: str,
     data: List[float],
     transformation: VariableTransformation
-) -> List[float]:
+) -> np.ndarray:
     """
     Transform a single variable (for preview purposes)
     """
@@ -505,4 +744,4 @@ def transform_single_variable(
         post_transform=transformation.post_transform
     )
 
-    return transformed.tolist()
+    return transformed
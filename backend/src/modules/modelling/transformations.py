@@ -2,7 +2,10 @@
 
 import numpy as np
 import pandas as pd
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from ..lazy import lazy_import
+
+signal = lazy_import("scipy.signal")
 
 
 def apply_pre_transform(series: np.ndarray, transform_type: Optional[str]) -> np.ndarray:
@@ -207,3 +210,132 @@ def apply_variable_transformation(
         series = apply_post_transform(series, post_transform)
 
     return series
+
+
+def _apply_pre_transform_batch(matrix: np.ndarray, transform_types: Sequence[Optional[str]]) -> np.ndarray:
+    """Apply pre/post transformations column-wise, grouping columns by transform type"""
+    for transform_type in set(transform_types):
+        if not transform_type or transform_type not in ("log", "sqrt", "exp"):
+            continue
+        cols = np.array([t == transform_type for t in transform_types])
+        matrix[:, cols] = apply_pre_transform(matrix[:, cols], transform_type)
+    return matrix
+
+
+def _apply_shift_batch(matrix: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+    """
+    Shift every column by its own offset, zero-filling vacated rows
+    Positive shifts are lags, negative shifts are leads
+    """
+    if not np.any(shifts):
+        return matrix
+
+    n_rows = matrix.shape[0]
+    source = np.arange(n_rows)[:, None] - shifts[None, :]
+    valid = (source >= 0) & (source < n_rows)
+    shifted = np.take_along_axis(matrix, np.clip(source, 0, max(n_rows - 1, 0)), axis=0)
+    return np.asfortranarray(np.where(valid, shifted, 0.0))
+
+
+def _apply_adstock_batch(matrix: np.ndarray, ads_rates: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Apply adstock to the masked columns as a first-order linear filter
+    y[i] = x[i] + rate * y[i - 1], one lfilter call per distinct rate
+    """
+    for rate in np.unique(ads_rates[mask]):
+        cols = np.flatnonzero(mask & (ads_rates == rate))
+        block = matrix[:, cols]
+        # lfilter turns inf into NaN through its 0 * x term; keep the loop for those columns
+        has_inf = np.isinf(block).any(axis=0)
+        if np.any(~has_inf):
+            matrix[:, cols[~has_inf]] = signal.lfilter([1.0], [1.0, -rate], block[:, ~has_inf], axis=0)
+        for col in cols[has_inf]:
+            matrix[:, col] = apply_adstock(matrix[:, col], rate)
+    return matrix
+
+
+def _dimret_alpha(series: np.ndarray, dr_info: float) -> Optional[float]:
+    """Alpha for percentage-converted diminishing returns, None if there is no positive mean"""
+    positives = series[series > 0]
+    if len(positives) == 0:
+        return None
+    positive_mean = np.mean(positives)
+    if positive_mean > 0:
+        return -1 * np.log(1 - dr_info) / positive_mean
+    return None
+
+
+def apply_variable_transformations_batch(
+    matrix: np.ndarray,
+    pre_transform: Sequence[Optional[str]],
+    lag: Sequence[int],
+    lead: Sequence[int],
+    adstock: Sequence[float],
+    dimret: Sequence[float],
+    dimret_adstock: Sequence[bool],
+    post_transform: Sequence[Optional[str]]
+) -> np.ndarray:
+    """
+    Apply the full transformation pipeline to every column of a 2D matrix at once
+
+    Each parameter is a per-column vector with the same meaning as the scalar
+    arguments of apply_variable_transformation, and the output is bit-for-bit
+    identical to calling that function column by column. Element-wise stages run
+    as array operations over column groups, lag/lead is a single gather and
+    adstock is a linear-filter recursion instead of a Python loop.
+
+    Returns:
+        Transformed matrix of shape (n_rows, n_columns)
+    """
+    matrix = np.array(matrix, dtype=float, order="F")
+    n_cols = matrix.shape[1]
+
+    lag = np.asarray(lag, dtype=int).reshape(n_cols)
+    lead = np.asarray(lead, dtype=int).reshape(n_cols)
+    adstock = np.asarray(adstock, dtype=float).reshape(n_cols)
+    dimret = np.asarray(dimret, dtype=float).reshape(n_cols)
+    dimret_adstock = np.asarray(dimret_adstock, dtype=bool).reshape(n_cols)
+
+    # Step 1: Pre-transformation
+    matrix = _apply_pre_transform_batch(matrix, list(pre_transform))
+
+    # Step 2: Lag/Lead (lag takes precedence over lead)
+    shifts = np.where(lag > 0, lag, np.where(lead > 0, -lead, 0))
+    matrix = _apply_shift_batch(matrix, shifts)
+
+    # Step 3: Adstock and/or Diminishing Returns
+    combined = dimret_adstock & ((adstock > 0) | (dimret > 0))
+    do_adstock = np.where(combined, adstock != 0, adstock > 0)
+    do_dimret = np.where(combined, dimret != 0, dimret > 0)
+
+    # The combined transform derives alpha from the series before adstock,
+    # the separate transform from the series after it
+    alphas = np.zeros(n_cols)
+    for col in np.flatnonzero(do_dimret & combined):
+        series = matrix[:, col]
+        alpha = _dimret_alpha(series, dimret[col]) if np.sum(series) != 0 else None
+        if alpha is None:
+            do_dimret[col] = False
+        else:
+            alphas[col] = alpha
+
+    matrix = _apply_adstock_batch(matrix, adstock, do_adstock)
+
+    zero_sum = np.zeros(n_cols, dtype=bool)
+    for col in np.flatnonzero(do_dimret & ~combined):
+        series = matrix[:, col]
+        if np.sum(series) != 0:
+            alpha = _dimret_alpha(series, dimret[col])
+            alphas[col] = 0 if alpha is None else alpha
+        else:
+            zero_sum[col] = True
+
+    if np.any(do_dimret):
+        cols = np.flatnonzero(do_dimret)
+        matrix[:, cols] = 1 - np.exp(-1 * matrix[:, cols] * alphas[cols])
+        matrix[:, zero_sum] = 0.0
+
+    # Step 4: Post-transformation
+    matrix = _apply_pre_transform_batch(matrix, list(post_transform))
+
+    return matrix
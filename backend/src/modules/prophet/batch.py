@@ -0,0 +1,177 @@
+"""Forecast many series in a process pool, yielding each result as it completes"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+from .models import ProphetBatchRequest, ProphetRequest
+from .service import generate_forecast
+from ..datasets.service import get_dataset
+from ..lazy import load
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for batch forecasts; one core is left to the server (override with PROPHET_BATCH_WORKERS)
+DEFAULT_BATCH_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Largest batch accepted in one request
+MAX_BATCH_SERIES = 1000
+
+# Forecast settings a series inherits from its batch unless it sets them itself
+FORECAST_SETTINGS = [
+    "periods", "yearly_seasonality", "weekly_seasonality", "daily_seasonality",
+    "changepoint_prior_scale", "seasonality_prior_scale", "seasonality_mode", "mcmc_samples", "uncertainty_samples",
+]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    """Import Prophet once per worker rather than in its first fit"""
+    try:
+        load("prophet")
+    except ImportError:
+        pass
+
+
+def _forecast_series(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Forecast one series inside a worker; errors become part of the outcome"""
+    try:
+        return {"ok": True, "result": generate_forecast(ProphetRequest.model_validate(payload))}
+    except HTTPException as e:
+        return {"ok": False, "status_code": e.status_code, "detail": e.detail}
+    except ValueError as e:
+        return {"ok": False, "status_code": 400, "detail": str(e)}
+    except Exception as e:
+        logger.exception("Batch forecast failed: %s", e)
+        return {"ok": False, "status_code": 500, "detail": str(e)}
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by batch forecasts and cross-validation"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.environ.get("PROPHET_BATCH_WORKERS", DEFAULT_BATCH_WORKERS))
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, workers),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return _pool
+
+
+def discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool so the next batch starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _dataset_series(request: ProphetBatchRequest) -> List[Dict[str, Any]]:
+    """One series per value column of a registered dataset, sharing its date column"""
+    df = get_dataset(request.dataset_id)
+    if request.date_column not in df.columns:
+        raise HTTPException(status_code=400, detail=f"Date column '{request.date_column}' not found in dataset")
+
+    columns = request.value_columns
+    if columns is None:
+        columns = [col for col, dtype in df.dtypes.items() if col != request.date_column and pd.api.types.is_numeric_dtype(dtype)]
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Columns not found in dataset: {missing}")
+
+    dates = df[request.date_column]
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        dates = dates.dt.strftime('%Y-%m-%dT%H:%M:%S')
+    dates = dates.astype(str).tolist()
+    return [
+        {"name": str(col), "dates": dates, "values": pd.to_numeric(df[col], errors='coerce').astype(float).tolist()}
+        for col in columns
+    ]
+
+
+def batch_payloads(request: ProphetBatchRequest) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    (name, ProphetRequest payload) per series, with batch settings filled in
+
+    Problems with the batch as a whole raise HTTPException; problems with one
+    series are left for its own forecast to report.
+    """
+    series = [item.model_dump() for item in request.series]
+    if request.dataset_id:
+        series += _dataset_series(request)
+
+    if not series:
+        raise HTTPException(status_code=400, detail="Provide 'series' or a 'dataset_id' with value columns")
+    if len(series) > MAX_BATCH_SERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SERIES} series per batch, got {len(series)}")
+    names = [item["name"] for item in series]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Series names must be unique; repeated: {duplicates}")
+
+    payloads = []
+    for item in series:
+        payload = {key: getattr(request, key) if item.get(key) is None else item[key] for key in FORECAST_SETTINGS}
+        payload["dates"] = item["dates"] if item.get("dates") is not None else request.dates
+        payload["values"] = item["values"]
+        payloads.append((item["name"], payload))
+    return payloads
+
+
+def run_batch(payloads: List[Tuple[str, Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+    """
+    Forecast every series in the pool, yielding {"index", "name", "ok", ...}
+    in completion order, then a summary line
+
+    Each series succeeds or fails on its own. Closing the generator (e.g. the
+    client disconnected) cancels the series that have not started.
+    """
+    start = time.perf_counter()
+    pool = get_pool()
+    futures = {pool.submit(_forecast_series, payload): (index, name) for index, (name, payload) in enumerate(payloads)}
+    completed = failed = 0
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, name = futures[future]
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool as e:
+                    discard_pool(pool)
+                    outcome = {"ok": False, "status_code": 500, "detail": f"Worker process crashed: {e}"}
+                if outcome["ok"]:
+                    completed += 1
+                else:
+                    failed += 1
+                yield {"index": index, "name": name, **outcome}
+    finally:
+        for future in pending:
+            future.cancel()
+
+    yield {
+        "done": True,
+        "n_series": len(payloads),
+        "completed": completed,
+        "failed": failed,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
@@ -0,0 +1,200 @@
+"""Cache of fitted Prophet models keyed by series content and fit configuration"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from ..lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+serialize = lazy_import("prophet.serialize")
+
+# Fitted models kept in memory (override with PROPHET_MODEL_CACHE_SIZE)
+DEFAULT_MAX_MODELS = 8
+
+# Serialized models kept on disk when PROPHET_MODEL_CACHE_DIR is set (override with PROPHET_MODEL_CACHE_DISK_SIZE)
+DEFAULT_MAX_DISK_MODELS = 64
+
+
+def config_key(config: Dict[str, Any]) -> str:
+    """Hash of everything besides the data that shapes a fit"""
+    return hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def fit_key(ds: np.ndarray, y: np.ndarray, config: Dict[str, Any]) -> str:
+    """Content hash of the training series (dates and values) plus everything that shapes the fit"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(np.asarray(ds, dtype="datetime64[ns]").view(np.int64)).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=float).tobytes())
+    digest.update(config_key(config).encode())
+    return digest.hexdigest()
+
+
+class ProphetModelCache:
+    """
+    LRU of fitted Prophet models with an optional on-disk tier
+
+    Memory entries are the model objects themselves (only read by
+    make_future_dataframe / predict). With `cache_dir`, every fit is also
+    written as Prophet JSON, so worker processes and restarts share fits; a
+    disk hit is promoted into memory. Entries remember their configuration
+    group, so `find_extended` can find a fit whose history the request's
+    series extends.
+    """
+
+    def __init__(
+        self,
+        max_models: int = DEFAULT_MAX_MODELS,
+        cache_dir: Optional[str] = None,
+        max_disk_models: int = DEFAULT_MAX_DISK_MODELS,
+        dumps: Optional[Callable[[Any], str]] = None,
+        loads: Optional[Callable[[str], Any]] = None
+    ):
+        self.max_models = int(max_models)
+        self.cache_dir = cache_dir
+        self.max_disk_models = int(max_disk_models)
+        self._dumps = dumps or (lambda model: serialize.model_to_json(model))
+        self._loads = loads or (lambda text: serialize.model_from_json(text))
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._groups: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.extensions = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str, group: Optional[str] = None) -> Tuple[Optional[Any], Optional[str]]:
+        """(model, "memory" | "disk"), or (None, None) on a miss"""
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return model, "memory"
+
+        model = self._read(key) if self.cache_dir else None
+        with self._lock:
+            if model is None:
+                self.misses += 1
+                return None, None
+            self.disk_hits += 1
+            self._remember(key, model, group)
+        return model, "disk"
+
+    def put(self, key: str, model: Any, group: Optional[str] = None) -> None:
+        with self._lock:
+            self._remember(key, model, group)
+        if self.cache_dir:
+            self._write(key, model)
+
+    def find_extended(self, ds: np.ndarray, y: np.ndarray, group: str) -> Optional[Any]:
+        """
+        Most recent in-memory model of `group` whose training history is a
+        strict prefix of (ds, y), sorted by date; None if there is none
+        """
+        ds = np.asarray(ds, dtype="datetime64[ns]")
+        y = np.asarray(y, dtype=float)
+        with self._lock:
+            candidates = [model for key, model in reversed(self._models.items()) if self._groups.get(key) == group]
+        for model in candidates:
+            history = getattr(model, "history", None)
+            if history is None or not 0 < len(history) < len(ds):
+                continue
+            n = len(history)
+            if (np.array_equal(np.asarray(history['ds'], dtype="datetime64[ns]"), ds[:n])
+                    and np.array_equal(np.asarray(history['y'], dtype=float), y[:n])):
+                with self._lock:
+                    self.extensions += 1
+                return model
+        return None
+
+    def _remember(self, key: str, model: Any, group: Optional[str]) -> None:
+        self._models[key] = model
+        self._models.move_to_end(key)
+        self._groups[key] = group
+        while len(self._models) > self.max_models:
+            evicted, _ = self._models.popitem(last=False)
+            self._groups.pop(evicted, None)
+
+    def _read(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                model = self._loads(f.read())
+            os.utime(path)  # Disk eviction is least recently used first
+            return model
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Discarding unreadable cached Prophet model %s", path, exc_info=True)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _write(self, key: str, model: Any) -> None:
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                f.write(self._dumps(model))
+            os.replace(temporary, path)
+            self._prune_disk()
+        except Exception:
+            logger.warning("Could not write cached Prophet model %s", path, exc_info=True)
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+    def _prune_disk(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        for _, path in sorted(entries)[:max(len(entries) - self.max_disk_models, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._groups.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._models),
+                "max_models": self.max_models,
+                "disk_dir": self.cache_dir,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "extensions": self.extensions,
+                "hit_rate": float((self.hits + self.disk_hits) / total) if total else 0.0
+            }
+
+
+prophet_cache = ProphetModelCache(
+    int(os.environ.get("PROPHET_MODEL_CACHE_SIZE", DEFAULT_MAX_MODELS)),
+    os.environ.get("PROPHET_MODEL_CACHE_DIR") or None,
+    int(os.environ.get("PROPHET_MODEL_CACHE_DISK_SIZE", DEFAULT_MAX_DISK_MODELS)),
+)
@@ -0,0 +1,154 @@
+"""Prophet-shaped additive model solved by regularized least squares (no Stan)"""
+
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Dict, List, Optional
+
+# Prophet's defaults: Fourier orders, periods in days, and the prior scales it
+# does not expose on the request
+SEASONALITIES = {
+    "yearly": (365.25, 10),
+    "weekly": (7.0, 3),
+    "daily": (1.0, 4),
+}
+TREND_PRIOR_SCALE = 5.0  # k and m ~ Normal(0, 5)
+HOLIDAYS_PRIOR_SCALE = 10.0
+
+
+def fourier_terms(days: np.ndarray, period: float, order: int) -> np.ndarray:
+    """sin/cos pairs of harmonics 1..order, on days since the Unix epoch like Prophet"""
+    x = 2 * np.pi * np.arange(1, order + 1) * days[:, None] / period
+    return np.hstack([np.sin(x), np.cos(x)])
+
+
+def _days(ds: pd.Series) -> np.ndarray:
+    return (ds - pd.Timestamp("1970-01-01")).dt.total_seconds().to_numpy() / 86400.0
+
+
+class FourierSeasonality:
+    """
+    Prophet's additive model (piecewise-linear trend, Fourier seasonalities,
+    holiday dummies) fitted as one ridge regression
+
+    The design matrix mirrors Prophet's: time and y are scaled the same way,
+    changepoints sit on the first `changepoint_range` of the history, and each
+    coefficient block gets a Gaussian prior. The ridge solve is the MAP
+    estimate under those priors; Prophet's Laplace prior on the changepoint
+    deltas is replaced by a Gaussian of the same variance, and the noise
+    scale is re-estimated once from the residuals. A seasonality the sampling
+    cannot resolve (e.g. weekly on weekly data) is left out and reads as zero.
+    """
+
+    def __init__(
+        self,
+        yearly_seasonality: bool = True,
+        weekly_seasonality: bool = True,
+        daily_seasonality: bool = False,
+        changepoint_prior_scale: float = 0.05,
+        seasonality_prior_scale: float = 10.0,
+        n_changepoints: int = 25,
+        changepoint_range: float = 0.8,
+        holidays: Optional[Dict[str, List[pd.Timestamp]]] = None,
+    ):
+        self.seasonalities = [
+            name for name, enabled in
+            (("yearly", yearly_seasonality), ("weekly", weekly_seasonality), ("daily", daily_seasonality))
+            if enabled
+        ]
+        self.changepoint_prior_scale = float(changepoint_prior_scale)
+        self.seasonality_prior_scale = float(seasonality_prior_scale)
+        self.n_changepoints = int(n_changepoints)
+        self.changepoint_range = float(changepoint_range)
+        self.holidays = {
+            name: pd.DatetimeIndex(dates).normalize() for name, dates in (holidays or {}).items()
+        }
+
+    def _columns(self, ds: pd.Series) -> Dict[str, np.ndarray]:
+        """Design matrix blocks for dates `ds` (trend, one per seasonality, holidays)"""
+        t = ((ds - self.start) / self.t_scale).to_numpy(dtype=float)
+        blocks = {"trend": np.column_stack([np.ones_like(t), t, np.maximum(t[:, None] - self.changepoints_t, 0.0)])}
+        days = _days(ds)
+        for name in self.fitted_seasonalities:
+            period, order = SEASONALITIES[name]
+            blocks[name] = fourier_terms(days, period, order)
+        if self.holidays:
+            normalized = pd.DatetimeIndex(ds).normalize()
+            blocks["holidays"] = np.column_stack(
+                [normalized.isin(dates).astype(float) for dates in self.holidays.values()]
+            )
+        return blocks
+
+    def fit(self, ds: pd.Series, y: np.ndarray) -> "FourierSeasonality":
+        ds = pd.Series(pd.to_datetime(ds)).reset_index(drop=True)
+        order = np.argsort(ds.to_numpy(), kind="stable")
+        ds, y = ds.iloc[order].reset_index(drop=True), np.asarray(y, dtype=float)[order]
+        if len(ds) < 2 or ds.iloc[-1] == ds.iloc[0]:
+            raise ValueError("At least two distinct dates are required")
+
+        self.history_ds = ds
+        self.start = ds.iloc[0]
+        self.t_scale = ds.iloc[-1] - self.start
+        self.y_scale = float(np.abs(y).max()) or 1.0
+
+        # Changepoints on evenly spaced history rows, as Prophet places them
+        hist_size = int(np.floor(len(ds) * self.changepoint_range))
+        n_changepoints = max(min(self.n_changepoints, hist_size - 1), 0)
+        if n_changepoints:
+            indexes = np.linspace(0, hist_size - 1, n_changepoints + 1).round().astype(int)[1:]
+            self.changepoints = ds.iloc[indexes].reset_index(drop=True)
+        else:
+            self.changepoints = ds.iloc[:0]
+        self.changepoints_t = ((self.changepoints - self.start) / self.t_scale).to_numpy(dtype=float)
+
+        # Nyquist: a period needs more than two observations per cycle
+        spacing = ds.diff().dropna()
+        spacing_days = spacing[spacing > pd.Timedelta(0)].min() / pd.Timedelta(days=1)
+        self.fitted_seasonalities = [name for name in self.seasonalities if SEASONALITIES[name][0] > 2 * spacing_days]
+
+        blocks = self._columns(ds)
+        self.block_sizes = {name: block.shape[1] for name, block in blocks.items()}
+        X = np.hstack(list(blocks.values()))
+        prior_scales = np.concatenate([
+            [TREND_PRIOR_SCALE, TREND_PRIOR_SCALE],
+            np.full(len(self.changepoints_t), np.sqrt(2) * self.changepoint_prior_scale),
+            *[np.full(self.block_sizes[name], self.seasonality_prior_scale) for name in self.fitted_seasonalities],
+            np.full(self.block_sizes.get("holidays", 0), HOLIDAYS_PRIOR_SCALE),
+        ])
+
+        # MAP estimate: (X'X + sigma^2 / s^2) beta = X'y, with sigma from the previous pass
+        y_scaled = y / self.y_scale
+        gram, moment = X.T @ X, X.T @ y_scaled
+        sigma2 = float(np.var(y_scaled)) or 1.0
+        for _ in range(2):
+            self.beta = np.linalg.solve(gram + np.diag(sigma2 / prior_scales ** 2), moment)
+            residuals = y_scaled - X @ self.beta
+            sigma2 = max(float(residuals @ residuals) / len(y_scaled), 1e-12)
+        self.sigma = np.sqrt(sigma2) * self.y_scale
+        return self
+
+    def predict(self, ds: pd.Series) -> Dict[str, np.ndarray]:
+        """Additive components in y units, plus yhat, for dates `ds`"""
+        ds = pd.Series(pd.to_datetime(ds)).reset_index(drop=True)
+        blocks = self._columns(ds)
+        components, offset = {}, 0
+        for name, block in blocks.items():
+            size = self.block_sizes[name]
+            components[name] = block @ self.beta[offset:offset + size] * self.y_scale
+            offset += size
+        for name in self.seasonalities:
+            components.setdefault(name, np.zeros(len(ds)))
+        components["yhat"] = sum(components[name] for name in blocks)
+        return components
+
+    def make_future_dataframe(self, periods: int) -> pd.Series:
+        """History dates followed by `periods` daily dates, like Prophet's"""
+        last = self.history_ds.iloc[-1]
+        future = pd.date_range(start=last, periods=periods + 1, freq="D")
+        future = future[future > last][:periods]
+        return pd.concat([self.history_ds, pd.Series(future)], ignore_index=True)
+
+    def interval(self, yhat: np.ndarray, interval_width: float):
+        """Bounds from the residual scale alone (no trend or parameter uncertainty)"""
+        z = NormalDist().inv_cdf(0.5 + interval_width / 2)
+        return yhat - z * self.sigma, yhat + z * self.sigma
@@ -1,14 +1,96 @@
 """Data models for Prophet module"""
 
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 
 
 class ProphetRequest(BaseModel):
     """Request model for Prophet forecasting"""
-    dates: List[str]  # ISO date strings
-    values: List[float]
+    dates: List[str] = []  # ISO date strings
+    values: List[float] = []
+    dataset_id: Optional[str] = None  # Registered dataset instead of raw dates/values
+    date_column: str = "OBS"  # Dataset column holding the dates
+    value_column: Optional[str] = None  # Dataset column holding the values
     periods: int = 365  # Days to forecast
     yearly_seasonality: bool = True
     weekly_seasonality: bool = True
     daily_seasonality: bool = False
+    changepoint_prior_scale: float = 0.05  # Trend flexibility
+    seasonality_prior_scale: float = 10.0  # Seasonality strength
+    seasonality_mode: str = "additive"  # "additive" or "multiplicative" (seasonality scales with the trend)
+    mcmc_samples: int = 0  # 0 fits MAP point estimates (fast); > 0 samples the full posterior
+    uncertainty_samples: int = 1000  # Draws for the intervals; 0 skips them (yhat_lower/upper are null)
+    warm_start: bool = True  # Start Stan from a cached fit whose series this one extends
+
+
+class ProphetSeries(BaseModel):
+    """One named series of a batch; settings left unset come from the batch"""
+    name: str
+    values: List[Optional[float]]
+    dates: Optional[List[str]] = None  # Default: the batch's dates
+    periods: Optional[int] = None
+    yearly_seasonality: Optional[bool] = None
+    weekly_seasonality: Optional[bool] = None
+    daily_seasonality: Optional[bool] = None
+    changepoint_prior_scale: Optional[float] = None
+    seasonality_prior_scale: Optional[float] = None
+    seasonality_mode: Optional[str] = None
+    mcmc_samples: Optional[int] = None
+    uncertainty_samples: Optional[int] = None
+
+
+class ProphetBatchRequest(BaseModel):
+    """Request model for forecasting many series at once (shared settings, per-series overrides)"""
+    series: List[ProphetSeries] = []
+    dates: List[str] = []  # Shared dates for series without their own
+    dataset_id: Optional[str] = None  # Registered dataset: one series per value column
+    date_column: str = "OBS"  # Dataset column holding the dates
+    value_columns: Optional[List[str]] = None  # Dataset columns to forecast (default: all numeric)
+    periods: int = 365
+    yearly_seasonality: bool = True
+    weekly_seasonality: bool = True
+    daily_seasonality: bool = False
+    changepoint_prior_scale: float = 0.05
+    seasonality_prior_scale: float = 10.0
+    seasonality_mode: str = "additive"
+    mcmc_samples: int = 0
+    uncertainty_samples: int = 1000
+
+
+class FourierRequest(BaseModel):
+    """Request model for the least-squares engine (Prophet's trend and seasonalities without Stan)"""
+    dates: List[str] = []  # ISO date strings
+    values: List[float] = []
+    dataset_id: Optional[str] = None  # Registered dataset instead of raw dates/values
+    date_column: str = "OBS"  # Dataset column holding the dates
+    value_column: Optional[str] = None  # Dataset column holding the values
+    periods: int = 365  # Days to forecast
+    yearly_seasonality: bool = True
+    weekly_seasonality: bool = True
+    daily_seasonality: bool = False
+    changepoint_prior_scale: float = 0.05  # Trend flexibility
+    seasonality_prior_scale: float = 10.0  # Seasonality strength
+    n_changepoints: int = 25  # Potential trend changes, spread over the first changepoint_range of the history
+    changepoint_range: float = 0.8
+    holidays: Dict[str, List[str]] = {}  # Holiday name -> dates (history and horizon); one effect per name
+    interval_width: Optional[float] = 0.8  # Residual-based interval; None skips it (yhat_lower/upper are null)
+
+
+class ProphetTuneRequest(BaseModel):
+    """Request model for rolling-origin cross-validation over a grid of Prophet settings"""
+    dates: List[str] = []  # ISO date strings
+    values: List[float] = []
+    dataset_id: Optional[str] = None  # Registered dataset instead of raw dates/values
+    date_column: str = "OBS"  # Dataset column holding the dates
+    value_column: Optional[str] = None  # Dataset column holding the values
+    horizon: int = 90  # Days forecast from each cutoff
+    initial: Optional[int] = None  # Days of history before the first cutoff (default 3 x horizon)
+    period: Optional[int] = None  # Days between cutoffs (default horizon / 2)
+    yearly_seasonality: bool = True
+    weekly_seasonality: bool = True
+    daily_seasonality: bool = False
+    # Grid: every combination is cross-validated
+    changepoint_prior_scale: List[float] = [0.01, 0.05, 0.1, 0.5]
+    seasonality_prior_scale: List[float] = [1.0, 10.0]
+    seasonality_mode: List[str] = ["additive", "multiplicative"]
+    metric: str = "rmse"  # "rmse" or "mape": picks the best configuration
@@ -1,14 +1,18 @@
 """Prophet API routes"""
 
-from fastapi import APIRouter
-from .models import ProphetRequest
-from .service import generate_forecast
+from fastapi import APIRouter, Header
+from typing import Optional
+from .models import FourierRequest, ProphetBatchRequest, ProphetRequest, ProphetTuneRequest
+from .service import generate_forecast, generate_fourier_forecast
+from .batch import batch_payloads, run_batch
+from .tuning import tune_prophet
+from ..encoding import encode_response, encode_stream
 
 router = APIRouter()
 
 
 @router.post("/forecast")
-async def prophet_forecast(request: ProphetRequest):
+def prophet_forecast(request: ProphetRequest, accept: Optional[str] = Header(None)):
     """
     Generate Prophet forecast with seasonality decomposition
 
@@ -17,4 +21,44 @@ async def prophet_forecast(request: ProphetRequest):
         - components: trend, yearly, weekly seasonality
         - model_params: fitted model parameters
     """
-    return generate_forecast(request)
+    return encode_response(generate_forecast(request), accept)
+
+
+@router.post("/fourier")
+def prophet_fourier(request: FourierRequest, accept: Optional[str] = Header(None)):
+    """
+    Trend and seasonality without Stan: Prophet's design (changepoints, Fourier
+    terms, holiday dummies) solved by regularized least squares
+
+    Same response shape as /forecast, in milliseconds; intervals reflect the
+    residual scale only.
+    """
+    return encode_response(generate_fourier_forecast(request), accept)
+
+
+@router.post("/batch")
+def prophet_batch(request: ProphetBatchRequest):
+    """
+    Forecast many named series in a process pool
+
+    Settings on the batch apply to every series unless the series sets them.
+    Streams newline-delimited JSON: one line per series as it finishes
+    ({"index", "name", "ok": true, "result"} or {"index", "name", "ok": false,
+    "status_code", "detail"}), then {"done": true, "completed", "failed", ...}.
+    """
+    return encode_stream(run_batch(batch_payloads(request)))
+
+
+@router.post("/tune")
+def prophet_tune(request: ProphetTuneRequest, accept: Optional[str] = Header(None)):
+    """
+    Rolling-origin cross-validation over a grid of prior scales and seasonality modes
+
+    Every (grid cell, cutoff) fit runs in the Prophet process pool.
+
+    Returns:
+        - cells: rmse/mape per combination of the grid
+        - best: the combination with the lowest `metric`, ready for /forecast
+        - cutoffs: forecast origins used
+    """
+    return encode_response(tune_prophet(request), accept)
@@ -1,14 +1,133 @@
 """Prophet forecasting service logic"""
 
+import copy
+import logging
 import pandas as pd
-import sys
-import traceback
 from fastapi import HTTPException
+from ..datasets.service import resolve_dataframe
+from ..dates import parse_dates as parse_date_values
+from ..jobs.progress import report_progress
+from ..timing import stage
+from ..lazy import is_available, lazy_import
+import numpy as np
+from .cache import config_key, fit_key, prophet_cache
+from .fourier import FourierSeasonality
 
-try:
-    from prophet import Prophet
-except ImportError:
-    Prophet = None
+# prophet (and its Stan backend) is imported on the first forecast
+PROPHET_AVAILABLE = is_available("prophet")
+prophet = lazy_import("prophet")
+
+SEASONALITY_MODES = ("additive", "multiplicative")
+
+logger = logging.getLogger(__name__)
+
+
+def fit_config(request) -> dict:
+    """
+    Prophet constructor arguments that shape the fit; together with the series
+    they determine the fitted model (uncertainty_samples only affects predict)
+    """
+    return {
+        "yearly_seasonality": request.yearly_seasonality,
+        "weekly_seasonality": request.weekly_seasonality,
+        "daily_seasonality": request.daily_seasonality,
+        "changepoint_prior_scale": float(request.changepoint_prior_scale),
+        "seasonality_prior_scale": float(request.seasonality_prior_scale),
+        "seasonality_mode": request.seasonality_mode,
+        "mcmc_samples": int(request.mcmc_samples),
+    }
+
+
+def warm_start_params(model) -> dict:
+    """
+    Stan initial values from a fitted model (k, m, sigma_obs, delta, beta)
+
+    MAP fits hold one draw; posterior samples are averaged. Prophet checks the
+    shapes and falls back to its default for any that no longer fit.
+    """
+    init = {}
+    for name in ('k', 'm', 'sigma_obs'):
+        init[name] = float(np.mean(model.params[name]))
+    for name in ('delta', 'beta'):
+        init[name] = np.mean(np.atleast_2d(model.params[name]), axis=0)
+    return init
+
+
+def parse_dates(dates) -> pd.DatetimeIndex:
+    """
+    Dates parsed as the dataset registry parses them (ISO first, then day first);
+    unparseable dates raise HTTPException(400)
+    """
+    try:
+        return parse_date_values(dates)
+    except Exception as date_error:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid date format: {str(date_error)}. Supported formats include YYYY-MM-DD, DD/MM/YYYY, MM/DD/YYYY"
+        )
+
+
+def history_frame(request) -> pd.DataFrame:
+    """
+    Validated training frame (ds, y) from the request's dates/values or its
+    registered dataset; bad input raises HTTPException(400)
+    """
+    # Take dates/values from the registered dataset when one is given
+    dates, values = request.dates, request.values
+    if request.dataset_id:
+        if not request.value_column:
+            raise HTTPException(
+                status_code=400,
+                detail="'value_column' is required when using a dataset_id"
+            )
+        df_source = resolve_dataframe(
+            dataset_id=request.dataset_id,
+            columns=[request.date_column, request.value_column]
+        )
+        dates = df_source[request.date_column].tolist()
+        values = df_source[request.value_column].tolist()
+
+    # Validate input data
+    if len(dates) == 0 or len(values) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Both 'dates' and 'values' are required and cannot be empty"
+        )
+
+    if len(dates) != len(values):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Length mismatch: dates has {len(dates)} items but values has {len(values)} items"
+        )
+
+    # Check minimum data points
+    MIN_DATA_POINTS = 2
+    if len(dates) < MIN_DATA_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Insufficient data: Prophet requires at least {MIN_DATA_POINTS} data points, but only {len(dates)} provided. For meaningful forecasts, consider using at least 10 data points."
+        )
+
+    # Prepare data for Prophet
+    df = pd.DataFrame({
+        'ds': parse_dates(dates),
+        'y': values
+    })
+
+    # Check for NaN or infinite values
+    if df['y'].isna().any():
+        raise HTTPException(
+            status_code=400,
+            detail="Values contain NaN (missing) values. Please ensure all data points are valid numbers."
+        )
+
+    if not pd.Series(df['y']).apply(lambda x: isinstance(x, (int, float)) and not pd.isna(x)).all():
+        raise HTTPException(
+            status_code=400,
+            detail="Values must be numeric. Please check your data for non-numeric values."
+        )
+
+    return df
 
 
 def generate_forecast(request):
@@ -21,116 +140,109 @@ def generate_forecast(request):
         - model_params: fitted model parameters
     """
     try:
-        if Prophet is None:
+        if not PROPHET_AVAILABLE:
             raise HTTPException(
                 status_code=500,
                 detail="Prophet library not installed. Please install: pip install prophet"
             )
 
-        # Validate input data
-        if not request.dates or not request.values:
+        if request.changepoint_prior_scale <= 0 or request.seasonality_prior_scale <= 0:
             raise HTTPException(
                 status_code=400,
-                detail="Both 'dates' and 'values' are required and cannot be empty"
+                detail="'changepoint_prior_scale' and 'seasonality_prior_scale' must be positive"
             )
-
-        if len(request.dates) != len(request.values):
+        if request.mcmc_samples < 0 or request.uncertainty_samples < 0:
             raise HTTPException(
                 status_code=400,
-                detail=f"Length mismatch: dates has {len(request.dates)} items but values has {len(request.values)} items"
+                detail="'mcmc_samples' and 'uncertainty_samples' cannot be negative"
             )
-
-        # Check minimum data points
-        MIN_DATA_POINTS = 2
-        if len(request.dates) < MIN_DATA_POINTS:
+        if request.seasonality_mode not in SEASONALITY_MODES:
             raise HTTPException(
                 status_code=400,
-                detail=f"Insufficient data: Prophet requires at least {MIN_DATA_POINTS} data points, but only {len(request.dates)} provided. For meaningful forecasts, consider using at least 10 data points."
+                detail=f"'seasonality_mode' must be one of {list(SEASONALITY_MODES)}"
             )
 
-        # Prepare data for Prophet
-        # Try to parse dates with dayfirst=True for DD/MM/YYYY format (British/European)
-        try:
-            dates_parsed = pd.to_datetime(request.dates, dayfirst=True, format='mixed')
-        except Exception as date_error:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid date format: {str(date_error)}. Supported formats include YYYY-MM-DD, DD/MM/YYYY, MM/DD/YYYY"
-            )
+        df = history_frame(request)
 
-        df = pd.DataFrame({
-            'ds': dates_parsed,
-            'y': request.values
-        })
+        # Reuse the fitted model when only the horizon changed, or warm-start Stan
+        # from an earlier fit whose series this one extends
+        config = fit_config(request)
+        with stage("prophet.cache"):
+            versioned = {**config, "prophet": getattr(prophet, "__version__", "")}
+            group = config_key(versioned)
+            key = fit_key(df['ds'].to_numpy(), df['y'].to_numpy(), versioned)
+            model, cache_source = prophet_cache.get(key, group)
+            previous = None
+            if model is None and request.warm_start:
+                ordered = df.sort_values('ds', kind='stable')
+                previous = prophet_cache.find_extended(ordered['ds'].to_numpy(), ordered['y'].to_numpy(), group)
 
-        # Check for NaN or infinite values
-        if df['y'].isna().any():
-            raise HTTPException(
-                status_code=400,
-                detail="Values contain NaN (missing) values. Please ensure all data points are valid numbers."
-            )
+        if model is None:
+            # Initialize and configure Prophet model
+            model = prophet.Prophet(**config)
+            fit_options = {}
+            if previous is not None:
+                fit_options["init"] = warm_start_params(previous)
+                cache_source = "warm_start"
 
-        if not pd.Series(df['y']).apply(lambda x: isinstance(x, (int, float)) and not pd.isna(x)).all():
-            raise HTTPException(
-                status_code=400,
-                detail="Values must be numeric. Please check your data for non-numeric values."
-            )
+            # Fit the model with better error handling
+            report_progress(0.1, "Fitting model")
+            try:
+                with stage("prophet.fit"):
+                    model.fit(df, **fit_options)
+            except Exception as fit_error:
+                error_msg = str(fit_error)
+                if "stan_backend" in error_msg:
+                    raise HTTPException(
+                        status_code=500,
+                        detail="Prophet compatibility error (stan_backend). This usually indicates a version mismatch. Please upgrade Prophet: pip install --upgrade prophet"
+                    )
+                else:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Model fitting failed: {error_msg}"
+                    )
+            with stage("prophet.cache"):
+                prophet_cache.put(key, model, group)
 
-        # Initialize and configure Prophet model
-        model = Prophet(
-            yearly_seasonality=request.yearly_seasonality,
-            weekly_seasonality=request.weekly_seasonality,
-            daily_seasonality=request.daily_seasonality,
-        )
+        # Interval draws are a predict-time setting; a shallow copy leaves the cached model untouched
+        model = copy.copy(model)
+        model.uncertainty_samples = request.uncertainty_samples
 
-        # Fit the model with better error handling
-        try:
-            model.fit(df)
-        except Exception as fit_error:
-            error_msg = str(fit_error)
-            if "stan_backend" in error_msg:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Prophet compatibility error (stan_backend). This usually indicates a version mismatch. Please upgrade Prophet: pip install --upgrade prophet"
-                )
-            else:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Model fitting failed: {error_msg}"
-                )
-
-        # Create future dataframe
-        future = model.make_future_dataframe(periods=request.periods)
-
-        # Generate forecast
-        forecast = model.predict(future)
-
-        # Extract components
-        components = model.predict(df)
+        # One predict over history + horizon; the history rows are the components
+        report_progress(0.7, "Forecasting")
+        with stage("prophet.predict"):
+            future = model.make_future_dataframe(periods=request.periods)
+            forecast = model.predict(future)
+        components = forecast[forecast['ds'] <= model.history['ds'].max()]
 
         # Prepare response
         response = {
             "forecast": {
                 "dates": forecast['ds'].dt.strftime('%Y-%m-%d').tolist(),
-                "yhat": forecast['yhat'].tolist(),
-                "yhat_lower": forecast['yhat_lower'].tolist(),
-                "yhat_upper": forecast['yhat_upper'].tolist(),
+                "yhat": forecast['yhat'].to_numpy(),
+                "yhat_lower": forecast['yhat_lower'].to_numpy() if 'yhat_lower' in forecast else None,
+                "yhat_upper": forecast['yhat_upper'].to_numpy() if 'yhat_upper' in forecast else None,
             },
             "components": {
                 "dates": components['ds'].dt.strftime('%Y-%m-%d').tolist(),
-                "trend": components['trend'].tolist(),
+                "trend": components['trend'].to_numpy(),
             },
             "model_info": {
                 "changepoint_prior_scale": model.changepoint_prior_scale,
                 "seasonality_prior_scale": model.seasonality_prior_scale,
+                "seasonality_mode": model.seasonality_mode,
+                "mcmc_samples": model.mcmc_samples,
+                "uncertainty_samples": model.uncertainty_samples,
+                "cache": cache_source or "miss",
             }
         }
 
         # Add seasonality components if available
         if 'yearly' in components.columns:
-            response["components"]["yearly"] = components['yearly'].tolist()
+            response["components"]["yearly"] = components['yearly'].to_numpy()
         if 'weekly' in components.columns:
-            response["components"]["weekly"] = components['weekly'].tolist()
+            response["components"]["weekly"] = components['weekly'].to_numpy()
 
         return response
 
@@ -138,8 +250,7 @@ def generate_forecast(request):
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
-        print(f"Prophet forecast error: {str(e)}", file=sys.stderr)
-        traceback.print_exc()
+        logger.exception("Prophet forecast error: %s", e)
         # Provide more user-friendly error messages
         error_msg = str(e)
         if "datetime" in error_msg.lower() or "date" in error_msg.lower():
@@ -149,3 +260,85 @@ def generate_forecast(request):
             )
         else:
             raise HTTPException(status_code=500, detail=f"Unexpected error: {error_msg}")
+
+
+def generate_fourier_forecast(request):
+    """
+    Trend, seasonality and forecast from the least-squares engine
+
+    Same response shape as generate_forecast, in milliseconds rather than a
+    Stan fit. Intervals come from the residual scale only; use Prophet when
+    the full trend and parameter uncertainty is needed.
+    """
+    try:
+        if request.periods < 0 or request.n_changepoints < 0:
+            raise HTTPException(
+                status_code=400,
+                detail="'periods' and 'n_changepoints' cannot be negative"
+            )
+        if request.changepoint_prior_scale <= 0 or request.seasonality_prior_scale <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail="'changepoint_prior_scale' and 'seasonality_prior_scale' must be positive"
+            )
+        if not 0 < request.changepoint_range <= 1:
+            raise HTTPException(status_code=400, detail="'changepoint_range' must be in (0, 1]")
+        if request.interval_width is not None and not 0 < request.interval_width < 1:
+            raise HTTPException(status_code=400, detail="'interval_width' must be in (0, 1)")
+
+        df = history_frame(request)
+        holidays = {name: parse_dates(dates) for name, dates in request.holidays.items()}
+
+        with stage("prophet.fourier"):
+            model = FourierSeasonality(
+                yearly_seasonality=request.yearly_seasonality,
+                weekly_seasonality=request.weekly_seasonality,
+                daily_seasonality=request.daily_seasonality,
+                changepoint_prior_scale=request.changepoint_prior_scale,
+                seasonality_prior_scale=request.seasonality_prior_scale,
+                n_changepoints=request.n_changepoints,
+                changepoint_range=request.changepoint_range,
+                holidays=holidays,
+            ).fit(df['ds'], df['y'].to_numpy(dtype=float))
+            future = model.make_future_dataframe(request.periods)
+            forecast = model.predict(future)
+            components = model.predict(model.history_ds)
+
+        lower = upper = None
+        if request.interval_width is not None:
+            lower, upper = model.interval(forecast["yhat"], request.interval_width)
+
+        response = {
+            "forecast": {
+                "dates": future.dt.strftime('%Y-%m-%d').tolist(),
+                "yhat": forecast["yhat"],
+                "yhat_lower": lower,
+                "yhat_upper": upper,
+            },
+            "components": {
+                "dates": model.history_ds.dt.strftime('%Y-%m-%d').tolist(),
+                "trend": components["trend"],
+            },
+            "model_info": {
+                "engine": "fourier",
+                "changepoint_prior_scale": model.changepoint_prior_scale,
+                "seasonality_prior_scale": model.seasonality_prior_scale,
+                "n_changepoints": len(model.changepoints),
+                "seasonalities": model.fitted_seasonalities,
+                "residual_std": float(model.sigma),
+                "interval_width": request.interval_width,
+            }
+        }
+        for name in ("yearly", "weekly", "daily", "holidays"):
+            if name in components:
+                response["components"][name] = components[name]
+
+        return response
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Fourier forecast error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
@@ -0,0 +1,208 @@
+"""Rolling-origin cross-validation of Prophet settings, with the fits spread over a process pool"""
+
+import itertools
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from .batch import discard_pool, get_pool
+from .service import PROPHET_AVAILABLE, SEASONALITY_MODES, history_frame, prophet
+from ..jobs.progress import report_progress
+from ..timing import stage
+
+logger = logging.getLogger(__name__)
+
+# Largest number of fits (grid cells x cutoffs) accepted in one request
+MAX_TUNING_FITS = 500
+
+METRICS = ("rmse", "mape")
+
+
+def cutoffs(ds: pd.Series, horizon: pd.Timedelta, initial: pd.Timedelta, period: pd.Timedelta) -> List[pd.Timestamp]:
+    """
+    Forecast origins, oldest first: stepping back by `period` from
+    `horizon` before the last date while `initial` of history precedes
+    them; origins with no observation in their horizon are skipped
+    """
+    start, end = ds.min(), ds.max()
+    result = []
+    cutoff = end - horizon
+    while cutoff >= start + initial:
+        if ((ds > cutoff) & (ds <= cutoff + horizon)).any():
+            result.append(cutoff)
+        cutoff -= period
+    return result[::-1]
+
+
+def _fit_fold(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Fit one grid cell on one fold's training rows and predict its horizon (inside a worker)"""
+    try:
+        model = prophet.Prophet(uncertainty_samples=0, **payload["config"])
+        model.fit(pd.DataFrame({"ds": payload["train_ds"], "y": payload["train_y"]}))
+        yhat = model.predict(pd.DataFrame({"ds": payload["test_ds"]}))["yhat"].to_numpy()
+        return {"ok": True, "yhat": yhat}
+    except Exception as e:
+        return {"ok": False, "detail": str(e)}
+
+
+def _scores(y: np.ndarray, yhat: np.ndarray) -> Dict[str, Optional[float]]:
+    """RMSE and MAPE over every held-out point; MAPE leaves out zero actuals (None if all are zero)"""
+    errors = y - yhat
+    nonzero = y != 0
+    return {
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "mape": float(np.mean(np.abs(errors[nonzero] / y[nonzero]))) if nonzero.any() else None,
+    }
+
+
+def _validate(request) -> None:
+    if request.horizon <= 0:
+        raise HTTPException(status_code=400, detail="'horizon' must be a positive number of days")
+    if (request.initial is not None and request.initial < 0) or (request.period is not None and request.period <= 0):
+        raise HTTPException(status_code=400, detail="'initial' cannot be negative and 'period' must be positive")
+    if not request.changepoint_prior_scale or not request.seasonality_prior_scale or not request.seasonality_mode:
+        raise HTTPException(status_code=400, detail="Every grid dimension needs at least one value")
+    if min(request.changepoint_prior_scale) <= 0 or min(request.seasonality_prior_scale) <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail="'changepoint_prior_scale' and 'seasonality_prior_scale' values must be positive"
+        )
+    unknown = [mode for mode in request.seasonality_mode if mode not in SEASONALITY_MODES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown seasonality_mode {unknown}; use {list(SEASONALITY_MODES)}")
+    if request.metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"'metric' must be one of {list(METRICS)}")
+
+
+def tune_prophet(request):
+    """
+    Cross-validate every combination of the grid and pick the best
+
+    The series is parsed, validated and split into folds once; each
+    (grid cell, cutoff) fit then runs in the shared Prophet process pool.
+
+    Returns:
+        - cells: settings, rmse, mape, n_folds and failed per grid cell
+        - best: the cell with the lowest `metric`
+        - cutoffs, horizon, n_fits, duration_ms
+    """
+    try:
+        if not PROPHET_AVAILABLE:
+            raise HTTPException(
+                status_code=500,
+                detail="Prophet library not installed. Please install: pip install prophet"
+            )
+        _validate(request)
+        start = time.perf_counter()
+
+        with stage("prophet.folds"):
+            df = history_frame(request)
+            df = df.sort_values('ds', kind='stable').reset_index(drop=True)
+            horizon = pd.Timedelta(days=request.horizon)
+            initial = pd.Timedelta(days=request.initial if request.initial is not None else 3 * request.horizon)
+            period = pd.Timedelta(days=request.period if request.period is not None else request.horizon / 2)
+            origins = cutoffs(df['ds'], horizon, initial, period)
+            if not origins:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Not enough history for cross-validation: need more than initial + horizon ({(initial + horizon).days} days)"
+                )
+            folds = []
+            for cutoff in origins:
+                train = (df['ds'] <= cutoff).to_numpy()
+                test = ((df['ds'] > cutoff) & (df['ds'] <= cutoff + horizon)).to_numpy()
+                folds.append({
+                    "train_ds": df['ds'].to_numpy()[train], "train_y": df['y'].to_numpy(dtype=float)[train],
+                    "test_ds": df['ds'].to_numpy()[test], "test_y": df['y'].to_numpy(dtype=float)[test],
+                })
+
+            grid = [
+                {"changepoint_prior_scale": float(cps), "seasonality_prior_scale": float(sps), "seasonality_mode": mode}
+                for cps, sps, mode in itertools.product(
+                    request.changepoint_prior_scale, request.seasonality_prior_scale, request.seasonality_mode
+                )
+            ]
+            n_fits = len(grid) * len(folds)
+            if n_fits > MAX_TUNING_FITS:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{len(grid)} grid cells x {len(folds)} cutoffs = {n_fits} fits; at most {MAX_TUNING_FITS} per request"
+                )
+            seasonalities = {
+                "yearly_seasonality": request.yearly_seasonality,
+                "weekly_seasonality": request.weekly_seasonality,
+                "daily_seasonality": request.daily_seasonality,
+            }
+
+        # One task per (cell, cutoff); each task carries only its fold's rows
+        outcomes: Dict[int, Dict[int, Dict[str, Any]]] = {cell: {} for cell in range(len(grid))}
+        report_progress(0.0, f"Cross-validating ({n_fits} fits)")
+        with stage("prophet.cross_validate"):
+            pool = get_pool()
+            futures = {
+                pool.submit(_fit_fold, {
+                    "config": {**seasonalities, **grid[cell]},
+                    "train_ds": fold["train_ds"], "train_y": fold["train_y"], "test_ds": fold["test_ds"],
+                }): (cell, index)
+                for cell in range(len(grid)) for index, fold in enumerate(folds)
+            }
+            pending = set(futures)
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        cell, index = futures[future]
+                        try:
+                            outcomes[cell][index] = future.result()
+                        except BrokenProcessPool as e:
+                            discard_pool(pool)
+                            outcomes[cell][index] = {"ok": False, "detail": f"Worker process crashed: {e}"}
+                    finished = n_fits - len(pending)
+                    report_progress(finished / n_fits, f"Cross-validating ({finished}/{n_fits} fits)")
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        cells = []
+        for cell, settings in enumerate(grid):
+            fitted = [index for index in range(len(folds)) if outcomes[cell][index]["ok"]]
+            failed = [outcomes[cell][index]["detail"] for index in range(len(folds)) if not outcomes[cell][index]["ok"]]
+            entry = {**settings, "rmse": None, "mape": None, "n_folds": len(fitted), "failed": len(failed)}
+            if fitted:
+                entry.update(_scores(
+                    np.concatenate([folds[index]["test_y"] for index in fitted]),
+                    np.concatenate([outcomes[cell][index]["yhat"] for index in fitted])
+                ))
+            if failed:
+                entry["error"] = failed[0]
+            cells.append(entry)
+
+        scored = [entry for entry in cells if entry[request.metric] is not None]
+        if not scored:
+            raise HTTPException(
+                status_code=500,
+                detail=f"No grid cell could be scored by {request.metric}: {cells[0].get('error', 'every actual value is zero')}"
+            )
+        best = min(scored, key=lambda entry: entry[request.metric])
+
+        return {
+            "best": {key: value for key, value in best.items() if key not in ("n_folds", "failed", "error")},
+            "cells": cells,
+            "cutoffs": [cutoff.strftime('%Y-%m-%d') for cutoff in origins],
+            "horizon": request.horizon,
+            "metric": request.metric,
+            "n_fits": n_fits,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Prophet tuning error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
@@ -1,12 +1,15 @@
 """Data models for Regression module"""
 
 from pydantic import BaseModel
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 class StepwiseRequest(BaseModel):
     """Request model for stepwise regression"""
-    y: List[float]  # Dependent variable
-    X: Dict[str, List[float]]  # Independent variables {name: values}
+    y: Optional[List[float]] = None  # Dependent variable
+    X: Optional[Dict[str, List[float]]] = None  # Independent variables {name: values}
+    dataset_id: Optional[str] = None  # Registered dataset instead of raw y/X
+    target: Optional[str] = None  # Dataset column used as y
+    columns: Optional[List[str]] = None  # Dataset columns used as X
     method: str = "forward"  # forward, backward, or both
     significance_level: float = 0.05
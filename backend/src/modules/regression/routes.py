@@ -1,28 +1,30 @@
 """Regression API routes"""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
+from typing import Optional
 from .models import StepwiseRequest
 from .service import stepwise_regression_logic
+from ..encoding import encode_response
 
 router = APIRouter()
 
 
 @router.post("/stepwise")
-async def stepwise_regression(request: StepwiseRequest):
+def stepwise_regression(request: StepwiseRequest, accept: Optional[str] = Header(None)):
     """
     Perform stepwise regression variable selection
 
     Methods:
         - forward: Start with no variables, add best at each step
         - backward: Start with all variables, remove worst at each step
-        - both: Combination of forward and backward
+        - both: Forward additions, each followed by removal of variables that are no longer significant
 
     Returns:
         - selected_variables: List of selected variable names
         - coefficients: Regression coefficients
         - r_squared: Model R² value
         - adjusted_r_squared: Adjusted R²
-        - p_values: P-values for each variable
+        - p_values: Partial (t-test) p-values for each variable
         - steps: Selection process details
     """
-    return stepwise_regression_logic(request)
+    return encode_response(stepwise_regression_logic(request), accept)
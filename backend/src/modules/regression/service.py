@@ -1,11 +1,14 @@
 """Stepwise regression service logic"""
 
+import logging
 import numpy as np
-import sys
-import traceback
 from fastapi import HTTPException
-from sklearn.linear_model import LinearRegression
-from sklearn.feature_selection import f_regression
+from ..datasets.service import resolve_dataframe
+from ..jobs.progress import report_progress
+from ..timing import stage
+from .stepwise import StepwiseQR
+
+logger = logging.getLogger(__name__)
 
 
 def stepwise_regression_logic(request):
@@ -15,67 +18,77 @@ def stepwise_regression_logic(request):
     Methods:
         - forward: Start with no variables, add best at each step
         - backward: Start with all variables, remove worst at each step
-        - both: Combination of forward and backward
+        - both: Forward additions, each followed by removal of variables that are no longer significant
+
+    Variables are added/removed on partial F-tests computed from one incrementally
+    updated QR factorization (see stepwise.StepwiseQR).
 
     Returns:
         - selected_variables: List of selected variable names
         - coefficients: Regression coefficients
         - r_squared: Model R² value
         - adjusted_r_squared: Adjusted R²
-        - p_values: P-values for each variable
+        - p_values: Partial (t-test) p-values for each variable
         - steps: Selection process details
     """
     try:
-        # Convert to numpy arrays
-        y = np.array(request.y)
-        X_dict = request.X
-        variable_names = list(X_dict.keys())
-        X = np.column_stack([X_dict[name] for name in variable_names])
-
-        # Remove NaN values
-        valid_idx = ~(np.isnan(y) | np.any(np.isnan(X), axis=1))
-        y = y[valid_idx]
-        X = X[valid_idx]
+        # Convert to numpy arrays (raw y/X or registered dataset columns)
+        with stage("stepwise.load"):
+            if request.dataset_id:
+                if not request.target:
+                    raise HTTPException(status_code=400, detail="'target' is required when using a dataset_id")
+                columns = request.columns
+                if columns is None:
+                    df = resolve_dataframe(dataset_id=request.dataset_id, numeric_only=True)
+                    columns = [col for col in df.columns if col != request.target]
+                df = resolve_dataframe(dataset_id=request.dataset_id, columns=[request.target] + list(columns))
+                y = df[request.target].to_numpy(dtype=float)
+                variable_names = [col for col in df.columns if col != request.target]
+                X = df[variable_names].to_numpy(dtype=float)
+            else:
+                if request.y is None or not request.X:
+                    raise HTTPException(status_code=400, detail="Either y and X or a dataset_id is required")
+                y = np.array(request.y)
+                X_dict = request.X
+                variable_names = list(X_dict.keys())
+                X = np.column_stack([X_dict[name] for name in variable_names])
+
+            # Remove NaN values
+            valid_idx = ~(np.isnan(y) | np.any(np.isnan(X), axis=1))
+            y = y[valid_idx]
+            X = X[valid_idx]
 
         if len(y) < 2:
             raise HTTPException(status_code=400, detail="Insufficient valid data points")
 
         n_samples, n_features = X.shape
 
-        if request.method == "forward":
-            selected = forward_selection(X, y, variable_names, request.significance_level)
-        elif request.method == "backward":
-            selected = backward_elimination(X, y, variable_names, request.significance_level)
-        else:  # both
-            selected = stepwise_both(X, y, variable_names, request.significance_level)
+        with stage("stepwise.select"):
+            engine = StepwiseQR(X, y)
+            if request.method == "forward":
+                selected = forward_selection(engine, variable_names, request.significance_level)
+            elif request.method == "backward":
+                selected = backward_elimination(engine, variable_names, request.significance_level)
+            else:  # both
+                selected = stepwise_both(engine, variable_names, request.significance_level)
 
-        # Fit final model with selected variables
+        # Final model statistics come straight from the selection's factorization
         if len(selected['selected_indices']) > 0:
-            X_selected = X[:, selected['selected_indices']]
-            model = LinearRegression()
-            model.fit(X_selected, y)
-
-            # Calculate statistics
-            y_pred = model.predict(X_selected)
-            ss_res = np.sum((y - y_pred) ** 2)
-            ss_tot = np.sum((y - np.mean(y)) ** 2)
-            r_squared = 1 - (ss_res / ss_tot)
+            intercept = float(engine.coefficients()[0])
+            coefs, _, p_values = engine.partial_tests()
 
-            # Adjusted R²
             n = len(y)
             p = len(selected['selected_indices'])
-            adjusted_r_squared = 1 - ((1 - r_squared) * (n - 1) / (n - p - 1))
-
-            # P-values
-            _, p_values = f_regression(X_selected, y)
+            r_squared = 1 - engine.rss / engine.tss if engine.tss > 0 else 1.0
+            adjusted_r_squared = 1 - ((1 - r_squared) * (n - 1) / (n - p - 1)) if n - p - 1 > 0 else float('nan')
 
             response = {
                 "selected_variables": selected['selected_variables'],
                 "coefficients": {
-                    "intercept": float(model.intercept_),
+                    "intercept": intercept,
                     "variables": {
                         name: float(coef)
-                        for name, coef in zip(selected['selected_variables'], model.coef_)
+                        for name, coef in zip(selected['selected_variables'], coefs)
                     }
                 },
                 "r_squared": float(r_squared),
@@ -87,7 +100,7 @@ def stepwise_regression_logic(request):
                 "steps": selected['steps'],
                 "n_samples": int(n),
                 "n_features_original": int(n_features),
-                "n_features_selected": len(selected['selected_indices'])
+                "n_features_selected": p
             }
         else:
             response = {
@@ -98,110 +111,114 @@ def stepwise_regression_logic(request):
 
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Stepwise regression error: {str(e)}", file=sys.stderr)
-        traceback.print_exc()
+        logger.exception("Stepwise regression error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def forward_selection(X, y, variable_names, significance_level):
-    """Forward stepwise selection"""
-    n_features = X.shape[1]
-    selected_indices = []
-    remaining_indices = list(range(n_features))
-    steps = []
+def _step(number, action, variable, f_stat, p_value, reason=None):
+    """One selection step; reason explains removals made without a test (None otherwise)"""
+    return {
+        "step": number,
+        "action": action,
+        "variable": variable,
+        "f_statistic": float(f_stat),
+        "p_value": float(p_value),
+        "reason": reason
+    }
 
-    while remaining_indices:
-        best_p_value = 1.0
-        best_idx = None
-
-        for idx in remaining_indices:
-            test_indices = selected_indices + [idx]
-            X_test = X[:, test_indices]
-
-            model = LinearRegression()
-            model.fit(X_test, y)
-
-            # Calculate p-value for new variable
-            _, p_values = f_regression(X_test, y)
-            p_value = p_values[-1]  # P-value of newly added variable
-
-            if p_value < best_p_value:
-                best_p_value = p_value
-                best_idx = idx
-
-        if best_p_value < significance_level:
-            selected_indices.append(best_idx)
-            remaining_indices.remove(best_idx)
-            steps.append({
-                "step": len(selected_indices),
-                "action": "add",
-                "variable": variable_names[best_idx],
-                "p_value": float(best_p_value)
-            })
-        else:
-            break
 
+def _forward_step(engine, variable_names, significance_level, steps):
+    """Add the candidate with the smallest partial p-value if it is significant"""
+    selected = set(engine.selected)
+    candidates = [i for i in range(engine.X.shape[1]) if i not in selected]
+    if not candidates:
+        return False
+
+    f_stats, p_values = engine.score_candidates(candidates)
+    best = int(np.argmin(p_values))
+    if p_values[best] >= significance_level:
+        return False
+
+    engine.add(candidates[best])
+    steps.append(_step(len(steps) + 1, "add", variable_names[candidates[best]], f_stats[best], p_values[best]))
+    return True
+
+
+def _backward_step(engine, variable_names, significance_level, steps):
+    """Remove the selected variable with the largest partial p-value if it is not significant"""
+    if not engine.selected:
+        return False
+
+    _, t_stats, p_values = engine.partial_tests()
+    worst = int(np.argmax(p_values))
+    if p_values[worst] <= significance_level:
+        return False
+
+    removed = engine.selected[worst]
+    engine.remove(removed)
+    steps.append(_step(len(steps) + 1, "remove", variable_names[removed], t_stats[worst] ** 2, p_values[worst]))
+    return True
+
+
+def _selection_result(engine, variable_names, steps):
     return {
-        "selected_indices": selected_indices,
-        "selected_variables": [variable_names[i] for i in selected_indices],
+        "selected_indices": list(engine.selected),
+        "selected_variables": [variable_names[i] for i in engine.selected],
         "steps": steps
     }
 
 
-def backward_elimination(X, y, variable_names, significance_level):
-    """Backward stepwise elimination"""
-    n_features = X.shape[1]
-    selected_indices = list(range(n_features))
+def forward_selection(engine, variable_names, significance_level):
+    """Forward stepwise selection: add the most significant candidate (partial F-test) at each step"""
     steps = []
-
-    while len(selected_indices) > 0:
-        X_selected = X[:, selected_indices]
-        _, p_values = f_regression(X_selected, y)
-
-        max_p_value = np.max(p_values)
-        max_p_idx = np.argmax(p_values)
-
-        if max_p_value > significance_level:
-            removed_idx = selected_indices[max_p_idx]
-            selected_indices.remove(removed_idx)
-            steps.append({
-                "step": len(steps) + 1,
-                "action": "remove",
-                "variable": variable_names[removed_idx],
-                "p_value": float(max_p_value)
-            })
-        else:
+    n_features = engine.X.shape[1]
+    while True:
+        report_progress(len(engine.selected) / n_features, f"Forward step {len(steps) + 1}")
+        if not _forward_step(engine, variable_names, significance_level, steps):
             break
+    return _selection_result(engine, variable_names, steps)
 
-    return {
-        "selected_indices": selected_indices,
-        "selected_variables": [variable_names[i] for i in selected_indices],
-        "steps": steps
-    }
 
+def backward_elimination(engine, variable_names, significance_level):
+    """Backward stepwise elimination: start from all variables, drop the least significant at each step"""
+    steps = []
+    n_features = engine.X.shape[1]
+
+    # Build the full model; columns that are collinear with earlier ones, or that
+    # would leave no residual degrees of freedom, are dropped up front
+    for idx in range(n_features):
+        if engine.df_resid > 1 and not engine.is_collinear([idx])[0]:
+            engine.add(idx)
+        else:
+            reason = "collinear" if engine.df_resid > 1 else "insufficient_degrees_of_freedom"
+            steps.append(_step(len(steps) + 1, "remove", variable_names[idx], 0.0, 1.0, reason))
+
+    while True:
+        report_progress(len(steps) / n_features, f"Backward step {len(steps) + 1}")
+        if not _backward_step(engine, variable_names, significance_level, steps):
+            break
+    return _selection_result(engine, variable_names, steps)
 
-def stepwise_both(X, y, variable_names, significance_level):
-    """Bidirectional stepwise selection"""
-    # Start with forward selection
-    result = forward_selection(X, y, variable_names, significance_level)
 
-    # Then apply backward elimination on selected variables
-    if len(result['selected_indices']) > 1:
-        X_subset = X[:, result['selected_indices']]
-        backward_result = backward_elimination(
-            X_subset, y, result['selected_variables'], significance_level
-        )
+def stepwise_both(engine, variable_names, significance_level):
+    """
+    Bidirectional stepwise selection
 
-        # Map back to original indices
-        final_indices = [
-            result['selected_indices'][i]
-            for i in range(len(result['selected_indices']))
-            if result['selected_variables'][i] in backward_result['selected_variables']
-        ]
+    After each forward addition, variables that are no longer significant given
+    the new one are removed, all on the same factorization.
+    """
+    steps = []
+    n_features = engine.X.shape[1]
+    max_steps = 4 * n_features  # Guards against add/remove cycles
 
-        result['selected_indices'] = final_indices
-        result['selected_variables'] = backward_result['selected_variables']
-        result['steps'].extend(backward_result['steps'])
+    while len(steps) < max_steps:
+        report_progress(len(engine.selected) / n_features, f"Step {len(steps) + 1}")
+        if not _forward_step(engine, variable_names, significance_level, steps):
+            break
+        while len(steps) < max_steps and _backward_step(engine, variable_names, significance_level, steps):
+            pass
 
-    return result
+    return _selection_result(engine, variable_names, steps)
@@ -0,0 +1,148 @@
+"""Incremental OLS over a changing set of regressors, for stepwise selection"""
+
+import numpy as np
+from typing import List, Tuple
+from ..lazy import lazy_import
+
+stats = lazy_import("scipy.stats")
+linalg = lazy_import("scipy.linalg")
+
+# A candidate whose residual (after projecting out the selected columns) keeps less
+# than this fraction of its centered norm is treated as collinear and never added
+COLLINEARITY_TOL = 1e-8
+
+# Once the residual sum of squares drops below this fraction of the total sum of
+# squares the fit is exact and further partial F-tests are meaningless
+EXACT_FIT_TOL = 1e-12
+
+
+class StepwiseQR:
+    """
+    OLS with an intercept on a subset of X's columns, kept as an economic QR factorization
+
+    The basis Q of [1, X_selected] grows by one Gram-Schmidt column per addition
+    and shrinks with a Givens downdate per removal. Every column of X is kept
+    residualized against Q, so the partial F-test of adding each remaining
+    candidate comes from one matrix-vector product instead of a refit.
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray):
+        self.X = np.asarray(X, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        n_obs = len(self.y)
+
+        self.selected: List[int] = []
+        self.Q = np.full((n_obs, 1), 1.0 / np.sqrt(n_obs))
+        self.R = np.array([[np.sqrt(n_obs)]])
+
+        centered = self.X - self.X.mean(axis=0)
+        self._scale = np.linalg.norm(centered, axis=0)
+        self._X_resid = centered
+        self._y_resid = self.y - self.y.mean()
+        self.tss = float(self._y_resid @ self._y_resid)
+
+    @property
+    def n_obs(self) -> int:
+        return len(self.y)
+
+    @property
+    def df_resid(self) -> int:
+        return self.n_obs - 1 - len(self.selected)
+
+    @property
+    def rss(self) -> float:
+        return float(self._y_resid @ self._y_resid)
+
+    def _exact_fit(self) -> bool:
+        return self.rss <= EXACT_FIT_TOL * self.tss
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def is_collinear(self, indices) -> np.ndarray:
+        """Whether each column is (numerically) in the span of the selected columns"""
+        indices = np.asarray(indices, dtype=int)
+        norms = np.linalg.norm(self._X_resid[:, indices], axis=0)
+        return norms <= COLLINEARITY_TOL * np.maximum(self._scale[indices], np.finfo(float).tiny)
+
+    def score_candidates(self, indices) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Partial F statistics and p-values for adding each candidate to the current model
+
+        Collinear candidates (or a model with no residual degrees of freedom left)
+        score F = 0, p = 1.
+        """
+        indices = np.asarray(indices, dtype=int)
+        f_stats = np.zeros(len(indices))
+        p_values = np.ones(len(indices))
+        df = self.df_resid - 1
+        if len(indices) == 0 or df < 1 or self._exact_fit():
+            return f_stats, p_values
+
+        Z = self._X_resid[:, indices]
+        sq_norms = np.einsum('ij,ij->j', Z, Z)
+        valid = ~self.is_collinear(indices)
+        gain = np.zeros(len(indices))
+        gain[valid] = (Z[:, valid].T @ self._y_resid) ** 2 / sq_norms[valid]
+
+        rss_new = np.maximum(self.rss - gain, EXACT_FIT_TOL * self.tss)
+        f_stats[valid] = gain[valid] / (rss_new[valid] / df)
+        p_values[valid] = stats.f.sf(f_stats[valid], 1, df)
+        return f_stats, p_values
+
+    def partial_tests(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Coefficients, t statistics and p-values of the selected columns (intercept excluded)"""
+        coefs = self.coefficients()[1:]
+        df = self.df_resid
+        if not self.selected or df < 1:
+            return coefs, np.zeros(len(coefs)), np.ones(len(coefs))
+
+        R_inv = linalg.solve_triangular(self.R, np.eye(self.R.shape[0]))
+        sigma2 = self.rss / df
+        std_errors = np.sqrt(sigma2 * np.einsum('ij,ij->i', R_inv, R_inv))[1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_stats = np.where(std_errors > 0, coefs / std_errors, np.inf)
+        p_values = 2 * stats.t.sf(np.abs(t_stats), df)
+        return coefs, t_stats, p_values
+
+    def coefficients(self) -> np.ndarray:
+        """[intercept, selected coefficients...]"""
+        return linalg.solve_triangular(self.R, self.Q.T @ self.y)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add(self, index: int) -> None:
+        """Extend the factorization with column `index` (which must not be collinear)"""
+        column = self.X[:, index]
+        projection = self.Q.T @ column
+        residual = column - self.Q @ projection
+        # Second Gram-Schmidt pass keeps Q orthonormal to working precision
+        correction = self.Q.T @ residual
+        residual -= self.Q @ correction
+        projection += correction
+
+        norm = np.linalg.norm(residual)
+        q = residual / norm
+
+        k = self.R.shape[0]
+        R = np.zeros((k + 1, k + 1))
+        R[:k, :k] = self.R
+        R[:k, k] = projection
+        R[k, k] = norm
+
+        self.Q = np.column_stack([self.Q, q])
+        self.R = R
+        self.selected.append(int(index))
+        self._X_resid -= np.outer(q, q @ self._X_resid)
+        self._y_resid -= q * (q @ self._y_resid)
+
+    def remove(self, index: int) -> None:
+        """Drop column `index` from the factorization"""
+        position = self.selected.index(index) + 1  # column 0 is the intercept
+        self.Q, self.R = linalg.qr_delete(self.Q, self.R, position, which='col', overwrite_qr=True)
+        self.selected.remove(index)
+        self._X_resid = self.X - self.Q @ (self.Q.T @ self.X)
+        self._y_resid = self.y - self.Q @ (self.Q.T @ self.y)
@@ -0,0 +1,211 @@
+"""
+Request timing shared by all routers
+
+Services wrap their phases in `stage("module.phase")`; each stage records wall
+and CPU time. `TimingMiddleware` collects the stages of every HTTP request,
+returns them in a `Server-Timing` header and feeds per-route and per-stage
+histograms that `/metrics` exposes (Prometheus text or JSON).
+"""
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+# Histogram bucket upper bounds in milliseconds (a final +Inf bucket is implicit)
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Stages of the request being handled: [(name, wall_ms, cpu_ms), ...]; None outside a request.
+# Sync endpoints run in a worker thread with a copy of the context, which still holds this list.
+_request_stages: ContextVar[Optional[List[Tuple[str, float, float]]]] = ContextVar("request_stages", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of millisecond durations"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        index = 0
+        while index < len(BUCKETS_MS) and value_ms > BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, count in zip(list(BUCKETS_MS) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum_ms": round(self.sum, 3), "buckets": buckets}
+
+
+class MetricsRegistry:
+    """Thread-safe collection of request and stage histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str], Histogram] = {}
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+        self._stage_wall: Dict[str, Histogram] = {}
+        self._stage_cpu: Dict[str, Histogram] = {}
+
+    def observe_stage(self, name: str, wall_ms: float, cpu_ms: float) -> None:
+        with self._lock:
+            self._stage_wall.setdefault(name, Histogram()).observe(wall_ms)
+            self._stage_cpu.setdefault(name, Histogram()).observe(cpu_ms)
+
+    def observe_request(self, method: str, route: str, status: int, wall_ms: float) -> None:
+        with self._lock:
+            self._requests.setdefault((method, route), Histogram()).observe(wall_ms)
+            key = (method, route, status)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._statuses.clear()
+            self._stage_wall.clear()
+            self._stage_cpu.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": [
+                    {"method": method, "route": route, **histogram.snapshot()}
+                    for (method, route), histogram in self._requests.items()
+                ],
+                "responses": [
+                    {"method": method, "route": route, "status": status, "count": count}
+                    for (method, route, status), count in self._statuses.items()
+                ],
+                "stages": [
+                    {"stage": name, "wall": histogram.snapshot(), "cpu": self._stage_cpu[name].snapshot()}
+                    for name, histogram in self._stage_wall.items()
+                ],
+            }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines: List[str] = []
+
+        def histogram_lines(metric: str, labels: str, histogram: Dict[str, Any]) -> None:
+            for bound, count in histogram["buckets"].items():
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{metric}_sum{{{labels}}} {histogram['sum_ms']}")
+            lines.append(f"{metric}_count{{{labels}}} {histogram['count']}")
+
+        snapshot = self.snapshot()
+        lines.append("# HELP modelhub_request_duration_ms Request wall time in milliseconds")
+        lines.append("# TYPE modelhub_request_duration_ms histogram")
+        for item in snapshot["requests"]:
+            histogram_lines("modelhub_request_duration_ms", f'method="{item["method"]}",route="{item["route"]}"', item)
+        lines.append("# HELP modelhub_responses_total Responses by status code")
+        lines.append("# TYPE modelhub_responses_total counter")
+        for item in snapshot["responses"]:
+            labels = f'method="{item["method"]}",route="{item["route"]}",status="{item["status"]}"'
+            lines.append(f"modelhub_responses_total{{{labels}}} {item['count']}")
+        for kind in ("wall", "cpu"):
+            metric = f"modelhub_stage_{kind}_ms"
+            lines.append(f"# HELP {metric} Service stage {kind} time in milliseconds")
+            lines.append(f"# TYPE {metric} histogram")
+            for item in snapshot["stages"]:
+                histogram_lines(metric, f'stage="{item["stage"]}"', item[kind])
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a service phase (wall and CPU time of the current thread)
+
+    Inside a request the stage also appears in its Server-Timing header; it is
+    always added to the stage histograms.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        wall_ms = (time.perf_counter() - wall_start) * 1000
+        cpu_ms = (time.thread_time() - cpu_start) * 1000
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((name, wall_ms, cpu_ms))
+        metrics.observe_stage(name, wall_ms, cpu_ms)
+
+
+def server_timing(stages: List[Tuple[str, float, float]], total_ms: float) -> str:
+    """Server-Timing header value: each stage, the time outside stages (routing, parsing) and the total"""
+    entries = [f'{name};dur={wall_ms:.2f};desc="cpu {cpu_ms:.2f}ms"' for name, wall_ms, cpu_ms in stages]
+    if stages:
+        entries.append(f"other;dur={max(total_ms - sum(wall for _, wall, _ in stages), 0.0):.2f}")
+    entries.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(entries)
+
+
+_PATH_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+
+
+def _route_label(scope) -> str:
+    """
+    Route template (e.g. /api/jobs/{job_id}) so labels stay bounded
+
+    Routes of included routers may carry only their own path, without the
+    router prefix; the prefix is recovered from the request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        endpoint = scope.get("endpoint")
+        return getattr(endpoint, "__name__", "unmatched")
+
+    params = scope.get("path_params", {})
+    rendered = _PATH_PARAM.sub(lambda match: str(params.get(match.group(1), match.group(0))), template)
+    path = scope.get("path", "")
+    if rendered and path.endswith(rendered):
+        return path[:len(path) - len(rendered)] + template
+    return template
+
+
+class TimingMiddleware:
+    """ASGI middleware: collects stage timings per request, adds Server-Timing and records histograms"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stages: List[Tuple[str, float, float]] = []
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stages, (time.perf_counter() - start) * 1000))
+                headers.append("Timing-Allow-Origin", "*")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stages.reset(token)
+            metrics.observe_request(scope["method"], _route_label(scope), status, (time.perf_counter() - start) * 1000)
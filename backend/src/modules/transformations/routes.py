@@ -1,14 +1,16 @@
 """Transformations API routes"""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
+from typing import Optional
 from .models import VariableTransformRequest
 from .service import transform_variable_logic
+from ..encoding import encode_response
 
 router = APIRouter()
 
 
 @router.post("/variable")
-async def transform_variable(request: VariableTransformRequest):
+def transform_variable(request: VariableTransformRequest, accept: Optional[str] = Header(None)):
     """
     Apply a series of transformations to a variable
 
@@ -20,4 +22,4 @@ async def transform_variable(request: VariableTransformRequest):
         - transformed_data: List of transformed values
         - variable_name: Name of the variable
     """
-    return transform_variable_logic(request)
+    return encode_response(transform_variable_logic(request), accept)
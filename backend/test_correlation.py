@@ -0,0 +1,186 @@
+"""Array-form correlation statistics vs pandas/scipy"""
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from modules.correlation.models import CorrelationRequest, CorrelationRankedRequest, CorrelationScanRequest
+from modules.correlation.service import correlation_matrix_logic, correlation_ranked_logic, correlation_scan_logic
+from modules.modelling.transformations import apply_variable_transformation
+
+
+def make_frame(n_obs=80, n_vars=12, seed=2):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n_obs, n_vars)), columns=[f"v{i}" for i in range(n_vars)])
+    df["v1"] = df["v0"] * 0.8 + rng.normal(scale=0.3, size=n_obs)
+    df["v2"] = np.round(df["v2"])  # ties for Spearman
+    return df
+
+
+def test_matrix_matches_pandas_and_scipy():
+    df = make_frame()
+    result = correlation_matrix_logic(CorrelationRequest(variables=df.to_dict(orient="list")))
+
+    np.testing.assert_allclose(pd.DataFrame(result["pearson"]).loc[df.columns, df.columns], df.corr(), atol=1e-12)
+    np.testing.assert_allclose(
+        pd.DataFrame(result["spearman"]).loc[df.columns, df.columns], df.corr(method="spearman"), atol=1e-12
+    )
+    for a, b in [("v0", "v1"), ("v2", "v5"), ("v3", "v7")]:
+        expected = stats.pearsonr(df[a], df[b]).pvalue
+        np.testing.assert_allclose(result["p_values"][a][b], expected, rtol=1e-8)
+    assert result["p_values"]["v4"]["v4"] == 0.0
+
+
+def test_upper_triangle_outputs():
+    df = make_frame()
+    full = correlation_matrix_logic(CorrelationRequest(variables=df.to_dict(orient="list"), output="matrix"))
+    condensed = correlation_matrix_logic(
+        CorrelationRequest(variables=df.to_dict(orient="list"), output="matrix", upper_triangle=True)
+    )
+    rows, cols = np.triu_indices(df.shape[1], 1)
+    np.testing.assert_array_equal(condensed["pearson"], full["pearson"][rows, cols])
+    np.testing.assert_array_equal(condensed["p_values"], full["p_values"][rows, cols])
+
+    nested = correlation_matrix_logic(CorrelationRequest(variables=df.to_dict(orient="list"), upper_triangle=True))
+    assert list(nested["pearson"]["v10"]) == ["v11"] and nested["pearson"]["v11"] == {}
+
+
+def test_top_k_and_threshold_match_dense():
+    df = make_frame(n_vars=40)
+    variables = df.to_dict(orient="list")
+    dense = correlation_matrix_logic(CorrelationRequest(variables=variables, output="matrix"))["pearson"]
+
+    top = correlation_matrix_logic(CorrelationRequest(variables=variables, mode="top_k", top_k=3, block_size=7))
+    pairs = top["pairs"]
+    assert len(pairs["source"]) == 40 * 3
+    for i in (0, 13, 39):
+        abs_row = np.abs(dense[i]).copy()
+        abs_row[i] = -1
+        expected = np.argsort(-abs_row)[:3]
+        mine = pairs["target"][pairs["source"] == i]
+        np.testing.assert_array_equal(mine, expected)
+        np.testing.assert_allclose(pairs["correlation"][pairs["source"] == i], dense[i, expected], atol=1e-12)
+
+    thr = correlation_matrix_logic(CorrelationRequest(variables=variables, mode="threshold", threshold=0.2, block_size=6))
+    rows, cols = np.triu_indices(40, 1)
+    expected = {(i, j) for i, j in zip(rows, cols) if abs(dense[i, j]) >= 0.2}
+    assert set(zip(thr["pairs"]["source"].tolist(), thr["pairs"]["target"].tolist())) == expected
+
+
+def test_float32_path():
+    df = make_frame(n_vars=30)
+    variables = df.to_dict(orient="list")
+    dense = correlation_matrix_logic(CorrelationRequest(variables=variables, output="matrix"))
+    single = correlation_matrix_logic(CorrelationRequest(variables=variables, output="matrix", dtype="float32"))
+    np.testing.assert_allclose(single["pearson"], dense["pearson"], atol=1e-5)
+    np.testing.assert_allclose(single["spearman"], dense["spearman"], atol=1e-5)
+
+
+def test_ranked_matches_scipy():
+    df = make_frame()
+    df["flat"] = 1.0  # zero variance: skipped
+    result = correlation_ranked_logic(CorrelationRankedRequest(
+        variables=df.to_dict(orient="list"), target_variable="v0", methods=["pearson", "spearman", "kendall"]
+    ))
+    items = result["correlations"]
+    assert [item["variable"] for item in items][0] == "v1" and "flat" not in [item["variable"] for item in items]
+    assert np.all(np.diff([abs(item["correlation"]) for item in items]) <= 0)
+
+    for item in items:
+        x = df[item["variable"]]
+        pearson = stats.pearsonr(x, df["v0"])
+        spearman = stats.spearmanr(x, df["v0"])
+        kendall = stats.kendalltau(x, df["v0"], method="asymptotic")
+        np.testing.assert_allclose([item["correlation"], item["p_value"]], [pearson.statistic, pearson.pvalue], rtol=1e-8)
+        np.testing.assert_allclose([item["spearman"], item["spearman_p_value"]], [spearman.statistic, spearman.pvalue], rtol=1e-8)
+        np.testing.assert_allclose([item["kendall"], item["kendall_p_value"]], [kendall.statistic, kendall.pvalue], rtol=1e-8)
+
+
+def make_sparse_frame():
+    df = make_frame(n_obs=120)
+    df.loc[:59, "v3"] = np.nan  # starts late
+    df.loc[90:, "v4"] = np.nan  # ends early
+    df.loc[df.index % 5 == 0, "v5"] = np.nan  # scattered gaps
+    df.loc[:30, "v0"] = np.nan
+    return df
+
+
+def test_pairwise_matrix_matches_pandas():
+    df = make_sparse_frame()
+    variables = {col: [None if np.isnan(v) else v for v in df[col]] for col in df.columns}
+    result = correlation_matrix_logic(CorrelationRequest(variables=variables, missing="pairwise", output="matrix"))
+    idx = [result["variables"].index(col) for col in df.columns]
+
+    np.testing.assert_allclose(result["pearson"][np.ix_(idx, idx)], df.corr(), atol=1e-12)
+    np.testing.assert_allclose(result["spearman"][np.ix_(idx, idx)], df.corr(method="spearman"), atol=1e-12)
+    observed = df.notna().to_numpy(dtype=int)
+    np.testing.assert_array_equal(result["sample_sizes"][np.ix_(idx, idx)], observed.T @ observed)
+
+    both = df[["v3", "v5"]].dropna()
+    i, j = result["variables"].index("v3"), result["variables"].index("v5")
+    np.testing.assert_allclose(result["p_values"][i, j], stats.pearsonr(both["v3"], both["v5"]).pvalue, rtol=1e-8)
+
+    # Listwise keeps the old behaviour: only complete rows
+    listwise = correlation_matrix_logic(CorrelationRequest(variables=variables))
+    assert listwise["n_samples"] == len(df.dropna()) and "sample_sizes" not in listwise
+
+
+def test_pairwise_ranked_matches_scipy():
+    df = make_sparse_frame()
+    result = correlation_ranked_logic(CorrelationRankedRequest(
+        variables=df.to_dict(orient="list"), target_variable="v1", methods=["pearson", "spearman", "kendall"],
+        missing="pairwise"
+    ))
+    for item in result["correlations"]:
+        both = df[[item["variable"], "v1"]].dropna()
+        x, y = both[item["variable"]], both["v1"]
+        assert item["n_samples"] == len(both)
+        np.testing.assert_allclose([item["correlation"], item["p_value"]], stats.pearsonr(x, y), rtol=1e-8)
+        np.testing.assert_allclose([item["spearman"], item["spearman_p_value"]], stats.spearmanr(x, y), rtol=1e-8)
+        np.testing.assert_allclose(
+            [item["kendall"], item["kendall_p_value"]], stats.kendalltau(x, y, method="asymptotic"), rtol=1e-8
+        )
+
+
+def test_scan_matches_transform_and_correlate():
+    rng = np.random.default_rng(4)
+    n_obs = 104
+    spend = pd.DataFrame(np.abs(rng.normal(size=(n_obs, 4))) * 100, columns=["tv", "radio", "search", "print"])
+    spend.loc[:40, "print"] = 0.0  # launched late
+    adstocked_tv = apply_variable_transformation(spend["tv"].to_numpy(), lag=2, adstock=0.6)
+    kpi = 3 * adstocked_tv + spend["search"] + rng.normal(scale=20, size=n_obs)
+    df = spend.assign(sales=kpi)
+
+    rates, dimrets = [0.0, 0.3, 0.6], [0.0, 0.4]
+    for combined in (False, True):
+        result = correlation_scan_logic(CorrelationScanRequest(
+            variables=df.to_dict(orient="list"), kpi="sales", max_lag=4,
+            adstock_rates=rates, dimret_rates=dimrets, dimret_adstock=combined
+        ))
+        by_variable = {item["variable"]: item for item in result["results"]}
+        assert (by_variable["tv"]["lag"], by_variable["tv"]["adstock"]) == (2, 0.6)
+
+        for name, item in by_variable.items():
+            for lag in range(5):
+                for a, rate in enumerate(rates):
+                    for d, dimret in enumerate(dimrets):
+                        series = apply_variable_transformation(
+                            df[name].to_numpy(), lag=lag, adstock=rate, dimret=dimret, dimret_adstock=combined
+                        )
+                        expected = np.corrcoef(series, kpi)[0, 1]
+                        np.testing.assert_allclose(item["grid"][lag, a, d], expected, atol=1e-12)
+
+
+if __name__ == "__main__":
+    test_matrix_matches_pandas_and_scipy()
+    test_upper_triangle_outputs()
+    test_top_k_and_threshold_match_dense()
+    test_float32_path()
+    test_ranked_matches_scipy()
+    test_pairwise_matrix_matches_pandas()
+    test_pairwise_ranked_matches_scipy()
+    test_scan_matches_transform_and_correlate()
+    print("SUCCESS!")
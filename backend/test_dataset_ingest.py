@@ -0,0 +1,98 @@
+"""Binary/CSV dataset uploads decode to the same data as the JSON path; date columns parse ISO first"""
+import io
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+
+from modules.datasets.ingest import PYARROW_AVAILABLE, decode_dataset, detect_format
+from modules.datasets.service import get_dataset, register_dataset, register_upload
+from modules.modelling.service import transform_data
+
+
+def make_frame(n_rows=120, seed=5):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "OBS": pd.date_range("2022-01-03", periods=n_rows, freq="W-MON").strftime("%d/%m/%Y"),
+        "sales": rng.gamma(2.0, 100.0, n_rows),
+        "tv_spend": rng.integers(0, 500, n_rows),
+    })
+
+
+def encode(df, fmt):
+    buffer = io.BytesIO()
+    if fmt == "csv":
+        df.to_csv(buffer, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(buffer, index=False)
+    elif fmt in ("arrow", "arrow_file"):
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        writer = pa.ipc.new_stream if fmt == "arrow" else pa.ipc.new_file
+        with writer(buffer, table.schema) as sink:
+            sink.write_table(table)
+    return buffer.getvalue()
+
+
+def check_matches_json_path(fmt):
+    df = make_frame()
+    info = register_upload(encode(df, fmt))
+    assert info["format"] == fmt and info["n_rows"] == len(df)
+
+    uploaded = get_dataset(info["dataset_id"])
+    expected = get_dataset(register_dataset(df.to_dict(orient="list"))["dataset_id"])
+    for col in ("sales", "tv_spend"):
+        assert uploaded[col].dtype == np.float64
+        np.testing.assert_allclose(uploaded[col].to_numpy(), expected[col].to_numpy(dtype=float), rtol=1e-15)
+    assert (uploaded["OBS"] == expected["OBS"]).all()
+
+
+def test_csv_upload():
+    check_matches_json_path("csv")
+
+
+def test_arrow_and_parquet_uploads():
+    if not PYARROW_AVAILABLE:
+        return
+    for fmt in ("arrow", "arrow_file", "parquet"):
+        check_matches_json_path(fmt)
+
+
+def test_npy_upload():
+    values = np.random.default_rng(0).normal(size=(50, 3))
+    buffer = io.BytesIO()
+    np.save(buffer, values)
+    df = decode_dataset(buffer.getvalue(), detect_format(buffer.getvalue()), ["a", "b", "c"])
+    assert list(df.columns) == ["a", "b", "c"]
+    assert df["b"].to_numpy().flags.c_contiguous
+    np.testing.assert_array_equal(df.to_numpy(), values)
+
+
+def test_date_columns_iso_first_then_day_first():
+    def registered_dates(values):
+        return get_dataset(register_dataset({"OBS": values, "sales": [1.0] * len(values)})["dataset_id"])["OBS"].tolist()
+
+    iso = ["2022-01-03", "2022-01-10", "2022-02-07"]
+    expected = [pd.Timestamp(2022, 1, 3), pd.Timestamp(2022, 1, 10), pd.Timestamp(2022, 2, 7)]
+    assert registered_dates(iso) == expected
+    assert registered_dates(["03/01/2022", "10/01/2022", "07/02/2022"]) == expected
+    # Ambiguous day/month reads day first
+    assert registered_dates(["01/02/2022", "02/03/2022"]) == [pd.Timestamp(2022, 2, 1), pd.Timestamp(2022, 3, 2)]
+
+    # JSON and CSV registrations of the same ISO column agree
+    df = pd.DataFrame({"OBS": iso, "sales": [1.0, 2.0, 3.0]})
+    assert get_dataset(register_upload(encode(df, "csv"))["dataset_id"])["OBS"].tolist() == expected
+
+    # Date filters on ISO bounds keep the right rows
+    original, _ = transform_data(df, [], "2022-01-04", "2022-02-07", "sales")
+    assert original["OBS"].tolist() == expected[1:]
+
+
+if __name__ == "__main__":
+    test_csv_upload()
+    test_arrow_and_parquet_uploads()
+    test_npy_upload()
+    test_date_columns_iso_first_then_day_first()
+    print("SUCCESS!")
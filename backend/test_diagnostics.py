@@ -0,0 +1,158 @@
+"""Modelling diagnostics: test selection, reduced White test, /diagnostics for stored models"""
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from fastapi.testclient import TestClient
+from statsmodels.stats.diagnostic import acorr_ljungbox, het_breuschpagan, het_white
+from statsmodels.stats.stattools import jarque_bera
+
+from main import app
+from modules.modelling.cache import model_store
+from modules.modelling.service import (
+    DIAGNOSTIC_TESTS, calculate_diagnostics, resolve_diagnostic_tests, white_test_reduced
+)
+
+N_OBS = 120
+BASIC_KEYS = {"jarque_bera_stat", "jarque_bera_pvalue", "ljung_box_stat", "ljung_box_pvalue",
+              "breusch_pagan_stat", "breusch_pagan_pvalue"}
+
+
+def make_fit(n_vars=3, seed=5):
+    """OLS fit with AR(1) errors whose variance grows with the first regressor"""
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(1, 10, size=(N_OBS, n_vars))
+    shocks = rng.normal(size=N_OBS) * X[:, 0]
+    errors = np.zeros(N_OBS)
+    for t in range(1, N_OBS):
+        errors[t] = 0.7 * errors[t - 1] + shocks[t]
+    y = 5 + X @ rng.normal(1, 0.5, n_vars) + errors
+    X_array = sm.add_constant(X)
+    fit = sm.OLS(y, X_array).fit()
+    return fit.resid, fit.fittedvalues, X_array, ["const"] + [f"var_{i}" for i in range(n_vars)]
+
+
+def test_resolve_diagnostic_tests():
+    assert resolve_diagnostic_tests("none") == []
+    assert resolve_diagnostic_tests("basic") == ["jarque_bera", "ljung_box", "breusch_pagan"]
+    assert resolve_diagnostic_tests("full") == DIAGNOSTIC_TESTS
+    assert resolve_diagnostic_tests(None) == DIAGNOSTIC_TESTS
+    assert resolve_diagnostic_tests(["vif", "white"]) == ["white", "vif"]  # Canonical order
+    for selection in ("some", ["white", "durbin"]):
+        try:
+            resolve_diagnostic_tests(selection)
+        except ValueError:
+            continue
+        raise AssertionError(f"{selection!r} was accepted")
+
+
+def test_selected_tests_match_statsmodels():
+    residuals, fitted, X_array, names = make_fit()
+
+    assert calculate_diagnostics(residuals, X_array, names, tests=[]) == {}
+    basic = calculate_diagnostics(residuals, X_array, names, tests=resolve_diagnostic_tests("basic"))
+    assert set(basic) == BASIC_KEYS
+
+    full = calculate_diagnostics(residuals, X_array, names, fitted_values=fitted)
+    assert BASIC_KEYS <= set(full)
+    assert {"white_test_stat", "condition_number", "scaled_condition_number", "vif_values"} <= set(full)
+    assert np.isclose(full["jarque_bera_stat"], jarque_bera(residuals)[0])
+    assert np.isclose(full["breusch_pagan_stat"], het_breuschpagan(residuals, X_array)[0])
+    assert np.isclose(full["white_test_stat"], het_white(residuals, X_array)[0])
+    assert full["white_test_variant"] == "full"
+
+    only_vif = calculate_diagnostics(residuals, X_array, names, tests=["vif"])
+    assert set(only_vif) == {"vif_values"} and set(only_vif["vif_values"]) == set(names[1:])
+
+
+def test_ljung_box_reads_statsmodels_frame():
+    residuals, _, X_array, names = make_fit()
+    result = calculate_diagnostics(residuals, X_array, names, tests=["ljung_box"])
+
+    expected = acorr_ljungbox(residuals, lags=[10])
+    assert isinstance(expected, pd.DataFrame)
+    assert np.isclose(result["ljung_box_stat"], expected["lb_stat"].iloc[0])
+    assert np.isclose(result["ljung_box_pvalue"], expected["lb_pvalue"].iloc[0])
+    assert result["ljung_box_pvalue"] < 0.01  # AR(1) errors are detected, not defaulted to 1.0
+
+
+def test_white_test_reduced_above_threshold():
+    residuals, fitted, X_array, names = make_fit(n_vars=35)
+
+    stat, pvalue = white_test_reduced(residuals, fitted)
+    auxiliary = sm.OLS(residuals ** 2, np.column_stack([np.ones(N_OBS), fitted, fitted ** 2])).fit()
+    assert np.isclose(stat, N_OBS * auxiliary.rsquared)
+    assert 0 <= pvalue <= 1
+
+    reduced = calculate_diagnostics(residuals, X_array, names, tests=["white"], fitted_values=fitted)
+    assert reduced["white_test_variant"] == "reduced"
+    assert np.isclose(reduced["white_test_stat"], stat)
+
+    # Raising the threshold above the regressor count keeps the full form
+    full = calculate_diagnostics(residuals, X_array[:, :11], names[:11], tests=["white"],
+                                 fitted_values=fitted, white_max_regressors=40)
+    assert full["white_test_variant"] == "full"
+    assert np.isclose(full["white_test_stat"], het_white(residuals, X_array[:, :11])[0])
+
+
+def regression_payload(diagnostics):
+    rng = np.random.default_rng(11)
+    data = {"OBS": pd.date_range("2022-01-03", periods=N_OBS, freq="W-MON").strftime("%Y-%m-%d").tolist(),
+            "sales": rng.normal(100, 10, N_OBS).tolist(),
+            "tv": rng.uniform(0, 50, N_OBS).tolist(),
+            "radio": rng.uniform(0, 50, N_OBS).tolist()}
+    return {
+        "model_configuration": {"kpi": "sales", "start_date": "2022-01-01", "end_date": "2024-12-31"},
+        "variable_transformations": [{"variable": "sales"}, {"variable": "tv"}, {"variable": "radio"}],
+        "data": data,
+        "diagnostics": diagnostics,
+    }
+
+
+def test_diagnostics_route_for_stored_model():
+    client = TestClient(app)
+    fitted = client.post("/api/modelling/regression", json=regression_payload("none"))
+    assert fitted.status_code == 200
+    body = fitted.json()
+    assert body["diagnostics"] == {}
+
+    response = client.post("/api/modelling/diagnostics", json={"model_id": body["model_id"], "diagnostics": "basic"})
+    assert response.status_code == 200
+    assert response.json()["model_id"] == body["model_id"]
+    assert set(response.json()["diagnostics"]) == BASIC_KEYS
+
+    response = client.post("/api/modelling/diagnostics",
+                           json={"model_id": body["model_id"], "diagnostics": ["condition_number"]})
+    assert set(response.json()["diagnostics"]) == {"condition_number", "scaled_condition_number"}
+
+    response = client.post("/api/modelling/diagnostics", json={"model_id": body["model_id"], "diagnostics": "most"})
+    assert response.status_code == 400
+
+
+def test_diagnostics_route_after_eviction():
+    client = TestClient(app)
+    max_models = model_store.max_models
+    model_store.max_models = 1
+    try:
+        first = client.post("/api/modelling/regression", json=regression_payload("none")).json()["model_id"]
+        second = client.post("/api/modelling/regression", json=regression_payload("none")).json()["model_id"]
+    finally:
+        model_store.max_models = max_models
+
+    response = client.post("/api/modelling/diagnostics", json={"model_id": first})
+    assert response.status_code == 404
+    assert "re-run the regression" in response.json()["detail"]
+    assert client.post("/api/modelling/diagnostics", json={"model_id": second}).status_code == 200
+
+
+if __name__ == "__main__":
+    test_resolve_diagnostic_tests()
+    test_selected_tests_match_statsmodels()
+    test_ljung_box_reads_statsmodels_frame()
+    test_white_test_reduced_above_threshold()
+    test_diagnostics_route_for_stored_model()
+    test_diagnostics_route_after_eviction()
+    print("SUCCESS!")
@@ -0,0 +1,74 @@
+"""Vectorized response sanitization and encoding"""
+import json
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+
+from modules.encoding import COLUMNAR_MEDIA_TYPE, decode_columnar, dumps, encode_response, sanitize
+
+
+def make_result():
+    values = np.linspace(0, 1, 50)
+    values[[3, 7]] = [np.nan, np.inf]
+    return {
+        "coefficients": {"const": 1.5, "tv": float("nan")},
+        "residuals": values,
+        "fitted_values": values.tolist(),
+        "dates": pd.Series(pd.date_range("2024-01-01", periods=3, freq="D")),
+        "n_obs": np.int64(50),
+        "flags": [True, False],
+        "names": ["a", "b"],
+    }
+
+
+def test_sanitize_replaces_non_finite_values():
+    result = json.loads(dumps(sanitize(make_result(), 0.0)))
+    assert result["coefficients"] == {"const": 1.5, "tv": 0.0}
+    assert result["residuals"][3] == 0.0 and result["residuals"][7] == 0.0
+    assert result["fitted_values"] == result["residuals"]
+    assert result["dates"] == ["2024-01-01T00:00:00", "2024-01-02T00:00:00", "2024-01-03T00:00:00"]
+    assert result["n_obs"] == 50 and result["flags"] == [True, False] and result["names"] == ["a", "b"]
+
+    as_null = json.loads(dumps(sanitize(make_result())))
+    assert as_null["coefficients"]["tv"] is None and as_null["residuals"][3] is None
+
+
+def test_columnar_round_trip():
+    response = encode_response(make_result(), accept=COLUMNAR_MEDIA_TYPE, nan_value=0.0)
+    assert response.media_type == COLUMNAR_MEDIA_TYPE
+
+    data, _ = decode_columnar(response.body)
+    expected = np.nan_to_num(make_result()["residuals"], nan=0.0, posinf=0.0)
+    np.testing.assert_array_equal(data["residuals"], expected)
+    np.testing.assert_array_equal(data["fitted_values"], expected)
+    assert data["coefficients"]["tv"] == 0.0 and data["names"] == ["a", "b"]
+
+
+def test_columnar_keeps_integer_and_bool_dtypes():
+    content = {
+        "counts": np.arange(10, dtype=np.int32),
+        "large": np.array([2 ** 53 + 1] * 9, dtype=np.int64),  # Not exact as float64
+        "mask": np.array([True, False, True]),
+        "values": np.linspace(0, 1, 9),
+    }
+    response = encode_response(content, accept=COLUMNAR_MEDIA_TYPE)
+    header_length = int.from_bytes(response.body[4:8], "little")
+    header = json.loads(response.body[8:8 + header_length])
+    assert [d["dtype"] for d in header["arrays"]] == ["<i8", "<i8", "|b1", "<f8"]
+    assert all(d["offset"] % 8 == 0 for d in header["arrays"])
+
+    data, _ = decode_columnar(response.body)
+    assert data["counts"].dtype == np.int64 and data["counts"].tolist() == list(range(10))
+    assert data["large"].tolist() == [2 ** 53 + 1] * 9
+    assert data["mask"].dtype == np.bool_ and data["mask"].tolist() == [True, False, True]
+    np.testing.assert_array_equal(data["values"], content["values"])
+
+
+if __name__ == "__main__":
+    test_sanitize_replaces_non_finite_values()
+    test_columnar_round_trip()
+    test_columnar_keeps_integer_and_bool_dtypes()
+    print("SUCCESS!")
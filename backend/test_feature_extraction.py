@@ -0,0 +1,87 @@
+"""Feature extraction: boosting + Random Forest in two threads, thread budgets, HistGradientBoosting option"""
+import os
+import sys
+import types
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from main import app
+from modules.feature_extraction.models import FeatureExtractionRequest
+from modules.feature_extraction.service import (
+    XGBOOST_AVAILABLE, extract_features, split_gain_importances, thread_budget, xgb
+)
+from modules.jobs.service import job_manager
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import train_test_split
+
+RNG = np.random.default_rng(0)
+X = RNG.normal(size=(300, 40))
+Y = 3 * X[:, 0] - 2 * X[:, 1] + X[:, 2] + RNG.normal(0, 0.1, 300)
+DATA = {"kpi": Y.tolist(), **{f"x{i}": X[:, i].tolist() for i in range(X.shape[1])}}
+INFORMATIVE = {"x0", "x1", "x2"}
+
+
+def test_concurrent_models_match_sequential_fits():
+    if not XGBOOST_AVAILABLE:
+        return
+    result = extract_features(FeatureExtractionRequest(
+        data=DATA, kpi_var="kpi", n_features=3, n_estimators=50, rf_n_estimators=30, rf_max_depth=6, n_jobs=4
+    ))
+    assert result["threads"] == {"booster": 2, "random_forest": 2}
+    assert {"x0", "x1"} <= set(result["top_features_xgb"]) and set(result["top_features_rf"]) == INFORMATIVE
+
+    # Same models fitted one after the other in this thread
+    X_train, _, y_train, _ = train_test_split(X, Y, test_size=0.1, random_state=42, shuffle=False)
+    booster = xgb.XGBRegressor(random_state=42, n_estimators=50, max_depth=6, learning_rate=0.1, tree_method="hist").fit(X_train, y_train)
+    forest = RandomForestRegressor(random_state=42, n_estimators=30, max_depth=6).fit(X_train, y_train)
+    importances = {item["feature"]: item for item in result["feature_importances"]}
+    for name in INFORMATIVE:
+        i = int(name[1:])
+        assert np.isclose(importances[name]["xgb_importance"], booster.feature_importances_[i], rtol=1e-5)
+        assert np.isclose(importances[name]["rf_importance"], forest.feature_importances_[i])
+
+
+def test_hist_gradient_boosting_option():
+    response = TestClient(app).post("/api/feature-extraction/extract", json={
+        "data": DATA, "kpi_var": "kpi", "n_features": 3, "booster": "hist_gradient_boosting",
+        "n_estimators": 40, "rf_n_estimators": 20, "n_jobs": 1
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["booster"] == "hist_gradient_boosting"
+    assert body["threads"] == {"booster": 1, "random_forest": 1}
+    assert set(body["top_features_xgb"]) == INFORMATIVE
+    gains = [item["xgb_importance"] for item in body["feature_importances"]]
+    assert all(0 <= gain <= 1 for gain in gains)
+
+    bad = TestClient(app).post("/api/feature-extraction/extract", json={"data": DATA, "kpi_var": "kpi", "booster": "lightgbm"})
+    assert bad.status_code == 400
+
+
+def test_split_gains_need_the_pinned_tree_layout():
+    tree = types.SimpleNamespace(nodes=np.zeros(3, dtype=[("is_leaf", "u1"), ("feature_idx", "u4"), ("value", "f8")]))
+    for model in (types.SimpleNamespace(), types.SimpleNamespace(_predictors=[[tree]])):
+        try:
+            split_gain_importances(model, 4)
+        except HTTPException as e:
+            assert e.status_code == 500 and "scikit-learn" in e.detail and "xgboost" in e.detail
+        else:
+            raise AssertionError("unreadable split gains were not reported")
+
+
+def test_default_thread_budget_is_shared_by_job_workers():
+    if "FEATURE_EXTRACTION_THREADS" in os.environ:
+        return
+    assert thread_budget() == max(1, (os.cpu_count() or 1) // job_manager.max_workers)
+    assert thread_budget(3) == 3
+
+
+if __name__ == "__main__":
+    test_concurrent_models_match_sequential_fits()
+    test_hist_gradient_boosting_option()
+    test_split_gains_need_the_pinned_tree_layout()
+    test_default_thread_budget_is_shared_by_job_workers()
+    print("SUCCESS!")
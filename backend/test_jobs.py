@@ -0,0 +1,148 @@
+"""Background job engine: status and progress, cancellation, per-kind limits, failures, crashed workers"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from pydantic import BaseModel
+
+from modules.jobs.progress import report_progress
+from modules.jobs.service import JOB_KINDS, JobManager
+
+FINISHED = ("completed", "failed", "cancelled")
+
+
+class StepsRequest(BaseModel):
+    steps: int = 1
+    delay: float = 0.0
+    fail: bool = False
+
+
+def run_steps(request: StepsRequest):
+    """Job handler: reports progress once per step"""
+    if request.fail:
+        raise ValueError("steps must be positive")
+    for step in range(request.steps):
+        report_progress(step / request.steps, f"Step {step + 1} of {request.steps}")
+        time.sleep(request.delay)
+    return {"steps": request.steps}
+
+
+@contextmanager
+def job_manager(max_concurrent=1):
+    """A JobManager with a 'steps' job kind running run_steps in threads"""
+    JOB_KINDS["steps"] = {
+        "request": "test_jobs:StepsRequest",
+        "handler": "test_jobs:run_steps",
+        "executor": "thread",
+        "max_concurrent": max_concurrent,
+    }
+    manager = JobManager(max_workers=1)
+    try:
+        yield manager
+    finally:
+        manager.shutdown()
+        del JOB_KINDS["steps"]
+
+
+def wait_for(manager, job_id, condition=lambda status: status["status"] in FINISHED, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = manager.status(job_id)
+        if condition(status):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} stuck at {manager.status(job_id)}")
+
+
+def test_status_progress_and_result():
+    with job_manager() as manager:
+        job_id = manager.submit("steps", {"steps": 40, "delay": 0.02})["job_id"]
+        running = wait_for(manager, job_id, lambda status: status["progress"] > 0)
+        assert running["status"] == "running" and running["message"].startswith("Step")
+        assert manager.result(job_id) is None
+
+        done = wait_for(manager, job_id)
+        assert done["status"] == "completed" and done["progress"] == 100.0 and done["error"] is None
+        assert manager.result(job_id) == {"ok": True, "result": {"steps": 40}}
+
+
+def test_cancel_queued_and_running_jobs():
+    with job_manager(max_concurrent=1) as manager:
+        running_id = manager.submit("steps", {"steps": 500, "delay": 0.01})["job_id"]
+        queued_id = manager.submit("steps", {"steps": 1})["job_id"]
+        assert manager.status(queued_id)["status"] == "queued"
+
+        # A queued job is cancelled at once and never starts
+        assert manager.cancel(queued_id)["status"] == "cancelled"
+        assert manager.result(queued_id)["status_code"] == 409
+
+        # A running job stops at its next progress report (JobCancelled)
+        wait_for(manager, running_id, lambda status: status["progress"] > 0)
+        assert manager.cancel(running_id)["message"] == "Cancelling"
+        status = wait_for(manager, running_id)
+        assert status["status"] == "cancelled" and status["progress"] < 100
+        assert manager.status(queued_id)["started_at"] is None
+        assert manager.stats()["running"]["steps"] == 0
+
+
+def test_max_concurrent_per_kind():
+    with job_manager(max_concurrent=2) as manager:
+        job_ids = [manager.submit("steps", {"steps": 25, "delay": 0.02})["job_id"] for _ in range(5)]
+        stats = manager.stats()
+        assert stats["running"]["steps"] == 2 and stats["queued"]["steps"] == 3
+        assert [manager.status(job_id)["status"] for job_id in job_ids] == ["running"] * 2 + ["queued"] * 3
+
+        statuses = [wait_for(manager, job_id) for job_id in job_ids]
+        assert all(status["status"] == "completed" for status in statuses)
+        # No more than two were ever running: each later job started after an earlier one finished
+        finished = sorted(status["finished_at"] for status in statuses)
+        for i, status in enumerate(statuses[2:]):
+            assert status["started_at"] >= finished[i]
+
+
+def test_failed_job_outcome():
+    with job_manager() as manager:
+        job_id = manager.submit("steps", {"fail": True})["job_id"]
+        status = wait_for(manager, job_id)
+        assert status["status"] == "failed" and status["error"] == "steps must be positive"
+        assert manager.result(job_id) == {"ok": False, "status_code": 400, "detail": "steps must be positive"}
+
+        # Invalid payloads fail in the worker as well
+        job_id = manager.submit("steps", {"steps": "many"})["job_id"]
+        assert wait_for(manager, job_id)["status"] == "failed"
+
+
+def test_crashed_worker_replaces_the_pool():
+    manager = JobManager(max_workers=1)
+    try:
+        crashed_id = manager.submit("stepwise", {})["job_id"]
+        broken_pool = manager._process_pool
+        shutdowns = []
+        shutdown = broken_pool.shutdown
+        broken_pool.shutdown = lambda *args, **kwargs: (shutdowns.append(kwargs), shutdown(*args, **kwargs))
+        for process in list(broken_pool._processes.values()):
+            process.kill()
+
+        status = wait_for(manager, crashed_id)
+        assert status["status"] == "failed" and "crashed" in status["error"]
+        assert shutdowns == [{"wait": False, "cancel_futures": True}]
+        assert manager._process_pool is None
+
+        # The next process job runs on a fresh pool (and fails validation there, not with a crash)
+        job_id = manager.submit("stepwise", {})["job_id"]
+        assert manager._process_pool is not broken_pool
+        assert wait_for(manager, job_id)["status"] == "failed"
+        assert manager.result(job_id)["status_code"] == 400
+    finally:
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    test_status_progress_and_result()
+    test_cancel_queued_and_running_jobs()
+    test_max_concurrent_per_kind()
+    test_failed_job_outcome()
+    test_crashed_worker_replaces_the_pool()
+    print("SUCCESS!")
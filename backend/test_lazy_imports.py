@@ -0,0 +1,45 @@
+"""Deferred heavy imports, background warm-up and per-module readiness"""
+import os
+import subprocess
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from fastapi.testclient import TestClient
+
+from main import app
+from modules.lazy import LazyModule, readiness, warm_up
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+HEAVY = ["scipy.stats", "scipy.optimize", "scipy.signal", "statsmodels", "sklearn", "xgboost", "prophet"]
+
+
+def test_import_main_defers_heavy_libraries():
+    code = f"import sys; import main; print(','.join(name for name in {HEAVY!r} if name in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_lazy_module_imports_on_first_use():
+    module = LazyModule("json")
+    assert "not loaded" in repr(module)
+    assert module.dumps([1]) == "[1]"
+    assert "not loaded" not in repr(module)
+
+
+def test_warm_up_makes_modules_ready():
+    warm_up(["correlation", "regression"])
+    modules = readiness()["modules"]
+    assert modules["correlation"]["status"] == "ready"
+    assert modules["regression"]["status"] == "ready"
+    assert readiness()["warm_up"]["state"] == "done"
+
+    health = TestClient(app).get("/health").json()
+    assert health["readiness"]["modules"]["correlation"]["dependencies"]["scipy.stats"] == "loaded"
+    assert {"datasets", "modelling", "feature_extraction", "prophet"} <= set(health["readiness"]["modules"])
+
+
+if __name__ == "__main__":
+    test_import_main_defers_heavy_libraries()
+    test_lazy_module_imports_on_first_use()
+    test_warm_up_makes_modules_ready()
+    print("SUCCESS!")
@@ -0,0 +1,188 @@
+"""Prophet forecast: components from the single forecast frame, optional intervals, batches, dataset dates, least-squares engine, tuning"""
+import json
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from main import app
+from modules.datasets.service import register_dataframe
+from modules.prophet.models import FourierRequest, ProphetRequest, ProphetTuneRequest
+from modules.prophet.service import PROPHET_AVAILABLE, generate_forecast, generate_fourier_forecast, prophet
+from modules.prophet.tuning import tune_prophet
+
+DATES = pd.date_range("2022-01-03", periods=156, freq="W-MON")
+VALUES = 100 + 10 * np.sin(np.arange(156) / 8.0) + np.random.default_rng(0).normal(0, 1, 156)
+
+
+def test_components_match_separate_predict():
+    if not PROPHET_AVAILABLE:
+        return
+    request = ProphetRequest(dates=[d.strftime("%d/%m/%Y") for d in DATES], values=VALUES.tolist(), periods=12)
+    result = generate_forecast(request)
+
+    df = pd.DataFrame({"ds": DATES, "y": VALUES})
+    expected = prophet.Prophet(weekly_seasonality=True, yearly_seasonality=True).fit(df).predict(df)
+    assert result["components"]["dates"] == DATES.strftime("%Y-%m-%d").tolist()
+    assert np.allclose(result["components"]["trend"], expected["trend"])
+    assert np.allclose(result["components"]["yearly"], expected["yearly"])
+    assert len(result["forecast"]["dates"]) == len(DATES) + 12
+
+
+def test_intervals_can_be_skipped():
+    if not PROPHET_AVAILABLE:
+        return
+    request = dict(dates=[d.strftime("%Y-%m-%d") for d in DATES], values=VALUES.tolist(), periods=12)
+    with_intervals = generate_forecast(ProphetRequest(**request))
+    point_only = generate_forecast(ProphetRequest(uncertainty_samples=0, **request))
+    assert point_only["forecast"]["yhat_lower"] is None and point_only["forecast"]["yhat_upper"] is None
+    assert np.allclose(point_only["forecast"]["yhat"], with_intervals["forecast"]["yhat"])
+    assert with_intervals["model_info"]["uncertainty_samples"] == 1000  # Cached model left untouched
+
+
+def test_appended_points_warm_start():
+    if not PROPHET_AVAILABLE:
+        return
+    dates = [d.strftime("%Y-%m-%d") for d in DATES]
+    settings = dict(periods=12, uncertainty_samples=0, weekly_seasonality=False)
+    generate_forecast(ProphetRequest(dates=dates[:-4], values=VALUES[:-4].tolist(), **settings))
+
+    warm = generate_forecast(ProphetRequest(dates=dates, values=VALUES.tolist(), **settings))
+    cold = generate_forecast(ProphetRequest(dates=dates, values=VALUES.tolist(), warm_start=False, **settings))
+    assert warm["model_info"]["cache"] == "warm_start"
+    assert cold["model_info"]["cache"] == "memory"  # Same series and settings: the warm fit is reused
+
+    reference = prophet.Prophet(weekly_seasonality=False).fit(pd.DataFrame({"ds": DATES, "y": VALUES}))
+    expected = reference.predict(reference.make_future_dataframe(periods=12))["yhat"].to_numpy()
+    assert np.abs(warm["forecast"]["yhat"] - expected).max() < 0.01 * np.abs(expected).mean()
+
+
+def test_batch_streams_each_series_and_isolates_errors():
+    if not PROPHET_AVAILABLE:
+        return
+    dates = [d.strftime("%Y-%m-%d") for d in DATES]
+    dataset_id = register_dataframe(pd.DataFrame({"OBS": DATES, "north": VALUES, "south": VALUES * 2}))["dataset_id"]
+    body = {
+        "dates": dates,
+        "periods": 8,
+        "uncertainty_samples": 0,
+        "series": [
+            {"name": "total", "values": (VALUES * 3).tolist(), "periods": 4},
+            {"name": "broken", "values": [1.0, None, 3.0], "dates": dates[:3]},
+        ],
+        "dataset_id": dataset_id,
+    }
+    response = TestClient(app).post("/api/prophet/batch", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    summary = lines[-1]
+    assert summary["done"] and summary["completed"] == 3 and summary["failed"] == 1
+    results = {line["name"]: line for line in lines[:-1]}
+    assert set(results) == {"total", "broken", "north", "south"}
+    assert not results["broken"]["ok"] and results["broken"]["status_code"] == 400
+    assert len(results["total"]["result"]["forecast"]["dates"]) == len(DATES) + 4
+    assert len(results["north"]["result"]["forecast"]["dates"]) == len(DATES) + 8
+    assert results["north"]["result"]["forecast"]["dates"][0] == "2022-01-03"
+
+    duplicate = TestClient(app).post("/api/prophet/batch", json={"series": [{"name": "a", "values": [1]}] * 2})
+    assert duplicate.status_code == 400
+
+
+def test_dataset_iso_dates_keep_their_calendar():
+    if not PROPHET_AVAILABLE:
+        return
+    # Most of these weekly dates have a day <= 12, so reading them day first would scramble the series
+    iso_dates = DATES.strftime("%Y-%m-%d").tolist()
+    client = TestClient(app)
+    dataset_id = client.post("/api/datasets", json={"data": {"OBS": iso_dates, "sales": (VALUES + 7).tolist()}}).json()["dataset_id"]
+    settings = {"periods": 4, "uncertainty_samples": 0, "weekly_seasonality": False}
+
+    forecast = client.post("/api/prophet/forecast", json={"dataset_id": dataset_id, "value_column": "sales", **settings})
+    assert forecast.status_code == 200
+    assert forecast.json()["components"]["dates"] == iso_dates
+
+    batch = client.post("/api/prophet/batch", json={"dataset_id": dataset_id, **settings})
+    lines = [json.loads(line) for line in batch.text.splitlines()]
+    assert lines[-1]["completed"] == 1 and lines[0]["name"] == "sales"
+    assert lines[0]["result"]["components"]["dates"] == iso_dates
+    assert np.allclose(lines[0]["result"]["forecast"]["yhat"], forecast.json()["forecast"]["yhat"])
+
+
+def test_fourier_engine_recovers_components():
+    days = pd.date_range("2021-01-01", periods=3 * 365, freq="D")
+    t = np.arange(len(days))
+    yearly = 10 * np.sin(2 * np.pi * t / 365.25)
+    weekly = 3 * np.cos(2 * np.pi * t / 7)
+    christmas = [d for d in days if d.month == 12 and d.day == 25]
+    holiday = np.where(days.isin(christmas), 15.0, 0.0)
+    values = 100 + 0.05 * t + yearly + weekly + holiday + np.random.default_rng(0).normal(0, 0.5, len(t))
+
+    request = FourierRequest(
+        dates=days.strftime("%Y-%m-%d").tolist(), values=values.tolist(), periods=30,
+        holidays={"christmas": [d.strftime("%Y-%m-%d") for d in christmas] + ["2023-12-25"]}
+    )
+    result = generate_fourier_forecast(request)
+    components = result["components"]
+    assert result["model_info"]["engine"] == "fourier"
+    assert set(components) == {"dates", "trend", "yearly", "weekly", "holidays"}
+    assert len(result["forecast"]["dates"]) == len(days) + 30
+    assert np.abs(components["weekly"] - weekly).max() < 0.3
+    assert np.abs(components["yearly"] - yearly).max() < 1.5
+    assert np.abs(components["holidays"][days.isin(christmas)] - 15).max() < 1.5
+    assert np.all(result["forecast"]["yhat_lower"] < result["forecast"]["yhat"])
+
+    # Weekly terms cannot be resolved from weekly data: left out, reported as zero
+    response = TestClient(app).post("/api/prophet/fourier", json={
+        "dates": DATES.strftime("%Y-%m-%d").tolist(), "values": VALUES.tolist(), "periods": 12, "interval_width": None
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["model_info"]["seasonalities"] == ["yearly"]
+    assert body["components"]["weekly"] == [0.0] * len(DATES)
+    assert body["forecast"]["yhat_lower"] is None
+    assert TestClient(app).post("/api/prophet/fourier", json={"dates": ["2024-01-01"] * 2, "values": [1, 2]}).status_code == 400
+
+
+def test_tuning_cross_validates_grid():
+    if not PROPHET_AVAILABLE:
+        return
+    request = ProphetTuneRequest(
+        dates=DATES.strftime("%Y-%m-%d").tolist(), values=VALUES.tolist(), horizon=84, initial=364, period=364,
+        weekly_seasonality=False, changepoint_prior_scale=[0.01, 0.5], seasonality_prior_scale=[10.0],
+        seasonality_mode=["additive", "multiplicative"]
+    )
+    result = tune_prophet(request)
+    assert result["n_fits"] == 8 and len(result["cutoffs"]) == 2
+    assert all(cell["n_folds"] == 2 and cell["failed"] == 0 for cell in result["cells"])
+    assert result["best"]["rmse"] == min(cell["rmse"] for cell in result["cells"])
+
+    # Same folds fitted in-process for one cell
+    actual, predicted = [], []
+    for cutoff in pd.to_datetime(result["cutoffs"]):
+        train, test = DATES <= cutoff, (DATES > cutoff) & (DATES <= cutoff + pd.Timedelta(days=84))
+        model = prophet.Prophet(yearly_seasonality=True, weekly_seasonality=False, changepoint_prior_scale=0.5, uncertainty_samples=0)
+        model.fit(pd.DataFrame({"ds": DATES[train], "y": VALUES[train]}))
+        predicted.append(model.predict(pd.DataFrame({"ds": DATES[test]}))["yhat"].to_numpy())
+        actual.append(VALUES[test])
+    errors = np.concatenate(actual) - np.concatenate(predicted)
+    cell = next(c for c in result["cells"] if c["changepoint_prior_scale"] == 0.5 and c["seasonality_mode"] == "additive")
+    assert np.isclose(cell["rmse"], np.sqrt(np.mean(errors ** 2)))
+
+    too_short = TestClient(app).post("/api/prophet/tune", json={"dates": DATES[:20].strftime("%Y-%m-%d").tolist(), "values": VALUES[:20].tolist()})
+    assert too_short.status_code == 400
+
+
+if __name__ == "__main__":
+    test_components_match_separate_predict()
+    test_intervals_can_be_skipped()
+    test_appended_points_warm_start()
+    test_batch_streams_each_series_and_isolates_errors()
+    test_dataset_iso_dates_keep_their_calendar()
+    test_fourier_engine_recovers_components()
+    test_tuning_cross_validates_grid()
+    print("SUCCESS!")
@@ -0,0 +1,72 @@
+"""Fitted Prophet model cache: keys, in-memory LRU and on-disk tier"""
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+
+from modules.prophet.cache import ProphetModelCache, fit_key
+from modules.prophet.models import ProphetRequest
+from modules.prophet.service import PROPHET_AVAILABLE, generate_forecast
+
+DS = pd.date_range("2022-01-02", periods=104, freq="W").to_numpy()
+Y = np.sin(np.arange(104) / 8.0) * 10 + 100
+CONFIG = {"yearly_seasonality": True, "weekly_seasonality": False}
+
+
+def json_cache(**kwargs):
+    """Cache whose 'models' are plain dicts serialized as JSON (no Prophet needed)"""
+    return ProphetModelCache(dumps=json.dumps, loads=json.loads, **kwargs)
+
+
+def test_fit_key_covers_series_and_config():
+    key = fit_key(DS, Y, CONFIG)
+    assert key == fit_key(DS.copy(), np.array(Y.tolist()), dict(reversed(CONFIG.items())))
+    assert key != fit_key(DS, Y + 1e-9, CONFIG)
+    assert key != fit_key(DS + np.timedelta64(1, "D"), Y, CONFIG)
+    assert key != fit_key(DS, Y, {**CONFIG, "weekly_seasonality": True})
+
+
+def test_memory_lru_and_disk_tier():
+    cache = json_cache(max_models=2)
+    for name in "abc":
+        cache.put(name, {"model": name})
+    assert cache.get("a") == (None, None)
+    assert cache.get("c") == ({"model": "c"}, "memory")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        writer = json_cache(max_models=2, cache_dir=cache_dir, max_disk_models=2)
+        for name in "abc":
+            writer.put(name, {"model": name})
+        assert sorted(os.listdir(cache_dir)) == ["b.json", "c.json"]
+
+        reader = json_cache(cache_dir=cache_dir)  # E.g. another worker process
+        assert reader.get("b") == ({"model": "b"}, "disk")
+        assert reader.get("b") == ({"model": "b"}, "memory")
+
+        with open(os.path.join(cache_dir, "c.json"), "w") as f:
+            f.write("{not json")
+        assert reader.get("c") == (None, None)
+        assert not os.path.exists(os.path.join(cache_dir, "c.json"))
+        assert reader.stats()["disk_hits"] == 1 and reader.stats()["misses"] == 1
+
+
+def test_horizon_change_reuses_fit():
+    if not PROPHET_AVAILABLE:
+        return
+    request = dict(dates=[str(d)[:10] for d in DS], values=Y.tolist(), weekly_seasonality=False)
+    first = generate_forecast(ProphetRequest(periods=10, **request))
+    second = generate_forecast(ProphetRequest(periods=30, **request))
+    assert first["model_info"]["cache"] == "miss"
+    assert second["model_info"]["cache"] == "memory"
+    assert len(second["forecast"]["dates"]) == len(first["forecast"]["dates"]) + 20
+
+
+if __name__ == "__main__":
+    test_fit_key_covers_series_and_config()
+    test_memory_lru_and_disk_tier()
+    test_horizon_change_reuses_fit()
+    print("SUCCESS!")
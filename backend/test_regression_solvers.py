@@ -0,0 +1,119 @@
+"""Modelling regression solvers: QR path against statsmodels OLS, bounded path against lsq_linear"""
+import os
+import sys
+import warnings
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import optimize
+
+from modules.modelling.models import ModelConfiguration, RegressionRequest, VariableTransformation
+from modules.modelling.service import run_modelling_regression, run_regression_with_bounds
+
+N_OBS = 60
+
+
+def make_design(rank_deficient=False, seed=1):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(N_OBS, 3)), columns=["tv", "radio", "price"])
+    if rank_deficient:
+        X["tv_plus_radio"] = X["tv"] + X["radio"]
+    y = 1 + 2 * X["tv"] - X["price"] + rng.normal(size=N_OBS)
+    return X, y.to_numpy()
+
+
+def check_matches_statsmodels(rank_deficient):
+    X, y = make_design(rank_deficient)
+    result, _ = run_regression_with_bounds(y, X)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # statsmodels warns about the rank-deficient design
+        reference = sm.OLS(y, sm.add_constant(X)).fit()
+
+    assert result["solver"] == "qr"
+    for key, expected in (("coefficients", reference.params), ("std_errors", reference.bse),
+                          ("t_stats", reference.tvalues), ("p_values", reference.pvalues)):
+        np.testing.assert_allclose(list(result[key].values()), expected.to_numpy(), rtol=1e-8, atol=1e-12)
+    for key, expected in (("r_squared", reference.rsquared), ("adj_r_squared", reference.rsquared_adj),
+                          ("f_statistic", reference.fvalue), ("aic", reference.aic), ("bic", reference.bic)):
+        assert np.isclose(result[key], expected, rtol=1e-10), key
+    assert result["df_resid"] == reference.df_resid
+    np.testing.assert_allclose(result["fitted_values"], reference.fittedvalues, rtol=1e-10)
+
+
+def test_qr_matches_statsmodels():
+    check_matches_statsmodels(rank_deficient=False)
+
+
+def test_rank_deficient_falls_back_to_lstsq():
+    check_matches_statsmodels(rank_deficient=True)
+
+
+def test_bounded_fit_respects_bounds():
+    X, y = make_design()
+    # tv (true 2) capped at 1.5 and price (true -1) kept non-negative both bind; radio (true 0) is free
+    bounds = [(None, None), (0.0, 1.5), (None, None), (0.0, None)]
+    result, _ = run_regression_with_bounds(y, X, bounds=bounds)
+    names = ["const", "tv", "radio", "price"]
+    coefficients = np.array([result["coefficients"][name] for name in names])
+
+    design = sm.add_constant(X).to_numpy()
+    reference = optimize.lsq_linear(design, y, bounds=([-np.inf, 0, -np.inf, 0], [np.inf, 1.5, np.inf, np.inf]))
+    np.testing.assert_allclose(coefficients, reference.x, atol=1e-8)
+    assert result["solver"] == "bvls"
+    assert result["at_bound"] == ["tv", "price"]
+    assert coefficients[1] == 1.5 and coefficients[3] == 0.0
+
+    # Active-set optimality: the residual gradient pushes each bound coefficient against its bound
+    gradient = design.T @ (y - design @ coefficients)
+    assert gradient[1] > 0 and gradient[3] < 0
+    np.testing.assert_allclose(gradient[[0, 2]], 0, atol=1e-8)
+
+    # Bound coefficients are not estimated: no standard error, no degree of freedom
+    assert np.isnan(result["std_errors"]["tv"]) and np.isnan(result["std_errors"]["price"])
+    assert result["df_resid"] == N_OBS - 2
+    free = sm.OLS(y - design[:, [1, 3]] @ coefficients[[1, 3]], design[:, [0, 2]]).fit()
+    np.testing.assert_allclose([result["std_errors"]["const"], result["std_errors"]["radio"]], free.bse, rtol=1e-8)
+
+
+def test_pinned_coefficient_is_taken_out_of_the_solve():
+    X, y = make_design()
+    # min_coef == max_coef fixes tv at 2; the rest is OLS on y - 2 * tv
+    result, _ = run_regression_with_bounds(y, X, bounds=[(None, None), (2.0, 2.0), (None, None), (None, None)])
+    reference = sm.OLS(y - 2 * X["tv"], sm.add_constant(X[["radio", "price"]])).fit()
+    assert result["coefficients"]["tv"] == 2.0
+    assert result["at_bound"] == ["tv"]
+    np.testing.assert_allclose([result["coefficients"][name] for name in ("const", "radio", "price")],
+                               reference.params, rtol=1e-8)
+    assert result["df_resid"] == reference.df_resid
+
+    # Every coefficient pinned: nothing left to solve
+    result, _ = run_regression_with_bounds(y, X, bounds=[(1.0, 1.0), (2.0, 2.0), (0.0, 0.0), (-1.0, -1.0)])
+    assert list(result["coefficients"].values()) == [1.0, 2.0, 0.0, -1.0]
+    assert result["at_bound"] == ["const", "tv", "radio", "price"]
+
+
+def test_request_with_pinned_coefficient():
+    X, y = make_design()
+    data = {"OBS": pd.date_range("2022-01-03", periods=N_OBS, freq="W-MON").strftime("%Y-%m-%d").tolist(),
+            "sales": y.tolist(), **{name: X[name].tolist() for name in X.columns}}
+    request = RegressionRequest(
+        model_configuration=ModelConfiguration(kpi="sales", start_date="2022-01-01", end_date="2023-12-31"),
+        variable_transformations=[VariableTransformation(variable="sales"),
+                                  VariableTransformation(variable="tv", min_coef=2.0, max_coef=2.0),
+                                  VariableTransformation(variable="radio", min_coef=0.0),
+                                  VariableTransformation(variable="price")],
+        data=data, diagnostics="none")
+    result = run_modelling_regression(request)
+    assert "tv" in result["coefficients_at_bound"]
+    assert result["degrees_of_freedom"] == N_OBS - 4 + len(result["coefficients_at_bound"])
+
+
+if __name__ == "__main__":
+    test_qr_matches_statsmodels()
+    test_rank_deficient_falls_back_to_lstsq()
+    test_bounded_fit_respects_bounds()
+    test_pinned_coefficient_is_taken_out_of_the_solve()
+    test_request_with_pinned_coefficient()
+    print("SUCCESS!")
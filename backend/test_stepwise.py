@@ -0,0 +1,91 @@
+"""Incremental QR stepwise engine vs full refits"""
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import statsmodels.api as sm
+
+from modules.regression.models import StepwiseRequest
+from modules.regression.service import stepwise_regression_logic
+from modules.regression.stepwise import StepwiseQR
+
+
+def make_problem(n_obs=200, n_vars=60, seed=11):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_obs, n_vars))
+    X[:, 5] = X[:, 0] + 0.3 * rng.normal(size=n_obs)  # correlated with a true driver
+    y = 3.0 + 2.0 * X[:, 0] - 1.5 * X[:, 1] + 0.8 * X[:, 2] + rng.normal(size=n_obs)
+    return X, y
+
+
+def test_partial_tests_match_statsmodels():
+    X, y = make_problem()
+    engine = StepwiseQR(X, y)
+    for idx in [0, 5, 1, 7, 2]:
+        engine.add(idx)
+    engine.remove(7)
+
+    fit = sm.OLS(y, sm.add_constant(X[:, engine.selected])).fit()
+    coefs, t_stats, p_values = engine.partial_tests()
+    np.testing.assert_allclose(engine.coefficients(), fit.params, rtol=1e-9)
+    np.testing.assert_allclose(t_stats, fit.tvalues[1:], rtol=1e-8)
+    np.testing.assert_allclose(p_values, fit.pvalues[1:], rtol=1e-6, atol=1e-300)
+
+
+def test_candidate_scores_match_refits():
+    X, y = make_problem()
+    engine = StepwiseQR(X, y)
+    engine.add(0)
+    engine.add(1)
+
+    candidates = [i for i in range(X.shape[1]) if i not in engine.selected]
+    f_stats, p_values = engine.score_candidates(candidates)
+    for k, idx in enumerate(candidates[:15]):
+        fit = sm.OLS(y, sm.add_constant(X[:, engine.selected + [idx]])).fit()
+        np.testing.assert_allclose(f_stats[k], fit.tvalues[-1] ** 2, rtol=1e-8)
+        np.testing.assert_allclose(p_values[k], fit.pvalues[-1], rtol=1e-6)
+
+
+def test_collinear_candidate_is_never_added():
+    X, y = make_problem(n_vars=10)
+    X[:, 9] = 2.0 * X[:, 0] - X[:, 1]
+    engine = StepwiseQR(X, y)
+    engine.add(0)
+    engine.add(1)
+    f_stats, p_values = engine.score_candidates([9])
+    assert f_stats[0] == 0.0 and p_values[0] == 1.0
+
+
+def test_stepwise_methods_select_true_drivers():
+    X, y = make_problem()
+    X_dict = {f"x{i}": X[:, i].tolist() for i in range(X.shape[1])}
+    for method in ("forward", "backward", "both"):
+        result = stepwise_regression_logic(StepwiseRequest(y=y.tolist(), X=X_dict, method=method, significance_level=0.01))
+        assert {"x0", "x1", "x2"} <= set(result["selected_variables"]), method
+        fit = sm.OLS(y, sm.add_constant(X[:, [int(v[1:]) for v in result["selected_variables"]]])).fit()
+        np.testing.assert_allclose(result["r_squared"], fit.rsquared, rtol=1e-9)
+        np.testing.assert_allclose(list(result["p_values"].values()), fit.pvalues[1:], rtol=1e-6, atol=1e-300)
+
+
+def test_backward_with_more_variables_than_observations():
+    X, y = make_problem(n_obs=40, n_vars=60)
+    X_dict = {f"x{i}": X[:, i].tolist() for i in range(X.shape[1])}
+    result = stepwise_regression_logic(StepwiseRequest(y=y.tolist(), X=X_dict, method="backward"))
+    assert result["n_features_selected"] < 40
+
+    # Columns dropped up front share the schema of tested steps, with a reason
+    steps = result["steps"]
+    assert all(set(step) == {"step", "action", "variable", "f_statistic", "p_value", "reason"} for step in steps)
+    dropped = [step for step in steps if step["reason"] is not None]
+    assert dropped and all(step["reason"] == "insufficient_degrees_of_freedom" for step in dropped)
+    assert any(step["reason"] is None for step in steps)
+
+
+if __name__ == "__main__":
+    test_partial_tests_match_statsmodels()
+    test_candidate_scores_match_refits()
+    test_collinear_candidate_is_never_added()
+    test_stepwise_methods_select_true_drivers()
+    test_backward_with_more_variables_than_observations()
+    print("SUCCESS!")
@@ -0,0 +1,73 @@
+"""Stage timers, Server-Timing headers, /metrics and structured logging"""
+import json
+import logging
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+from modules.log import _StructuredFormatter
+from modules.timing import metrics, server_timing, stage
+
+
+def parse_server_timing(header):
+    entries = {}
+    for entry in header.split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+def test_stage_records_histograms():
+    metrics.reset()
+    with stage("test.work"):
+        sum(range(10000))
+    snapshot = metrics.snapshot()
+    (item,) = [item for item in snapshot["stages"] if item["stage"] == "test.work"]
+    assert item["wall"]["count"] == 1 and item["cpu"]["count"] == 1
+    assert item["wall"]["buckets"]["+Inf"] == 1
+
+    header = server_timing([("a", 2.0, 1.5)], 5.0)
+    assert parse_server_timing(header)["other"]["dur"] == "3.00"
+
+
+def test_server_timing_header_and_metrics():
+    metrics.reset()
+    client = TestClient(app)
+    rng = np.random.default_rng(0)
+    variables = {f"v{i}": rng.normal(size=40).tolist() for i in range(5)}
+
+    response = client.post("/api/correlation/matrix", json={"variables": variables})
+    assert response.status_code == 200
+    timings = parse_server_timing(response.headers["server-timing"])
+    assert {"correlation.load", "correlation.compute", "serialize", "other", "total"} <= set(timings)
+    assert timings["correlation.compute"]["desc"].startswith('"cpu ')
+    assert float(timings["total"]["dur"]) >= float(timings["correlation.compute"]["dur"])
+
+    client.get("/api/jobs/unknown-job")
+    snapshot = client.get("/metrics", params={"format": "json"}).json()
+    routes = {(item["route"], item["status"]) for item in snapshot["responses"]}
+    assert ("/api/correlation/matrix", 200) in routes
+    assert ("/api/jobs/{job_id}", 404) in routes  # Route templates, not raw paths
+
+    text = client.get("/metrics").text
+    assert 'modelhub_request_duration_ms_count{method="POST",route="/api/correlation/matrix"} 1' in text
+    assert 'modelhub_stage_cpu_ms_bucket{stage="correlation.compute",le="+Inf"} 1' in text
+
+
+def test_structured_log_records():
+    record = logging.LogRecord("modules.test", logging.INFO, __file__, 1, "Fitted %s", ("model",), None)
+    record.n_observations = 52
+    entry = json.loads(_StructuredFormatter().format(record))
+    assert entry["level"] == "INFO" and entry["message"] == "Fitted model"
+    assert entry["n_observations"] == 52
+
+
+if __name__ == "__main__":
+    test_stage_records_histograms()
+    test_server_timing_header_and_metrics()
+    test_structured_log_records()
+    print("SUCCESS!")
@@ -0,0 +1,83 @@
+"""Transformed-column cache: per-variable reuse, byte-bounded eviction, /health counters"""
+import os
+import subprocess
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from main import app
+from modules.modelling.cache import TransformCache, transform_cache
+from modules.modelling.models import VariableTransformation
+from modules.modelling.service import transform_data
+
+N_ROWS = 52
+MEDIA = [f"media_{i}" for i in range(6)]
+
+
+def make_data():
+    rng = np.random.default_rng(3)
+    data = {"OBS": pd.date_range("2023-01-02", periods=N_ROWS, freq="W-MON").strftime("%Y-%m-%d").tolist(),
+            "sales": rng.gamma(2.0, 100.0, N_ROWS).tolist()}
+    for name in MEDIA:
+        data[name] = rng.uniform(0, 50, N_ROWS).tolist()
+    return data
+
+
+def configs(adstock_of_first=0.5):
+    return [VariableTransformation(variable="sales")] + [
+        VariableTransformation(variable=name, adstock=adstock_of_first if i == 0 else 0.3, lag=1)
+        for i, name in enumerate(MEDIA)
+    ]
+
+
+def test_changing_one_adstock_misses_once():
+    transform_cache.clear()
+    data = make_data()
+    _, first = transform_data(data, configs(0.5), "2023-01-01", "2023-12-31", "sales")
+    before = transform_cache.stats()
+
+    _, second = transform_data(data, configs(0.7), "2023-01-01", "2023-12-31", "sales")
+    after = transform_cache.stats()
+    n_columns = len(MEDIA) + 1
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == n_columns - 1
+    for name in MEDIA[1:]:
+        np.testing.assert_array_equal(first[name], second[name])
+    assert not np.allclose(first[MEDIA[0]], second[MEDIA[0]])
+
+    health = TestClient(app).get("/health").json()["caches"]["modelling_transform"]
+    assert health["hits"] == after["hits"] and health["misses"] == after["misses"]
+    assert health["entries"] == after["entries"]
+
+
+def test_eviction_within_byte_budget():
+    cache = TransformCache(max_bytes=3 * 8 * N_ROWS)  # Room for three columns
+    columns = [np.full(N_ROWS, float(i)) for i in range(5)]
+    for i, column in enumerate(columns):
+        cache.put(("column", i), column)
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["evictions"] == 2 and stats["bytes"] <= stats["max_bytes"]
+    assert cache.get(("column", 0)) is None and cache.get(("column", 1)) is None
+    np.testing.assert_array_equal(cache.get(("column", 4)), columns[4])
+
+    # The environment variable sets the budget of the shared cache
+    script = (
+        "import sys; sys.path.insert(0, 'src');"
+        "from test_transform_cache import *;"
+        "transform_data(make_data(), configs(), '2023-01-01', '2023-12-31', 'sales');"
+        "stats = transform_cache.stats();"
+        "assert stats['max_bytes'] == 1000 and 0 < stats['bytes'] <= 1000 and stats['evictions'] > 0, stats"
+    )
+    env = {**os.environ, "MODELLING_TRANSFORM_CACHE_BYTES": "1000", "WARMUP_ENABLED": "0"}
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+if __name__ == "__main__":
+    test_changing_one_adstock_misses_once()
+    test_eviction_within_byte_budget()
+    print("SUCCESS!")
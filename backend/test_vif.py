@@ -0,0 +1,54 @@
+"""VIF from one decomposition vs statsmodels auxiliary regressions; raw and scaled condition numbers"""
+import os
+import sys
+import warnings
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+from statsmodels.stats.outliers_influence import variance_inflation_factor
+
+from modules.modelling.service import collinearity_diagnostics
+
+
+def make_design(n_obs=300, n_vars=25, seed=3):
+    rng = np.random.default_rng(seed)
+    X = rng.gamma(2.0, 50.0, size=(n_obs, n_vars))
+    X[:, 1] = 0.9 * X[:, 0] + rng.normal(0, 5, n_obs)  # strongly collinear pair
+    X[:, 2] = 1e-4 * X[:, 2]  # very different scale
+    return np.column_stack([np.ones(n_obs), X]), ['const'] + [f"var_{i}" for i in range(n_vars)]
+
+
+def test_vif_matches_statsmodels():
+    X_array, names = make_design()
+    vifs, condition_number, scaled_condition_number = collinearity_diagnostics(X_array, names)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = [variance_inflation_factor(X_array, i) for i in range(1, X_array.shape[1])]
+
+    np.testing.assert_allclose([vifs[name] for name in names[1:]], expected, rtol=1e-8)
+    assert vifs['var_0'] > 5 and vifs['var_1'] > 5
+    assert np.isclose(condition_number, np.linalg.cond(X_array), rtol=1e-10)
+    assert np.isfinite(scaled_condition_number) and 1.0 <= scaled_condition_number < condition_number
+
+    # Rescaling a regressor changes the raw condition number but not the scaled one
+    X_array[:, 3] *= 1e3
+    _, rescaled, rescaled_scaled = collinearity_diagnostics(X_array, names)
+    assert not np.isclose(rescaled, condition_number)
+    assert np.isclose(rescaled_scaled, scaled_condition_number, rtol=1e-10)
+
+
+def test_vif_near_singular_falls_back():
+    X_array, names = make_design()
+    X_array[:, 3] = 2.0 * X_array[:, 4]  # exact collinearity
+    vifs, condition_number, scaled_condition_number = collinearity_diagnostics(X_array, names)
+
+    assert vifs['var_2'] > 1e10 and vifs['var_3'] > 1e10
+    assert vifs['var_10'] < 5
+    assert condition_number > 1e8 and scaled_condition_number > 1e8
+
+
+if __name__ == "__main__":
+    test_vif_matches_statsmodels()
+    test_vif_near_singular_falls_back()
+    print("SUCCESS!")
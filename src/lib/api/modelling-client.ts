@@ -82,6 +82,7 @@ export interface ModelDiagnostics {
   white_test_stat: number;
   white_test_pvalue: number;
   condition_number: number;
+  scaled_condition_number?: number;
   vif_values: Record<string, number>;
 }
 
@@ -69,7 +69,9 @@ export interface StepwiseResponse {
     step: number;
     action: 'add' | 'remove';
     variable: string;
+    f_statistic: number;
     p_value: number;
+    reason: 'collinear' | 'insufficient_degrees_of_freedom' | null;
   }>;
   n_samples: number;
   n_features_original: number;